@@ -7,12 +7,133 @@ alpha (taux d'apprentissage) : si alpha est trop grand, l'agent oublie vite
 gamma (future recompense) : si trop petit, l'agent ne considere pas assez les
     recompenses futures.
 Combi de base : epsilon= 1.0, alpha=0.1, gamma=0.9
+
+DenseQLearningAgent : meme algorithme, mais chaque etat de vision est code
+par un entier (6 symboles possibles par direction, soit 6^4 etats) et les
+valeurs Q sont rangees dans un seul tableau float32. Un replay buffer peut
+lui etre attache (attach_replay) : chaque pas appris declenche alors des
+mises a jour vectorisees sur des minibatchs de transitions passees.
+
+SymmetricQLearningAgent : Q-table dense ou chaque etat est ramene a son
+orientation canonique parmi les 8 rotations / symetries du plateau (et
+l'action avec lui). Une experience apprend a tous les etats equivalents.
+
+BoundedQLearningAgent : etats enrichis des distances (par tranches) dans
+chaque direction, et Q-table de taille bornee (max_states lignes
+preallouees). Quand elle est pleine, l'etat le moins visite parmi les
+moins recemment utilises est evince.
 """
 import numpy as np
 import random
+import sys
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import islice
+
+from snakegame import VISION_SYMBOLS, DISTANCE_BOUNDS, VIEW_BITS, VIEW_MASK, decode_view
+
+NUM_SYMBOLS = len(VISION_SYMBOLS)
+NUM_STATE_CODES = NUM_SYMBOLS ** 4
+_SYMBOL_DIGITS = {symbol: i for i, symbol in enumerate(VISION_SYMBOLS)}
+_CODE_WEIGHTS = NUM_SYMBOLS ** np.arange(3, -1, -1)
+
+# Tranches de distance des etats enrichis (cf. snakegame.DISTANCE_BOUNDS)
+NUM_DISTANCE_BUCKETS = len(DISTANCE_BOUNDS) + 1
+EVICTION_CANDIDATES = 8  # etats les moins recents examines par eviction
+DEFAULT_MAX_STATES = 100_000  # taille par defaut de la Q-table bornee
+
+
+def encode_state(state):
+    """Code entier d'un etat de vision (None si ce n'est pas une vision 4 directions)."""
+    if len(state) != 4:
+        return None
+    code = 0
+    for symbol in state:
+        digit = _SYMBOL_DIGITS.get(symbol)
+        if digit is None:
+            return None
+        code = code * NUM_SYMBOLS + digit
+    return code
+
+
+def _symmetries() -> tuple:
+    """Les 8 transformations du plateau (4 rotations, 4 miroirs).
+
+    Chaque transformation est une permutation p des directions (haut,
+    droite, bas, gauche) : la direction i de la vue transformee est la
+    direction p[i] de la vue d'origine.
+    """
+    rotations = [tuple((k + i) % 4 for i in range(4)) for k in range(4)]
+    mirrors = [tuple((k - i) % 4 for i in range(4)) for k in range(4)]
+    return tuple(rotations + mirrors)
+
+
+SYMMETRIES = _symmetries()
+
+
+def decode_state(code: int) -> tuple:
+    """Retrouve le tuple de symboles a partir du code entier."""
+    symbols = []
+    for _ in range(4):
+        code, digit = divmod(code, NUM_SYMBOLS)
+        symbols.append(VISION_SYMBOLS[digit])
+    return tuple(reversed(symbols))
+
+
+# Code entier de chacune des vues compactes (cf. SnakeGame.get_observation)
+_VIEW_CODES = [view and encode_state(view) for view in map(decode_view, range(1 << VIEW_BITS))]
+
+
+def encode_observation(packed: int) -> int:
+    """Code entier (cf. encode_state) de la vue d'une observation compacte."""
+    return _VIEW_CODES[packed & VIEW_MASK]
+
+
+def encode_vision(codes):
+    """Code entier de chaque ligne d'un lot de visions (N, 4) (cf. VecSnakeGame)."""
+    return np.asarray(codes, dtype=np.int64) @ _CODE_WEIGHTS
+
+
+def _canonical_tables() -> tuple:
+    """Pour chaque code : code canonique (le plus petit des 8 transformes)
+    et indice de la transformation qui y mene."""
+    digits = np.array([[code // NUM_SYMBOLS ** (3 - i) % NUM_SYMBOLS for i in range(4)]
+                       for code in range(NUM_STATE_CODES)])
+    transformed = np.stack([digits[:, p] @ _CODE_WEIGHTS for p in SYMMETRIES], axis=1)
+    symmetry = transformed.argmin(axis=1)
+    return transformed.min(axis=1), symmetry.astype(np.int8)
+
+
+CANONICAL_CODES, CANONICAL_SYMMETRY = _canonical_tables()
+# Action reelle -> action canonique (et inverse) pour chaque transformation
+ACTIONS_FROM_CANONICAL = np.array(SYMMETRIES, dtype=np.int8)
+ACTIONS_TO_CANONICAL = ACTIONS_FROM_CANONICAL.argsort(axis=1).astype(np.int8)
+
+
+def encode_distance_state(view, distances) -> int:
+    """Code entier d'une vision et des tranches de ses distances."""
+    code = encode_state(view)
+    for distance in distances:
+        code = code * NUM_DISTANCE_BUCKETS + bisect_left(DISTANCE_BOUNDS, int(distance))
+    return code
+
+
+def decode_distance_state(code: int) -> tuple:
+    """Retrouve (vision, tranches de distance) a partir du code."""
+    buckets = []
+    for _ in range(4):
+        code, bucket = divmod(code, NUM_DISTANCE_BUCKETS)
+        buckets.append(bucket)
+    return decode_state(code), tuple(reversed(buckets))
 
 
 class QLearningAgent:
+    # Decroissance d'epsilon apres chaque session (cf. decay_epsilon) ;
+    # attributs de classe, redefinissables par instance
+    decay_rate = 0.9995
+    min_epsilon = 0.1
+    replay = None  # ReplayBuffer (cf. DenseQLearningAgent.attach_replay)
+
     def __init__(self, grid_size, num_actions=3, epsilon=0.99, alpha=None, gamma=0.9):
         """Initialisation"""
         self.grid_size = grid_size
@@ -24,6 +145,14 @@ class QLearningAgent:
         # Q-table : associe chq etat a une liste de recompenses pr chq action
         self.q_table = {}
 
+    def make_state(self, game):
+        """Etat de l'agent dans la partie game : la vue seule.
+
+        Tuple de symboles (cf. SnakeGame.get_observation), comme les cles
+        des anciennes Q-tables.
+        """
+        return decode_view(game.get_observation()[0])
+
     def get_q_values(self, state):
         if state not in self.q_table:
             self.q_table[state] = [0] * self.num_actions
@@ -33,8 +162,7 @@ class QLearningAgent:
         """Choisit une action en utilisant la strategie epsilon-greedy."""
         qvals = self.get_q_values(state)  # Centralise la recup des valeurs Q
         if play_mode:
-            # Exploitation pure (pas d'exploration)
-            self.epsilon = 0.1
+            # Exploitation pure (pas d'exploration, epsilon inchange)
             return np.argmax(qvals)
 
         # Exploration epsilon-greedy
@@ -57,6 +185,459 @@ class QLearningAgent:
         td_error = td_target - old_value
         self.q_table[state][action] = old_value + self.alpha * td_error
 
-    def decay_epsilon(self, decay_rate=0.9995, min_epsilon=0.1):
+    def decay_epsilon(self, decay_rate=None, min_epsilon=None):
         """Reduit epsilon graduellement apres chaque session."""
+        decay_rate = self.decay_rate if decay_rate is None else decay_rate
+        min_epsilon = self.min_epsilon if min_epsilon is None else min_epsilon
         self.epsilon = max(min_epsilon, self.epsilon * decay_rate)
+
+    def num_states(self) -> int:
+        """Nombre d'etats enregistres dans la Q-table."""
+        return len(self.q_table)
+
+
+class DenseQLearningAgent(QLearningAgent):
+    def __init__(self, grid_size, num_actions=3, epsilon=0.99, alpha=None, gamma=0.9):
+        """Initialisation : Q-table dense indexee par code d'etat."""
+        self.q_values = np.zeros((NUM_STATE_CODES, num_actions), dtype=np.float32)
+        self.visited = np.zeros(NUM_STATE_CODES, dtype=bool)  # etats mis a jour
+        self._flat = memoryview(self.q_values.reshape(-1))
+        self._visited = memoryview(self.visited)
+        self._codes = {}  # cache etat (tuple) -> code
+        self._extra_states = []  # etats hors alphabet (anciennes sauvegardes)
+        super().__init__(grid_size, num_actions, epsilon, alpha, gamma)
+
+    @classmethod
+    def from_agent(cls, agent: QLearningAgent):
+        """Convertit un QLearningAgent (Q-table dict) en Q-table dense."""
+        dense = cls(agent.grid_size, agent.num_actions, agent.epsilon,
+                    agent.alpha, agent.gamma)
+        dense.q_table = agent.q_table
+        return dense
+
+    @property
+    def q_table(self) -> dict:
+        """Vue dict {etat: valeurs Q} des etats visites (affichage, compat)."""
+        return {self.state_of(code): self.q_values[code].tolist()
+                for code in np.flatnonzero(self.visited)}
+
+    @q_table.setter
+    def q_table(self, table: dict):
+        self.q_values[:] = 0
+        self.visited[:] = False
+        for state, qvals in table.items():
+            code = self.state_index(state)  # peut agrandir q_values
+            self.q_values[code] = qvals
+            self.visited[code] = True
+
+    def num_states(self) -> int:
+        """Nombre d'etats mis a jour au moins une fois (cf. visited)."""
+        return int(np.count_nonzero(self.visited))
+
+    def state_index(self, state) -> int:
+        """Code entier d'un etat (tuple de symboles ou deja un entier)."""
+        if type(state) is int:  # cas courant : code de make_state
+            return state
+        if isinstance(state, np.integer):
+            return int(state)
+        code = self._codes.get(state)
+        if code is None:
+            code = encode_state(state)
+            if code is None:
+                code = self._add_extra_state(state)
+            self._codes[state] = code
+        return code
+
+    def state_of(self, code: int):
+        """Etat (tuple) correspondant a un code."""
+        if code < NUM_STATE_CODES:
+            return decode_state(code)
+        return self._extra_states[code - NUM_STATE_CODES]
+
+    def _add_extra_state(self, state) -> int:
+        """Ajoute une ligne pour un etat qui n'est pas une vision 4 directions.
+
+        La capacite double quand elle est atteinte : les lignes au-dela des
+        etats connus restent nulles et non visitees.
+        """
+        code = NUM_STATE_CODES + len(self._extra_states)
+        self._extra_states.append(state)
+        if code == len(self.q_values):
+            self._resize(2 * code)
+        return code
+
+    def _resize(self, num_rows: int) -> None:
+        """Agrandit q_values et visited a num_rows lignes (lignes ajoutees a zero)."""
+        q_values = np.zeros((num_rows, self.num_actions), dtype=np.float32)
+        q_values[:len(self.q_values)] = self.q_values
+        visited = np.zeros(num_rows, dtype=bool)
+        visited[:len(self.visited)] = self.visited
+        self.q_values, self.visited = q_values, visited
+        self._flat = memoryview(q_values.reshape(-1))
+        self._visited = memoryview(visited)
+
+    def make_state(self, game):
+        """Etat de l'agent : code entier de la vue (cf. encode_observation)."""
+        return _VIEW_CODES[game.get_observation()[0] & VIEW_MASK]
+
+    def set_buffer(self, buffer=None):
+        """Deplace les valeurs Q dans buffer (ex. memoire partagee).
+
+        Les valeurs sont recopiees ; sans buffer, elles reviennent dans un
+        tableau prive (a faire avant de liberer le buffer).
+        """
+        q_values = np.ndarray(self.q_values.shape, dtype=np.float32, buffer=buffer)
+        q_values[:] = self.q_values
+        self.q_values = q_values
+        self._flat = memoryview(q_values.reshape(-1))
+
+    def get_q_values(self, state):
+        return self.q_values[self.state_index(state)]
+
+    def get_action(self, state, play_mode):
+        """Choisit une action en utilisant la strategie epsilon-greedy."""
+        code = self.state_index(state)
+        if not play_mode and random.random() < self.epsilon:
+            return random.randint(0, self.num_actions - 1)
+
+        # Ligne lue via la vue memoire plate, argmax en Python (1re action max)
+        row = code * self.num_actions
+        values = self._flat[row:row + self.num_actions].tolist()
+        return values.index(max(values))
+
+    def update(self, state, action, reward, next_state):
+        """Met a jour la Q-table selon l'equation Q-Learning."""
+        code = self.state_index(state)
+        next_code = self.state_index(next_state)
+
+        # Acces scalaires via la vue memoire plate (evite les scalaires NumPy)
+        flat = self._flat
+        cell = code * self.num_actions + action
+        next_row = next_code * self.num_actions
+        old_value = flat[cell]
+        next_max = max(flat[next_row:next_row + self.num_actions])
+        td_target = reward + (self.gamma * next_max)
+        flat[cell] = old_value + self.alpha * (td_target - old_value)
+        self._visited[code] = True
+
+    def update_batch(self, states, actions, rewards, next_states):
+        """Regle Q-Learning appliquee a un minibatch (tableaux de codes).
+
+        Les cibles sont calculees avec les valeurs d'avant le lot ; si une
+        paire (etat, action) apparait plusieurs fois, ses erreurs TD sont
+        moyennees et appliquees en une seule mise a jour.
+        """
+        flat = self.q_values.reshape(-1)
+        cells = states * self.num_actions + actions
+        next_max = self.q_values[next_states].max(axis=1)
+        td_error = rewards + self.gamma * next_max - flat[cells]
+        # Chaque doublon recoit 1/k de son erreur : la somme vaut la moyenne
+        duplicates = np.bincount(cells)[cells]
+        np.add.at(flat, cells, self.alpha * td_error / duplicates)
+        self.visited[states] = True
+
+    def attach_replay(self, buffer, batch_size=32, updates_per_step=1):
+        """Attache un replay buffer (cf. replay_step)."""
+        self.replay = buffer
+        self.replay_batch_size = batch_size
+        self.replay_updates = updates_per_step
+
+    def replay_step(self, state, action, reward, next_state, done):
+        """Range la transition et rejoue replay_updates minibatchs."""
+        replay = self.replay
+        replay.add(self.state_index(state), action, reward,
+                   self.state_index(next_state), done)
+        if len(replay) >= self.replay_batch_size:
+            for _ in range(self.replay_updates):
+                states, actions, rewards, next_states, _ = \
+                    replay.sample(self.replay_batch_size)
+                self.update_batch(states, actions, rewards, next_states)
+
+    def replay_batch(self, states, actions, rewards, next_states, dones):
+        """Range un lot de transitions, rejoue replay_updates minibatchs par transition."""
+        replay = self.replay
+        replay.add_batch(states, actions, rewards, next_states, dones)
+        if len(replay) >= self.replay_batch_size:
+            for _ in range(len(actions) * self.replay_updates):
+                sample = replay.sample(self.replay_batch_size)
+                self.update_batch(*sample[:4])  # fins de partie ignorees, cf. update
+
+    def __getstate__(self):
+        """Sauvegarde compacte : seuls les etats visites sont ecrits."""
+        state = self.__dict__.copy()
+        codes = np.flatnonzero(self.visited)
+        state["q_values"] = self.q_values[codes].tobytes()
+        state["visited"] = codes.astype(np.int32).tobytes()
+        state["num_rows"] = len(self.q_values)
+        del state["_codes"]
+        del state["_flat"]
+        del state["_visited"]
+        state.pop("replay", None)  # le replay buffer n'est pas sauvegarde
+        return state
+
+    def __setstate__(self, state):
+        codes = np.frombuffer(state.pop("visited"), dtype=np.int32)
+        values = np.frombuffer(state.pop("q_values"), dtype=np.float32)
+        num_rows = state.pop("num_rows")
+        self.__dict__.update(state)
+        values = values.reshape(len(codes), self.num_actions)
+        self.q_values = np.zeros((num_rows, self.num_actions), dtype=np.float32)
+        self.q_values[codes] = values
+        self.visited = np.zeros(num_rows, dtype=bool)
+        self.visited[codes] = True
+        self._flat = memoryview(self.q_values.reshape(-1))
+        self._visited = memoryview(self.visited)
+        self._codes = {state: NUM_STATE_CODES + i
+                       for i, state in enumerate(self._extra_states)}
+
+
+class SymmetricQLearningAgent(DenseQLearningAgent):
+    """Q-table dense partagee entre les orientations equivalentes.
+
+    Les 4 actions sont absolues (haut, droite, bas, gauche) : une rotation
+    de la vue fait tourner les actions avec elle.
+    """
+
+    _canonical = CANONICAL_CODES.tolist()
+    _symmetry = CANONICAL_SYMMETRY.tolist()
+    _to_canonical = ACTIONS_TO_CANONICAL.tolist()
+    _from_canonical = ACTIONS_FROM_CANONICAL.tolist()
+
+    def __init__(self, grid_size, num_actions=4, epsilon=0.99, alpha=None, gamma=0.9):
+        """Initialisation (4 actions obligatoirement)."""
+        if num_actions != 4:
+            raise ValueError("SymmetricQLearningAgent : 4 actions necessaires.")
+        super().__init__(grid_size, num_actions, epsilon, alpha, gamma)
+
+    @classmethod
+    def from_agent(cls, agent: QLearningAgent):
+        """Convertit une Q-table (dict ou dense, 4 actions) en Q-table symetrique.
+
+        Chaque etat visite est ramene a son etat canonique, actions
+        comprises ; les valeurs des etats d'une meme classe sont moyennees.
+        Leve ValueError pour un autre type d'agent ou un autre nb d'actions.
+        """
+        if type(agent) is QLearningAgent:
+            agent = DenseQLearningAgent.from_agent(agent)
+        if type(agent) is not DenseQLearningAgent or agent.num_actions != 4:
+            raise ValueError(f"{type(agent).__name__} a {agent.num_actions} actions : "
+                             "conversion symetrique impossible (Q-table a 4 actions "
+                             "absolues necessaire).")
+        symmetric = cls(agent.grid_size, agent.num_actions, agent.epsilon,
+                        agent.alpha, agent.gamma)
+        codes = np.flatnonzero(agent.visited[:NUM_STATE_CODES])
+        canonical = CANONICAL_CODES[codes]
+        # Ligne canonique : valeur de l'action reelle a en ACTIONS_TO_CANONICAL[s, a]
+        values = np.empty((len(codes), 4), dtype=np.float32)
+        values[np.arange(len(codes))[:, None],
+               ACTIONS_TO_CANONICAL[CANONICAL_SYMMETRY[codes]]] = agent.q_values[codes]
+        np.add.at(symmetric.q_values, canonical, values)
+        counts = np.bincount(canonical, minlength=NUM_STATE_CODES)
+        rows = np.flatnonzero(counts)
+        symmetric.q_values[rows] /= counts[rows, None]
+        symmetric.visited[rows] = True
+        # Etats hors alphabet : sans symetrie, recopies tels quels
+        for state in agent._extra_states:
+            code = symmetric.state_index(state)
+            symmetric.q_values[code] = agent.get_q_values(state)
+            symmetric.visited[code] = agent.visited[agent.state_index(state)]
+        return symmetric
+
+    def canonical(self, state) -> tuple:
+        """(code canonique, indice de la transformation) d'un etat."""
+        code = self.state_index(state)
+        if code < NUM_STATE_CODES:
+            return self._canonical[code], self._symmetry[code]
+        return code, 0  # etat hors alphabet : pas de symetrie
+
+    def get_q_values(self, state):
+        """Valeurs Q de l'etat, dans l'ordre des actions reelles."""
+        code, symmetry = self.canonical(state)
+        return self.q_values[code, self._to_canonical[symmetry]]
+
+    def get_action(self, state, play_mode):
+        """Choisit une action en utilisant la strategie epsilon-greedy."""
+        code, symmetry = self.canonical(state)
+        if not play_mode and random.random() < self.epsilon:
+            return random.randint(0, self.num_actions - 1)
+        row = code * self.num_actions
+        values = self._flat[row:row + self.num_actions].tolist()
+        return self._from_canonical[symmetry][values.index(max(values))]
+
+    def update(self, state, action, reward, next_state):
+        """Met a jour la Q-table selon l'equation Q-Learning (etats canoniques)."""
+        code, symmetry = self.canonical(state)
+        next_code, _ = self.canonical(next_state)
+        super().update(code, self._to_canonical[symmetry][action], reward, next_code)
+
+    def update_batch(self, states, actions, rewards, next_states):
+        """Regle Q-Learning sur un minibatch (codes de vision 4 directions)."""
+        symmetries = CANONICAL_SYMMETRY[states]
+        super().update_batch(CANONICAL_CODES[states],
+                             ACTIONS_TO_CANONICAL[symmetries, actions],
+                             rewards, CANONICAL_CODES[next_states])
+
+
+class BoundedQLearningAgent(QLearningAgent):
+    def __init__(self, grid_size, num_actions=3, epsilon=0.99, alpha=None,
+                 gamma=0.9, max_states=DEFAULT_MAX_STATES):
+        """Initialisation : Q-table de max_states etats au plus."""
+        self.max_states = max_states
+        self.q_values = np.zeros((max_states, num_actions), dtype=np.float32)
+        self.visits = np.zeros(max_states, dtype=np.uint32)
+        self.slots = OrderedDict()  # code -> ligne, du moins au plus recent
+        self.hits = self.misses = self.evictions = 0
+        self._flat = memoryview(self.q_values.reshape(-1))
+        self._visits = memoryview(self.visits)
+        super().__init__(grid_size, num_actions, epsilon, alpha, gamma)
+
+    @property
+    def q_table(self) -> dict:
+        """Vue dict {code d'etat: valeurs Q} (cf. decode_distance_state)."""
+        return {code: self.q_values[slot].tolist()
+                for code, slot in self.slots.items()}
+
+    @q_table.setter
+    def q_table(self, table: dict):
+        if len(table) > self.max_states:
+            raise ValueError(f"BoundedQLearningAgent : {len(table)} etats, "
+                             f"max_states = {self.max_states}.")
+        self.slots.clear()
+        self.q_values[:] = 0
+        self.visits[:] = 0
+        for slot, (code, qvals) in enumerate(table.items()):
+            self.slots[code] = slot
+            self.q_values[slot] = qvals
+
+    def resize(self, max_states: int) -> None:
+        """Change la taille de la Q-table (etats, recence et visites gardes).
+
+        Leve ValueError si la table contient plus de max_states etats.
+        """
+        if len(self.slots) > max_states:
+            raise ValueError(f"BoundedQLearningAgent : {len(self.slots)} etats, "
+                             f"max_states = {max_states}.")
+        slots = np.fromiter(self.slots.values(), dtype=np.int64, count=len(self.slots))
+        q_values = np.zeros((max_states, self.num_actions), dtype=np.float32)
+        q_values[:len(slots)] = self.q_values[slots]
+        visits = np.zeros(max_states, dtype=np.uint32)
+        visits[:len(slots)] = self.visits[slots]
+        self.slots = OrderedDict(zip(self.slots, range(len(slots))))
+        self.max_states = max_states
+        self.q_values, self.visits = q_values, visits
+        self._flat = memoryview(q_values.reshape(-1))
+        self._visits = memoryview(visits)
+
+    def make_state(self, game):
+        """Etat de l'agent : vue et tranches de distance, code entier.
+
+        Meme code que encode_distance_state : les tranches de l'observation
+        compacte (bits 12-23) sont deja les chiffres en base 8.
+        """
+        packed = game.get_observation()[0]
+        return _VIEW_CODES[packed & VIEW_MASK] << VIEW_BITS | packed >> VIEW_BITS
+
+    def num_states(self) -> int:
+        """Nombre d'etats presents dans la Q-table."""
+        return len(self.slots)
+
+    def slot(self, code: int) -> int:
+        """Ligne de la Q-table d'un etat (allouee si besoin), visite comptee.
+
+        Un seul acces compte par pas : celui de get_action ; update relit
+        les lignes sans compter.
+        """
+        slot = self.slots.get(code)
+        if slot is None:
+            self.misses += 1
+            slot = self._allocate(code)
+        else:
+            self.hits += 1
+            self.slots.move_to_end(code)
+        self._visits[slot] += 1
+        return slot
+
+    def _allocate(self, code: int) -> int:
+        """Ligne libre, ou celle de l'etat evince si la table est pleine."""
+        if len(self.slots) < self.max_states:
+            slot = len(self.slots)
+        else:
+            visits = self.visits
+            candidates = islice(self.slots.items(), EVICTION_CANDIDATES)
+            victim, slot = min(candidates, key=lambda item: visits[item[1]])
+            del self.slots[victim]
+            self.evictions += 1
+            self.q_values[slot] = 0
+            self._visits[slot] = 0
+        self.slots[code] = slot
+        return slot
+
+    def stats(self) -> dict:
+        """Taux de succes des acces, evictions et memoire de la Q-table."""
+        lookups = self.hits + self.misses
+        return {
+            "states": len(self.slots),
+            "max_states": self.max_states,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_bytes": self.q_values.nbytes + self.visits.nbytes + self._slots_bytes(),
+        }
+
+    def _slots_bytes(self) -> int:
+        """Memoire de l'OrderedDict des lignes (table, noeuds, entiers)."""
+        size = sys.getsizeof
+        return size(self.slots) + sum(size(code) + size(slot)
+                                      for code, slot in self.slots.items())
+
+    def get_q_values(self, state):
+        """Valeurs Q d'un etat, sans compter l'acces (nulles si absent)."""
+        slot = self.slots.get(state)
+        if slot is None:
+            return np.zeros(self.num_actions, dtype=np.float32)
+        return self.q_values[slot]
+
+    def get_action(self, state, play_mode):
+        """Choisit une action en utilisant la strategie epsilon-greedy."""
+        slot = self.slot(state)
+        if play_mode:
+            return int(self.q_values[slot].argmax())
+
+        if random.random() < self.epsilon:
+            return random.randint(0, self.num_actions - 1)
+        return int(self.q_values[slot].argmax())
+
+    def update(self, state, action, reward, next_state):
+        """Met a jour la Q-table selon l'equation Q-Learning.
+
+        Lignes lues sans compter d'acces (get_action a deja compte state) ;
+        next_state n'est pas alloue : absent, ses valeurs Q sont nulles.
+        """
+        # state vient d'etre utilise : il n'est pas candidat a l'eviction
+        slot = self.slots.get(state)
+        if slot is None:
+            slot = self.slot(state)  # update sans get_action prealable
+        cell = slot * self.num_actions + action
+        next_slot = self.slots.get(next_state)
+
+        flat = self._flat
+        old_value = flat[cell]
+        if next_slot is None:
+            next_max = 0.0
+        else:
+            next_row = next_slot * self.num_actions
+            next_max = max(flat[next_row:next_row + self.num_actions])
+        td_target = reward + (self.gamma * next_max)
+        flat[cell] = old_value + self.alpha * (td_target - old_value)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_flat"]
+        del state["_visits"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._flat = memoryview(self.q_values.reshape(-1))
+        self._visits = memoryview(self.visits)
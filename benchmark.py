@@ -0,0 +1,374 @@
+"""Benchmarks des chemins critiques.
+
+Mesure le moteur (SnakeGame.step avec et sans plans, get_snake_vision, get_observation, _place_apples_randomly,
+LargeSnakeGame.step et get_snake_vision, VecSnakeGame.step), les agents (get_action / update), le plateau de
+launch_Cyrielle et le rendu (display.draw_game_display, driver video SDL
+"dummy") pour plusieurs tailles de grille et longueurs de serpent.
+
+Resultats en JSON (ops/s, ns/op, pic memoire). Avec --baseline, compare a
+un fichier de reference et sort en erreur en cas de regression.
+
+Exemples :
+    python -m benchmark --output bench.json
+    python -m benchmark --grids 10 50 --baseline bench.json --tolerance 0.25
+    python -m benchmark --only SnakeGame.step LargeSnakeGame.step --grids 10 100 1000
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from functools import partial
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np  # noqa: E402
+
+from agent import QLearningAgent, DenseQLearningAgent, encode_state  # noqa: E402
+from largesnakegame import LargeSnakeGame  # noqa: E402
+from snakegame import SnakeGame, VISION_SYMBOLS  # noqa: E402
+from vecsnakegame import VecSnakeGame  # noqa: E402
+
+DEFAULT_GRIDS = (10, 50, 100, 500)
+MAX_OPS = 200_000
+VEC_ENVS = 256
+
+
+def snake_lengths(grid: int) -> list:
+    """Longueurs de serpent testees pour une grille (jusqu'a 90% de grid^2)."""
+    return sorted({3, grid, grid * grid // 2, grid * grid * 9 // 10})
+
+
+def make_game(grid: int, length: int, game_class=SnakeGame) -> SnakeGame:
+    """Cree un jeu dont le serpent fait length segments (en serpentin)."""
+    game = game_class(grid, goal=grid * grid + 1)
+    path = []
+    for y in range(grid):
+        xs = range(grid) if y % 2 == 0 else range(grid - 1, -1, -1)
+        path.extend((x, y) for x in xs)
+        if len(path) >= length:
+            break
+    # La tete est au bout du serpentin, du cote des cases libres
+    game.snake = deque(reversed(path[:length]))
+    game._build_board()
+    game._reset_apples()
+    return game
+
+
+def safe_action(game: SnakeGame) -> int:
+    """Action qui evite murs et serpent si possible (pour garder la longueur)."""
+    head_x, head_y = game.snake[0]
+    grid = game.grid_size
+    moves = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+    start = random.randrange(4)
+    for i in range(4):
+        action = (start + i) % 4
+        x, y = head_x + moves[action][0], head_y + moves[action][1]
+        if 0 <= x < grid and 0 <= y < grid and not game.occupancy[y * grid + x]:
+            return action
+    return start
+
+
+def time_calls(op, min_time: float, between=None, max_ops=MAX_OPS) -> tuple:
+    """Chronometre op() appel par appel ; between() n'est pas chronometre."""
+    clock = time.perf_counter_ns
+    total = 0
+    ops = 0
+    deadline = time.perf_counter() + min_time
+    while ops < max_ops and (ops == 0 or time.perf_counter() < deadline):
+        start = clock()
+        op()
+        total += clock() - start
+        ops += 1
+        if between is not None:
+            between()
+    return ops, total
+
+
+def bench_step(grid, length, min_time, game_class=SnakeGame):
+    """SnakeGame.step avec une politique qui evite les collisions."""
+    state = {"game": make_game(grid, length, game_class)}
+
+    def op():
+        game = state["game"]
+        _, done = game.step(state["action"])
+        state["done"] = done
+
+    def between():
+        if state["done"] or len(state["game"].snake) != length:
+            state["game"] = make_game(grid, length, game_class)
+        state["action"] = safe_action(state["game"])
+
+    state["action"] = safe_action(state["game"])
+    return time_calls(op, min_time, between)
+
+
+def bench_planes_step(grid, length, min_time):
+    """SnakeGame.step avec les plans du plateau maintenus (cf. planes.py)."""
+    return bench_step(grid, length, min_time, partial(SnakeGame, planes=True))
+
+
+def bench_vision(grid, length, min_time, game_class=SnakeGame, method="get_snake_vision"):
+    """SnakeGame.get_snake_vision, cache invalide a chaque appel."""
+    game = make_game(grid, length, game_class)
+
+    def between():
+        game._version += 1
+
+    return time_calls(getattr(game, method), min_time, between)
+
+
+def bench_observation(grid, length, min_time):
+    """SnakeGame.get_observation (entier compact), cache invalide a chaque appel."""
+    return bench_vision(grid, length, min_time, method="get_observation")
+
+
+def bench_large_step(grid, length, min_time):
+    """LargeSnakeGame.step (vision par index ligne / colonne)."""
+    return bench_step(grid, length, min_time, LargeSnakeGame)
+
+
+def bench_large_vision(grid, length, min_time):
+    """LargeSnakeGame.get_snake_vision, cache invalide a chaque appel."""
+    return bench_vision(grid, length, min_time, LargeSnakeGame)
+
+
+def bench_place_apples(grid, length, min_time):
+    """SnakeGame._place_apples_randomly(1), la case etant rendue ensuite."""
+    game = make_game(grid, length)
+    placed = []
+
+    def op():
+        placed.extend(game._place_apples_randomly(1))
+
+    def between():
+        while placed:
+            game.free_cells.add(placed.pop())
+
+    return time_calls(op, min_time, between)
+
+
+def bench_vec_step(grid, length, min_time):
+    """VecSnakeGame.step sur VEC_ENVS plateaux (une op = un plateau avance)."""
+    if length != 3:
+        return None
+    game = VecSnakeGame(VEC_ENVS, grid, goal=grid * grid + 1, max_steps=500, seed=0)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 4, size=(64, VEC_ENVS))
+    counter = iter(range(MAX_OPS))
+
+    def op():
+        game.step(actions[next(counter) % len(actions)])
+
+    ops, total = time_calls(op, min_time)
+    return ops * VEC_ENVS, total
+
+
+def _random_states(count):
+    rng = random.Random(0)
+    return [tuple(rng.choice(VISION_SYMBOLS) for _ in range(4)) for _ in range(count)]
+
+
+def _bench_agent(agent, states, min_time):
+    counter = iter(range(10 * MAX_OPS))
+
+    def op():
+        i = next(counter)
+        state = states[i % len(states)]
+        next_state = states[(i + 1) % len(states)]
+        action = agent.get_action(state, False)
+        agent.update(state, action, -2.0, next_state)
+
+    return time_calls(op, min_time)
+
+
+def bench_agent(grid, length, min_time):
+    """QLearningAgent.get_action + update (etats tuples)."""
+    if length != 3:
+        return None
+    return _bench_agent(QLearningAgent(grid, alpha=0.1), _random_states(1024), min_time)
+
+
+def bench_dense_agent(grid, length, min_time):
+    """DenseQLearningAgent.get_action + update (etats codes entiers)."""
+    if length != 3:
+        return None
+    states = [encode_state(s) for s in _random_states(1024)]
+    return _bench_agent(DenseQLearningAgent(grid, alpha=0.1), states, min_time)
+
+
+def bench_cyrielle_step(grid, length, min_time):
+    """launch_Cyrielle.Board.step (plateau de taille grid)."""
+    if length != 3:
+        return None
+    import launch_Cyrielle
+
+    launch_Cyrielle.BOARD_SIZE = grid
+    state = {"board": launch_Cyrielle.Board()}
+
+    def op():
+        state["board"].step(random.randrange(4))
+
+    def between():
+        if state["board"].is_game_over():
+            state["board"] = launch_Cyrielle.Board()
+
+    return time_calls(op, min_time, between)
+
+
+def bench_draw(grid, length, min_time):
+    """display.draw_game_display + update des cases modifiees (surfaces unies)."""
+    import pygame
+    from display import draw_game_display
+    from launch import calculate_mult_based_on_grid
+
+    pygame.display.init()
+    mult = max(1, calculate_mult_based_on_grid(grid))
+    size = (grid + 2) * mult
+    surface = pygame.display.set_mode((size, size))
+    names = ("green_apple", "red_apple", "snake_segment", "snake_head", "floor", "wall")
+    images = {name: pygame.Surface((mult, mult)) for name in names}
+    state = {"game": make_game(grid, length)}
+
+    def op():
+        pygame.display.update(
+            draw_game_display(surface, state["game"], grid, mult, images))
+
+    def between():
+        game = state["game"]
+        _, done = game.step(safe_action(game))
+        if done or len(game.snake) != length:
+            state["game"] = make_game(grid, length)
+
+    return time_calls(op, min_time, between)
+
+
+BENCHMARKS = {
+    "SnakeGame.step": bench_step,
+    "SnakeGame.step (planes)": bench_planes_step,
+    "SnakeGame.get_snake_vision": bench_vision,
+    "SnakeGame.get_observation": bench_observation,
+    "SnakeGame._place_apples_randomly": bench_place_apples,
+    "LargeSnakeGame.step": bench_large_step,
+    "LargeSnakeGame.get_snake_vision": bench_large_vision,
+    "VecSnakeGame.step": bench_vec_step,
+    "QLearningAgent.get_action+update": bench_agent,
+    "DenseQLearningAgent.get_action+update": bench_dense_agent,
+    "launch_Cyrielle.Board.step": bench_cyrielle_step,
+    "display.draw_game_display": bench_draw,
+}
+
+
+def peak_memory(bench, grid, length) -> int:
+    """Pic memoire (octets) d'une execution courte du benchmark, setup compris."""
+    tracemalloc.start()
+    try:
+        bench(grid, length, min_time=0.0)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(names, grids, min_time: float, memory: bool) -> list:
+    """Execute les benchmarks demandes et retourne la liste des resultats."""
+    results = []
+    for name in names:
+        bench = BENCHMARKS[name]
+        for grid in grids:
+            for length in snake_lengths(grid):
+                random.seed(0)
+                measure = bench(grid, length, min_time)
+                if measure is None:  # longueur sans objet pour ce benchmark
+                    continue
+                ops, total_ns = measure
+                result = {
+                    "name": name,
+                    "grid": grid,
+                    "length": length,
+                    "ops": ops,
+                    "ns_per_op": total_ns / ops,
+                    "ops_per_sec": ops * 1e9 / total_ns if total_ns else float("inf"),
+                }
+                if memory:
+                    result["peak_kib"] = peak_memory(bench, grid, length) / 1024
+                results.append(result)
+                print(f"{name:40s} grid={grid:<4d} len={length:<7d} "
+                      f"{result['ns_per_op']:12.0f} ns/op "
+                      f"{result['ops_per_sec']:12.0f} ops/s", file=sys.stderr)
+    return results
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Liste des regressions (ns/op > reference * (1 + tolerance))."""
+    reference = {(r["name"], r["grid"], r["length"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = reference.get((result["name"], result["grid"], result["length"]))
+        if old is None:
+            continue
+        ratio = result["ns_per_op"] / old["ns_per_op"]
+        if ratio > 1 + tolerance:
+            regressions.append({**result, "baseline_ns_per_op": old["ns_per_op"],
+                                "ratio": ratio})
+    return regressions
+
+
+def parse_arguments():
+    """Recupere les options des benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmarks Snake Q-Learning.")
+    parser.add_argument("--grids", type=int, nargs="+", default=list(DEFAULT_GRIDS),
+                        help="Tailles de grille. Par defaut : 10 50 100 500.")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), default=None,
+                        help="Ne lancer que ces benchmarks.")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Duree minimale de mesure par cas (s). Par defaut : 0.2.")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Ne pas mesurer le pic memoire (tracemalloc).")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Fichier JSON de sortie (stdout par defaut).")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="Fichier JSON de reference pour detecter les regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Ralentissement toléré par rapport a la reference. Par defaut : 0.2.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Lance les benchmarks, ecrit le JSON et verifie les regressions."""
+    args = parse_arguments()
+    names = args.only or list(BENCHMARKS)
+    results = run(names, args.grids, args.min_time, memory=not args.no_memory)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            report["regressions"] = compare(results, json.load(file), args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    for regression in report.get("regressions", []):
+        print(f"REGRESSION {regression['name']} grid={regression['grid']} "
+              f"len={regression['length']} : x{regression['ratio']:.2f}", file=sys.stderr)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Format de sauvegarde binaire des agents.
+
+Fichier .snkq (little-endian) :
+- en-tete fixe de 48 octets : magic "SNKQ", version, type d'agent,
+  nb d'actions, grid_size, nb d'etats, alpha, gamma, epsilon
+- codes des etats visites (int32, cf. agent.encode_state)
+- valeurs Q correspondantes (float32, nb d'etats x nb d'actions)
+- Q-table symetrique (type 2, SymmetricQLearningAgent) : meme contenu que
+  le type 0, codes canoniques uniquement
+- agent lineaire (type 3, LinearQAgent) : poids float32 (nb d'actions x
+  nb de caracteristiques, le nb d'etats de l'en-tete)
+- reseau (type 4, MLPQAgent) : nb d'entrees dans le nb d'etats de
+  l'en-tete, rayon de fenetre, nb de couches cachees et pas d'Adam, tailles
+  des couches cachees (uint32), puis parametres float32 (theta)
+- Q-table bornee (type 1, BoundedQLearningAgent) : codes avec distances
+  (cf. agent.encode_distance_state), du moins au plus recent, puis nb de
+  visites (uint32) et capacite max_states (uint64)
+
+Le chargement lit les tableaux par memory mapping (numpy.memmap) : seules
+les lignes visitees sont recopiees dans la Q-table dense. Les anciennes
+sauvegardes agent_state_sessions_*.pkl sont converties automatiquement,
+sauf si des etats ne sont pas des visions 4 directions (ex. anciens etats
+de 20 entiers) : le format n'a pas de place pour eux, la conversion est
+refusee (ValueError) et la sauvegarde pickle reste seule.
+
+Conversion explicite : python checkpoint.py agent_state_sessions_*.pkl
+"""
+import math
+import os
+import pickle
+import struct
+import sys
+
+import numpy as np
+
+from agent import (
+    QLearningAgent, DenseQLearningAgent, SymmetricQLearningAgent,
+    BoundedQLearningAgent, NUM_STATE_CODES
+    )
+from features import NUM_FEATURES
+from linearagent import LinearQAgent
+from mlpagent import MLPQAgent
+
+MAGIC = b"SNKQ"
+VERSION = 1
+KIND_TABLE = 0  # Q-table dense
+KIND_BOUNDED = 1  # Q-table bornee, etats avec distances
+KIND_SYMMETRIC = 2  # Q-table dense d'etats canoniques (rotations / miroirs)
+KIND_LINEAR = 3  # poids d'une approximation lineaire de Q
+KIND_MLP = 4  # parametres d'un reseau de neurones (MLPQAgent)
+HEADER = struct.Struct("<4sHHHHIQddd")
+MLP_LAYOUT = struct.Struct("<HHd")
+TRAILER = struct.Struct("<Q")
+EXTENSION = ".snkq"
+
+
+def save_checkpoint(agent: QLearningAgent, filename: str) -> int:
+    """Ecrit l'agent au format binaire, retourne le nb d'etats ecrits.
+
+    Leve ValueError, sans rien ecrire, si la Q-table contient des etats hors
+    vision 4 directions (cf. DenseQLearningAgent._extra_states).
+    """
+    if isinstance(agent, BoundedQLearningAgent):
+        return _save_bounded(agent, filename)
+    if isinstance(agent, LinearQAgent):
+        return _save_linear(agent, filename)
+    if isinstance(agent, MLPQAgent):
+        return _save_mlp(agent, filename)
+    if not isinstance(agent, DenseQLearningAgent):
+        agent = DenseQLearningAgent.from_agent(agent)
+    visited = agent.visited
+    extra = int(np.count_nonzero(visited[NUM_STATE_CODES:]))
+    if extra:
+        raise ValueError(f"{extra} etats hors vision 4 directions : "
+                         f"non representables au format {EXTENSION}.")
+    codes = np.flatnonzero(visited).astype("<i4")
+    values = agent.q_values[codes].astype("<f4")
+    alpha = math.nan if agent.alpha is None else agent.alpha
+    kind = KIND_SYMMETRIC if isinstance(agent, SymmetricQLearningAgent) else KIND_TABLE
+    header = HEADER.pack(MAGIC, VERSION, kind, agent.num_actions, 0,
+                         agent.grid_size, len(codes), alpha, agent.gamma,
+                         agent.epsilon)
+    with open(filename, "wb") as file:
+        file.write(header)
+        file.write(codes.tobytes())
+        file.write(values.tobytes())
+    return len(codes)
+
+
+def _save_bounded(agent: BoundedQLearningAgent, filename: str) -> int:
+    codes = np.fromiter(agent.slots.keys(), dtype="<i4", count=len(agent.slots))
+    slots = np.fromiter(agent.slots.values(), dtype=np.int64, count=len(agent.slots))
+    alpha = math.nan if agent.alpha is None else agent.alpha
+    header = HEADER.pack(MAGIC, VERSION, KIND_BOUNDED, agent.num_actions, 0,
+                         agent.grid_size, len(codes), alpha, agent.gamma,
+                         agent.epsilon)
+    with open(filename, "wb") as file:
+        file.write(header)
+        file.write(codes.tobytes())
+        file.write(agent.q_values[slots].astype("<f4").tobytes())
+        file.write(agent.visits[slots].astype("<u4").tobytes())
+        file.write(TRAILER.pack(agent.max_states))
+    return len(codes)
+
+
+def _save_linear(agent: LinearQAgent, filename: str) -> int:
+    header = HEADER.pack(MAGIC, VERSION, KIND_LINEAR, agent.num_actions, 0,
+                         agent.grid_size, NUM_FEATURES, agent.alpha,
+                         agent.gamma, agent.epsilon)
+    with open(filename, "wb") as file:
+        file.write(header)
+        file.write(agent.weights.astype("<f4").tobytes())
+    return NUM_FEATURES
+
+
+def _save_mlp(agent: MLPQAgent, filename: str) -> int:
+    alpha = math.nan if agent.alpha is None else agent.alpha
+    header = HEADER.pack(MAGIC, VERSION, KIND_MLP, agent.num_actions, 0,
+                         agent.grid_size, agent.num_inputs, alpha,
+                         agent.gamma, agent.epsilon)
+    with open(filename, "wb") as file:
+        file.write(header)
+        file.write(MLP_LAYOUT.pack(agent.window, len(agent.hidden),
+                                   agent.learning_rate))
+        file.write(np.array(agent.hidden, dtype="<u4").tobytes())
+        file.write(agent.theta.astype("<f4").tobytes())
+    return agent.num_inputs
+
+
+def read_header(filename: str) -> dict:
+    """Lit et verifie l'en-tete d'un fichier .snkq."""
+    with open(filename, "rb") as file:
+        raw = file.read(HEADER.size)
+    if len(raw) != HEADER.size:
+        raise ValueError(f"{filename} : fichier tronque.")
+    (magic, version, kind, num_actions, _, grid_size, num_states,
+     alpha, gamma, epsilon) = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{filename} : ce n'est pas une sauvegarde {EXTENSION}.")
+    if version > VERSION:
+        raise ValueError(f"{filename} : version {version} non supportee.")
+    return {
+        "version": version, "kind": kind, "num_actions": num_actions,
+        "grid_size": grid_size, "num_states": num_states,
+        "alpha": None if math.isnan(alpha) else alpha,
+        "gamma": gamma, "epsilon": epsilon,
+    }
+
+
+def load_checkpoint(filename: str) -> DenseQLearningAgent:
+    """Charge un agent depuis un fichier .snkq (memory mapping)."""
+    info = read_header(filename)
+    if info["kind"] == KIND_BOUNDED:
+        return _load_bounded(filename, info)
+    if info["kind"] == KIND_LINEAR:
+        return _load_linear(filename, info)
+    if info["kind"] == KIND_MLP:
+        return _load_mlp(filename, info)
+    agent_class = (SymmetricQLearningAgent if info["kind"] == KIND_SYMMETRIC
+                   else DenseQLearningAgent)
+    agent = agent_class(info["grid_size"], info["num_actions"],
+                        info["epsilon"], info["alpha"], info["gamma"])
+    count = info["num_states"]
+    if count:
+        codes = np.memmap(filename, dtype="<i4", mode="r",
+                          offset=HEADER.size, shape=(count,))
+        values = np.memmap(filename, dtype="<f4", mode="r",
+                           offset=HEADER.size + 4 * count,
+                           shape=(count, info["num_actions"]))
+        agent.q_values[codes] = values
+        agent.visited[codes] = True
+        del codes, values  # libere le mapping
+    return agent
+
+
+def _load_bounded(filename: str, info: dict) -> BoundedQLearningAgent:
+    count = info["num_states"]
+    num_actions = info["num_actions"]
+    with open(filename, "rb") as file:
+        file.seek(HEADER.size)
+        codes = np.fromfile(file, dtype="<i4", count=count)
+        values = np.fromfile(file, dtype="<f4", count=count * num_actions)
+        visits = np.fromfile(file, dtype="<u4", count=count)
+        (max_states,) = TRAILER.unpack(file.read(TRAILER.size))
+    agent = BoundedQLearningAgent(info["grid_size"], num_actions,
+                                  info["epsilon"], info["alpha"],
+                                  info["gamma"], max_states=max_states)
+    # Les etats sont ranges du moins au plus recent : l'ordre est conserve
+    agent.q_values[:count] = values.reshape(count, num_actions)
+    agent.visits[:count] = visits
+    agent.slots.update(zip(codes.tolist(), range(count)))
+    return agent
+
+
+def _load_linear(filename: str, info: dict) -> LinearQAgent:
+    if info["num_states"] != NUM_FEATURES:
+        raise ValueError(f"{filename} : {info['num_states']} caracteristiques, "
+                         f"{NUM_FEATURES} attendues.")
+    agent = LinearQAgent(info["grid_size"], info["num_actions"], info["epsilon"],
+                         info["alpha"], info["gamma"])
+    weights = np.fromfile(filename, dtype="<f4", offset=HEADER.size,
+                          count=info["num_actions"] * NUM_FEATURES)
+    agent.weights[:] = weights.reshape(info["num_actions"], NUM_FEATURES)
+    return agent
+
+
+def _load_mlp(filename: str, info: dict) -> MLPQAgent:
+    with open(filename, "rb") as file:
+        file.seek(HEADER.size)
+        window, num_hidden, learning_rate = MLP_LAYOUT.unpack(file.read(MLP_LAYOUT.size))
+        hidden = np.fromfile(file, dtype="<u4", count=num_hidden).tolist()
+        agent = MLPQAgent(info["grid_size"], info["num_actions"], info["epsilon"],
+                          info["alpha"], info["gamma"], hidden=hidden, window=window)
+        if agent.num_inputs != info["num_states"]:
+            raise ValueError(f"{filename} : {info['num_states']} entrees, "
+                             f"{agent.num_inputs} attendues.")
+        theta = np.fromfile(file, dtype="<f4", count=agent.theta.size)
+    if theta.size != agent.theta.size:
+        raise ValueError(f"{filename} : fichier tronque.")
+    agent.learning_rate = learning_rate
+    agent.theta[:] = theta
+    agent.target_theta[:] = theta
+    return agent
+
+
+def convert_pickle(filename: str, output=None) -> str:
+    """Convertit une ancienne sauvegarde pickle en .snkq, retourne le chemin.
+
+    Conversion sans perte uniquement : ValueError si des etats ne sont pas
+    representables (aucun fichier n'est ecrit).
+    """
+    with open(filename, "rb") as file:
+        agent = pickle.load(file)
+    output = output or os.path.splitext(filename)[0] + EXTENSION
+    save_checkpoint(agent, output)
+    return output
+
+
+def describe(agent: QLearningAgent, filename: str) -> None:
+    """Resume d'un agent charge (sans parcourir la Q-table entree par entree)."""
+    if isinstance(agent, DenseQLearningAgent):
+        values = agent.q_values[agent.visited]
+    elif isinstance(agent, BoundedQLearningAgent):
+        values = agent.q_values[:agent.num_states()]
+    else:
+        values = np.array(list(agent.q_table.values()), dtype=np.float32)
+    print(f"Etat de l'agent charge depuis {filename} "
+          f"({os.path.getsize(filename)} octets).")
+    print(f"Alpha: {agent.alpha}, Gamma: {agent.gamma}, Epsilon: {agent.epsilon}")
+    if isinstance(agent, LinearQAgent):
+        print(f"Agent lineaire : {agent.weights.size} poids "
+              f"({agent.num_actions} actions x {NUM_FEATURES} caracteristiques), "
+              f"|W| max = {np.abs(agent.weights).max():.3f}")
+        return
+    if isinstance(agent, MLPQAgent):
+        print(f"Reseau : couches {' x '.join(map(str, agent.sizes))} "
+              f"(fenetre de rayon {agent.window}), {agent.theta.size} parametres.")
+        return
+    print(f"taille de la Q-table: {len(values)} etats enregistres.")
+    if len(values):
+        print(f"Q min = {values.min():.3f}, Q max = {values.max():.3f}, "
+              f"Q moyen = {values.mean():.3f}")
+    if isinstance(agent, SymmetricQLearningAgent):
+        print("Q-table symetrique : etats canoniques (rotations / miroirs).")
+    if isinstance(agent, BoundedQLearningAgent):
+        print(f"Q-table bornee : {agent.num_states()}/{agent.max_states} etats.")
+
+
+def main() -> None:
+    """Convertit les fichiers .pkl donnes en argument."""
+    for filename in sys.argv[1:]:
+        try:
+            print(f"{filename} -> {convert_pickle(filename)}")
+        except ValueError as error:
+            print(f"{filename} : non converti, {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,19 @@ Dans une fenetre pygame : la progression du jeu
 Dans le terminal : la vision depuis la tete du serpent.
 """
 import pygame
+import weakref
 
+from itertools import islice
 from pygame.locals import *
 from snakegame import SnakeGame
 
+# Couche statique de la derniere (grid, mult, skin) : un seul emplacement
+# (grid, mult, images, surface), images compare par identite et garde en
+# reference ; derniere frame par surface (cle faible : une surface liberee
+# sort du cache, son id ne peut pas etre reutilise par une autre)
+_background = None
+_last_frames = weakref.WeakKeyDictionary()
+
 
 # def display_snake_vision(game: SnakeGame):
 #     """Affiche la vision du serpent sur le terminal."""
@@ -103,41 +112,97 @@ def draw_grid(DISPLAYSURF, grid: int, mult: int, line_color=(200, 175, 175)):
         pygame.draw.line(DISPLAYSURF, line_color, (0, y * mult), ((grid + 1) * mult, y * mult))
 
 
-def draw_game_display(DISPLAYSURF, game: SnakeGame, grid: int, mult: int, images: dict):
-    """Affiche les assets du jeu."""
-    # Recupere l'etat actuel du jeu
-    snake, green_apples, red_apple = game.get_state()
+def draw_pause_message(DISPLAYSURF):
+    """Affiche le message de pause au centre de la fenetre."""
+    font = pygame.font.SysFont(None, 36)
+    text = font.render(
+        "PAUSE - Appuyer sur ESPACE pour continuer.",
+        True, (255, 255, 255)
+        )
+    text_rect = text.get_rect(
+        center=(DISPLAYSURF.get_width() // 2,
+                DISPLAYSURF.get_height() // 2)
+        )
+    DISPLAYSURF.blit(text, text_rect)
+
+
+def render_background(grid: int, mult: int, images: dict):
+    """Couche statique (sol, quadrillage, murs), recalculee si (grid, mult, skin) change."""
+    global _background
+    cached = _background
+    if (cached is not None and cached[0] == grid and cached[1] == mult
+            and cached[2] is images):
+        return cached[3]
+
     fullgrid = grid + 2
+    background = pygame.Surface((fullgrid * mult, fullgrid * mult))
 
     # Affiche le sol
     for x in range(fullgrid):
         for y in range(fullgrid):
-            DISPLAYSURF.blit(images["floor"], (x * mult, y * mult))
-    
+            background.blit(images["floor"], (x * mult, y * mult))
+
     # Affiche le quadrillage
-    draw_grid(DISPLAYSURF, fullgrid, mult)
+    draw_grid(background, fullgrid, mult)
 
     # Affiche les murs
     for x in range(fullgrid):  # parcourt les colonnes
-        DISPLAYSURF.blit(images["wall"], (x * mult, 0))  # haut
-        DISPLAYSURF.blit(images["wall"], (x * mult, (grid + 1) * mult))  # bas
+        background.blit(images["wall"], (x * mult, 0))  # haut
+        background.blit(images["wall"], (x * mult, (grid + 1) * mult))  # bas
     for y in range(fullgrid):  # parcourt les lignes
-        DISPLAYSURF.blit(images["wall"], (0, y * mult))  # gauche
-        DISPLAYSURF.blit(images["wall"], ((grid + 1) * mult, y * mult))
-
-    # Affiche le serpent
-    x, y = snake[0]
-    DISPLAYSURF.blit(images["snake_head"], ((x + 1) * mult, (y + 1) * mult))
-    for segment in snake[1:]:
-        x, y = segment
-        # pygame.draw.rect(DISPLAYSURF, BLUE, (x * mult, y * mult, mult, mult))
-        DISPLAYSURF.blit(images["snake_segment"], ((x + 1) * mult, (y + 1) * mult))
-
-    # Affiche les pommes vertes
-    for apple in green_apples:
-        x, y = apple
-        DISPLAYSURF.blit(images["green_apple"], ((x + 1) * mult, (y + 1) * mult))
+        background.blit(images["wall"], (0, y * mult))  # gauche
+        background.blit(images["wall"], ((grid + 1) * mult, y * mult))
+
+    _background = (grid, mult, images, background)
+    return background
+
 
-    # Affiche la pomme rouge
-    x, y = red_apple
-    DISPLAYSURF.blit(images["red_apple"], ((x + 1) * mult, (y + 1) * mult))
\ No newline at end of file
+def invalidate_display(DISPLAYSURF):
+    """Force un redessin complet a la prochaine frame (ex. apres la pause)."""
+    _last_frames.pop(DISPLAYSURF, None)
+
+
+def draw_game_display(DISPLAYSURF, game: SnakeGame, grid: int, mult: int, images: dict):
+    """Affiche les assets du jeu, retourne les rectangles modifies.
+
+    Seules les cases qui ont change depuis la frame precedente sont
+    redessinees (fond recopie depuis la couche statique en cache) : passer
+    le resultat a pygame.display.update() plutot que de faire un flip().
+    """
+    # Recupere l'etat actuel du jeu
+    snake, green_apples, red_apple = game.get_state()
+    background = render_background(grid, mult, images)
+
+    # Contenu de chaque case occupee (meme ordre de superposition qu'avant)
+    frame = {snake[0]: "snake_head"}
+    for segment in islice(snake, 1, None):
+        frame[segment] = "snake_segment"
+    for apple in green_apples:
+        frame[apple] = "green_apple"
+    if red_apple is not None:  # absente si le plateau est plein
+        frame[red_apple] = "red_apple"
+
+    previous = _last_frames.get(DISPLAYSURF)
+    _last_frames[DISPLAYSURF] = (background, frame)
+
+    # Premiere frame (ou changement de grille/skin) : tout redessiner
+    if previous is None or previous[0] is not background:
+        DISPLAYSURF.blit(background, (0, 0))
+        for (x, y), name in frame.items():
+            DISPLAYSURF.blit(images[name], ((x + 1) * mult, (y + 1) * mult))
+        return [DISPLAYSURF.get_rect()]
+
+    last = previous[1]
+    dirty = [cell for cell, name in frame.items() if last.get(cell) != name]
+    dirty.extend(cell for cell in last if cell not in frame)
+
+    rects = []
+    for cell in dirty:
+        x, y = cell
+        rect = pygame.Rect((x + 1) * mult, (y + 1) * mult, mult, mult)
+        DISPLAYSURF.blit(background, rect, area=rect)
+        name = frame.get(cell)
+        if name is not None:
+            DISPLAYSURF.blit(images[name], rect)
+        rects.append(rect)
+    return rects
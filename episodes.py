@@ -0,0 +1,398 @@
+"""Enregistrement et relecture deterministes des parties.
+
+Une partie est entierement determinee par la graine du jeu (cf.
+SnakeGame.reset(seed=...)) et la suite des actions : le journal ne stocke
+donc que cela, plus un resume du resultat pour pouvoir trier les parties
+sans les rejouer.
+
+Fichier .snke (little-endian, ajout seul) :
+- en-tete de 8 octets : magic "SNKE", version, options (bit 0 : parties
+  jouees avec LargeSnakeGame, dont le tirage des pommes differe)
+- puis un enregistrement par partie : en-tete fixe de 29 octets (graine,
+  grid_size, goal, nb de pas, longueur finale, longueur max, recompense,
+  cause de la fin) suivi des actions sur 2 bits (4 actions par octet)
+
+Une partie de 500 pas tient en 154 octets.
+
+Relecture :
+    python episodes.py parties.snke --list --best 10
+    python episodes.py parties.snke --episode 42 --seek 120
+    python episodes.py parties.snke --episode 42 --render --fps 10
+    python episodes.py parties.snke --verify
+"""
+import argparse
+import heapq
+import os
+import random
+import struct
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
+from largesnakegame import LargeSnakeGame
+from snakegame import SnakeGame, DEATH_CAUSES
+
+MAGIC = b"SNKE"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sHH")
+RECORD = struct.Struct("<QHHIIIfB")
+EXTENSION = ".snke"
+FLAG_LARGE = 1
+BUFFER_SIZE = 1 << 16
+
+
+def pack_actions(actions: bytes) -> bytes:
+    """Regroupe des actions (0-3, un octet chacune) par 4 dans un octet."""
+    values = np.frombuffer(actions, dtype=np.uint8)
+    padded = np.zeros(-(-len(values) // 4) * 4, dtype=np.uint8)
+    padded[:len(values)] = values
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] | quads[:, 1] << 2 | quads[:, 2] << 4
+            | quads[:, 3] << 6).tobytes()
+
+
+def unpack_actions(packed: bytes, steps: int) -> bytes:
+    """Inverse de pack_actions (steps actions, un octet chacune)."""
+    values = np.frombuffer(packed, dtype=np.uint8)
+    quads = np.stack([(values >> shift) & 3 for shift in (0, 2, 4, 6)], axis=1)
+    return quads.reshape(-1)[:steps].tobytes()
+
+
+class Episode(NamedTuple):
+    """Partie relue depuis le journal (actions encore compressees)."""
+    index: int
+    seed: int
+    grid: int
+    goal: int
+    steps: int
+    final_length: int
+    max_length: int
+    reward: float
+    death_cause: str
+    packed_actions: bytes
+    large: bool = False
+
+    @property
+    def actions(self) -> bytes:
+        return unpack_actions(self.packed_actions, self.steps)
+
+
+class EpisodeRecorder:
+    def __init__(self, filename: str, seed=None, large=False):
+        """Ouvre le journal en ajout (en-tete ecrit s'il est nouveau).
+
+        seed : graine du generateur des graines de parties (optionnelle).
+        large : parties jouees avec LargeSnakeGame.
+        """
+        self.filename = filename
+        flags = FLAG_LARGE if large else 0
+        is_new = not os.path.exists(filename) or os.path.getsize(filename) == 0
+        if not is_new and read_flags(filename) != flags:
+            raise ValueError(f"{filename} : journal ecrit avec un autre moteur de jeu.")
+        self.file = open(filename, "ab", buffering=BUFFER_SIZE)
+        if is_new:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION, flags))
+        self.seeds = random.Random(seed)
+        self.seed = None
+        self.actions = bytearray()
+        self.count = 0
+
+    def begin(self) -> int:
+        """Commence une partie, retourne la graine a passer a game.reset()."""
+        self.seed = self.seeds.getrandbits(63)
+        self.actions.clear()
+        return self.seed
+
+    def record(self, action: int) -> None:
+        self.actions.append(action)
+
+    def end(self, game: SnakeGame, reward: float, max_length: int) -> None:
+        """Ecrit la partie en cours avec son resultat."""
+        self.file.write(RECORD.pack(
+            self.seed, game.grid_size, game.init_goal, len(self.actions),
+            game.get_snake_length(), max_length, reward,
+            DEATH_CAUSES.index(game.death_cause)))
+        self.file.write(pack_actions(self.actions))
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read_file_header(file, filename: str) -> int:
+    """Lit et verifie l'en-tete du journal, retourne les options."""
+    magic, version, flags = FILE_HEADER.unpack(file.read(FILE_HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{filename} : ce n'est pas un journal {EXTENSION}.")
+    if version > VERSION:
+        raise ValueError(f"{filename} : version {version} non supportee.")
+    return flags
+
+
+def read_flags(filename: str) -> int:
+    """Options du journal (cf. FLAG_LARGE)."""
+    with open(filename, "rb") as file:
+        return _read_file_header(file, filename)
+
+
+def read_episodes(filename: str, with_actions=True):
+    """Generateur des parties du journal, dans l'ordre d'enregistrement.
+
+    Sans with_actions, les actions sont sautees (packed_actions vide) :
+    utile pour trier des millions de parties sur leur resume.
+    """
+    with open(filename, "rb") as file:
+        large = bool(_read_file_header(file, filename) & FLAG_LARGE)
+        index = 0
+        while True:
+            raw = file.read(RECORD.size)
+            if len(raw) < RECORD.size:
+                return  # fin du fichier (ou partie en cours d'ecriture)
+            (seed, grid, goal, steps, final_length, max_length, reward,
+             cause) = RECORD.unpack(raw)
+            size = -(-steps // 4)
+            if with_actions:
+                packed = file.read(size)
+                if len(packed) < size:
+                    return
+            else:
+                file.seek(size, os.SEEK_CUR)
+                packed = b""
+            yield Episode(index, seed, grid, goal, steps, final_length,
+                          max_length, reward, DEATH_CAUSES[cause], packed, large)
+            index += 1
+
+
+def read_episode(filename: str, index: int) -> Episode:
+    """Retourne la partie numero index du journal."""
+    for episode in read_episodes(filename):
+        if episode.index == index:
+            return episode
+    raise IndexError(f"{filename} : pas de partie {index}.")
+
+
+class EpisodeReplay:
+    def __init__(self, episode: Episode):
+        """Rejoue une partie pas a pas, avec retour en arriere possible."""
+        self.episode = episode
+        self.actions = episode.actions
+        self.restart()
+
+    def restart(self):
+        """Revient a l'etat initial de la partie."""
+        episode = self.episode
+        game_class = LargeSnakeGame if episode.large else SnakeGame
+        self.game = game_class(episode.grid, episode.goal, seed=episode.seed)
+        self.position = 0  # nb d'actions deja jouees
+        self.reward = 0  # recompense cumulee
+        self.max_length = self.game.get_snake_length()
+        self.done = False
+
+    def step(self) -> bool:
+        """Joue l'action suivante, retourne False a la fin de la partie."""
+        if self.position >= len(self.actions):
+            return False
+        reward, self.done = self.game.step(self.actions[self.position])
+        self.position += 1
+        self.reward += reward
+        self.max_length = max(self.max_length, self.game.get_snake_length())
+        return True
+
+    def seek(self, position: int) -> None:
+        """Se place apres position actions (resimulation si retour en arriere)."""
+        position = max(0, min(position, len(self.actions)))
+        if position < self.position:
+            self.restart()
+        while self.position < position:
+            self.step()
+
+    def matches(self) -> bool:
+        """Verifie, en fin de partie, que le resultat est celui enregistre."""
+        episode = self.episode
+        return (self.position == episode.steps
+                and self.game.get_snake_length() == episode.final_length
+                and self.max_length == episode.max_length
+                and np.float32(self.reward) == np.float32(episode.reward)
+                and self.game.death_cause == episode.death_cause)
+
+
+def board_to_text(game: SnakeGame) -> str:
+    """Plateau en texte : # mur, H tete, o corps, G/R pommes, . vide."""
+    grid = game.grid_size
+    rows = [["."] * grid for _ in range(grid)]
+    for x, y in game.green_apples:
+        rows[y][x] = "G"
+    if game.red_apple is not None:
+        x, y = game.red_apple
+        rows[y][x] = "R"
+    for i, (x, y) in enumerate(game.snake):
+        if 0 <= x < grid and 0 <= y < grid:
+            rows[y][x] = "H" if i == 0 else "o"
+    wall = "#" * (grid + 2)
+    return "\n".join([wall] + ["#" + "".join(row) + "#" for row in rows] + [wall])
+
+
+def describe_episode(episode: Episode) -> str:
+    return (f"partie {episode.index:>8d} : seed={episode.seed} "
+            f"grid={episode.grid} steps={episode.steps} "
+            f"longueur={episode.final_length} max={episode.max_length} "
+            f"reward={episode.reward:g} fin={episode.death_cause or '-'}")
+
+
+def list_episodes(filename: str, best=None, worst=None, key="max_length") -> None:
+    """Affiche le resume des parties (ou des best meilleures / worst pires)."""
+    episodes = read_episodes(filename, with_actions=False)
+    sort_key = (lambda e: (getattr(e, key), e.reward))
+    if best:
+        episodes = heapq.nlargest(best, episodes, key=sort_key)
+    elif worst:
+        episodes = heapq.nsmallest(worst, episodes, key=sort_key)
+    for episode in episodes:
+        print(describe_episode(episode))
+
+
+def verify_episodes(filename: str) -> int:
+    """Rejoue toutes les parties et compte celles qui different du journal."""
+    mismatches = 0
+    total = 0
+    for episode in read_episodes(filename):
+        replay = EpisodeReplay(episode)
+        replay.seek(episode.steps)
+        total += 1
+        if not replay.matches():
+            mismatches += 1
+            print(f"Ecart : {describe_episode(episode)} -> rejoue : "
+                  f"steps={replay.position} "
+                  f"longueur={replay.game.get_snake_length()} "
+                  f"max={replay.max_length} reward={replay.reward:g} "
+                  f"fin={replay.game.death_cause or '-'}")
+    print(f"{total} parties rejouees, {mismatches} ecart(s).")
+    return mismatches
+
+
+def print_position(replay: EpisodeReplay) -> None:
+    print(f"pas {replay.position}/{len(replay.actions)} "
+          f"reward cumulee={replay.reward:g} "
+          f"longueur={replay.game.get_snake_length()}")
+    print(board_to_text(replay.game))
+
+
+def step_in_terminal(replay: EpisodeReplay) -> None:
+    """Avance d'un pas a chaque Entree (q pour quitter, nombre = aller au pas)."""
+    print_position(replay)
+    while True:
+        command = input("> ").strip()
+        if command == "q":
+            return
+        if command.isdigit():
+            replay.seek(int(command))
+        elif not replay.step():
+            print("Fin de la partie.")
+        print_position(replay)
+
+
+def render_episode(replay: EpisodeReplay, fps: float) -> None:
+    """Affiche la partie dans une fenetre pygame.
+
+    ESPACE : pause / reprise ; fleches droite / gauche : pas suivant /
+    precedent ; DEBUT / FIN : debut / fin de la partie.
+    """
+    import pygame
+    from display import draw_game_display, invalidate_display
+    from launch import calculate_mult_based_on_grid, load_images
+
+    pygame.init()
+    grid = replay.episode.grid
+    mult = calculate_mult_based_on_grid(grid)
+    surface = pygame.display.set_mode(((grid + 2) * mult, (grid + 2) * mult))
+    pygame.display.set_caption(f"Snake replay - partie {replay.episode.index}")
+    images = load_images(mult)
+    invalidate_display(surface)
+    clock = pygame.time.Clock()
+    playing = True
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key == pygame.K_SPACE:
+                playing = not playing
+            elif event.key == pygame.K_RIGHT:
+                replay.step()
+            elif event.key == pygame.K_LEFT:
+                replay.seek(replay.position - 1)
+            elif event.key == pygame.K_HOME:
+                replay.seek(0)
+            elif event.key == pygame.K_END:
+                replay.seek(len(replay.actions))
+        if playing and not replay.step():
+            playing = False
+        pygame.display.update(
+            draw_game_display(surface, replay.game, grid, mult, images))
+        pygame.display.set_caption(
+            f"Snake replay - partie {replay.episode.index} - "
+            f"pas {replay.position}/{len(replay.actions)}")
+        clock.tick(fps)
+
+
+def parse_arguments():
+    """Recupere les options de la relecture."""
+    parser = argparse.ArgumentParser(description="Relecture des parties enregistrees.")
+    parser.add_argument("filename", help="Journal ecrit par --record.")
+    parser.add_argument("--list", action="store_true",
+                        help="Affiche le resume des parties.")
+    parser.add_argument("--best", type=int, default=None,
+                        help="Avec --list : seulement les N meilleures parties.")
+    parser.add_argument("--worst", type=int, default=None,
+                        help="Avec --list : seulement les N pires parties.")
+    parser.add_argument("--key", choices=("max_length", "final_length", "reward", "steps"),
+                        default="max_length",
+                        help="Critere de tri de --best / --worst. Par defaut : max_length.")
+    parser.add_argument("--episode", type=int, default=None,
+                        help="Numero de la partie a rejouer.")
+    parser.add_argument("--seek", type=int, default=None,
+                        help="Affiche le plateau apres SEEK pas (texte).")
+    parser.add_argument("--step", action="store_true",
+                        help="Rejoue pas a pas dans le terminal.")
+    parser.add_argument("--render", action="store_true",
+                        help="Rejoue dans une fenetre pygame.")
+    parser.add_argument("--fps", type=float, default=10,
+                        help="Images par seconde de --render. Par defaut : 10.")
+    parser.add_argument("--verify", action="store_true",
+                        help="Rejoue toutes les parties et compare au resume enregistre.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+    if args.verify:
+        sys.exit(1 if verify_episodes(args.filename) else 0)
+    if args.list or args.episode is None:
+        list_episodes(args.filename, args.best, args.worst, args.key)
+        return
+
+    episode = read_episode(args.filename, args.episode)
+    print(describe_episode(episode))
+    replay = EpisodeReplay(episode)
+    if args.render:
+        replay.seek(args.seek or 0)
+        render_episode(replay, args.fps)
+    elif args.step:
+        replay.seek(args.seek or 0)
+        step_in_terminal(replay)
+    else:
+        replay.seek(episode.steps if args.seek is None else args.seek)
+        print_position(replay)
+
+
+if __name__ == "__main__":
+    main()
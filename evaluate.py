@@ -0,0 +1,226 @@
+"""Evaluation des agents sauvegardes.
+
+Charge une sauvegarde (.snkq ou .pkl) et joue N parties gloutonnes (sans
+exploration ni apprentissage, sans affichage) reparties sur un pool de
+processus. La partie i utilise la graine seed + i : deux evaluations d'un
+meme agent jouent exactement les memes parties.
+
+Rapport : longueur (moyenne, mediane, percentiles), longueur max, taux de
+parties atteignant l'objectif, pas survecus et cause de fin (mur, serpent,
+ou limite de pas atteinte ; une pomme rouge ne tue jamais le serpent).
+
+Avec un dossier, toutes les sauvegardes agent_state_sessions_*.snkq / .pkl
+qu'il contient sont evaluees dans l'ordre du nombre de sessions, ce qui
+donne une courbe d'apprentissage.
+
+Exemples :
+    python evaluate.py agent_state_sessions_1000.snkq --episodes 1000
+    python evaluate.py . --episodes 200 --output courbe.csv --plot courbe.png
+"""
+import argparse
+import csv
+import glob
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from checkpoint import load_checkpoint
+from launch import MAX_STEPS
+from snakegame import SnakeGame, DEATH_CAUSES
+
+PERCENTILES = (10, 25, 75, 90)
+OUTCOMES = (*(cause for cause in DEATH_CAUSES if cause), "max_steps")
+CHECKPOINT_PATTERN = re.compile(r"agent_state_sessions_(\d+)\.(snkq|pkl)$")
+
+_agent = None  # agent du processus (cf. _init_worker)
+
+
+def load_agent(filename: str):
+    """Charge un agent sans rien ecrire sur le disque (pas de conversion)."""
+    if filename.endswith(".pkl"):
+        with open(filename, "rb") as file:
+            return pickle.load(file)
+    return load_checkpoint(filename)
+
+
+def _init_worker(filename: str) -> None:
+    global _agent
+    _agent = load_agent(filename)
+
+
+def play_episode(agent, grid: int, goal: int, seed: int, max_steps=MAX_STEPS) -> tuple:
+    """Joue une partie gloutonne, retourne (longueur finale, longueur max, pas, fin)."""
+    game = SnakeGame(grid, goal=goal, seed=seed)
+    state = agent.make_state(game)
+    max_length = game.get_snake_length()
+    steps = 0
+    done = False
+    while not done and steps < max_steps:
+        _, done = game.step(agent.get_action(state, True))
+        state = agent.make_state(game)
+        max_length = max(max_length, game.get_snake_length())
+        steps += 1
+    outcome = game.death_cause if done else "max_steps"
+    return game.get_snake_length(), max_length, steps, outcome
+
+
+def _play(args: tuple) -> tuple:
+    return play_episode(_agent, *args)
+
+
+def evaluate(filename: str, episodes=100, grid=None, goal=10, seed=0,
+             workers=None, max_steps=MAX_STEPS) -> dict:
+    """Evalue la sauvegarde filename sur episodes parties gloutonnes."""
+    if grid is None:
+        grid = load_agent(filename).grid_size
+    tasks = [(grid, goal, seed + i, max_steps) for i in range(episodes)]
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(filename,)) as pool:
+        results = list(pool.map(_play, tasks,
+                                chunksize=max(1, episodes // (4 * workers))))
+    return summarize(results, goal)
+
+
+def summarize(results: list, goal: int) -> dict:
+    """Statistiques d'un lot de parties (cf. play_episode)."""
+    final_lengths, max_lengths, steps, outcomes = zip(*results)
+    lengths = np.array(max_lengths)
+    steps = np.array(steps)
+    summary = {
+        "episodes": len(results),
+        "mean_length": float(lengths.mean()),
+        "median_length": float(np.median(lengths)),
+        **{f"p{q}_length": float(np.percentile(lengths, q)) for q in PERCENTILES},
+        "max_length": int(lengths.max()),
+        "mean_final_length": float(np.mean(final_lengths)),
+        "goal_rate": float(np.mean(lengths >= goal)),
+        "mean_steps": float(steps.mean()),
+        "median_steps": float(np.median(steps)),
+    }
+    for outcome in OUTCOMES:
+        summary[f"{outcome}_rate"] = outcomes.count(outcome) / len(results)
+    return summary
+
+
+def print_summary(filename: str, summary: dict) -> None:
+    print(f"{filename} : {summary['episodes']} parties")
+    print(f"  longueur : moyenne={summary['mean_length']:.2f} "
+          f"mediane={summary['median_length']:g} "
+          + " ".join(f"p{q}={summary[f'p{q}_length']:g}" for q in PERCENTILES)
+          + f" max={summary['max_length']}")
+    print(f"  objectif atteint : {summary['goal_rate']:.1%}, "
+          f"longueur finale moyenne={summary['mean_final_length']:.2f}")
+    print(f"  pas survecus : moyenne={summary['mean_steps']:.1f} "
+          f"mediane={summary['median_steps']:g}")
+    print("  fin : " + ", ".join(f"{outcome}={summary[f'{outcome}_rate']:.1%}"
+                                  for outcome in OUTCOMES))
+
+
+def find_checkpoints(directory: str) -> list:
+    """Sauvegardes agent_state_sessions_* du dossier, par nb de sessions.
+
+    Si les deux formats existent pour un meme nb de sessions, le .snkq est
+    prefere. Retourne une liste de (sessions, chemin).
+    """
+    found = {}
+    for path in glob.glob(os.path.join(directory, "agent_state_sessions_*")):
+        match = CHECKPOINT_PATTERN.search(os.path.basename(path))
+        if match is None:
+            continue
+        sessions = int(match.group(1))
+        if sessions not in found or match.group(2) == "snkq":
+            found[sessions] = path
+    return sorted(found.items())
+
+
+def write_curve(rows: list, filename: str) -> None:
+    """Ecrit la courbe d'apprentissage (une ligne par sauvegarde)."""
+    fields = ["sessions", "checkpoint", *rows[0][2]]
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(fields)
+        for sessions, path, summary in rows:
+            writer.writerow([sessions, path, *summary.values()])
+
+
+def plot_curve(rows: list, save=None) -> None:
+    """Trace la longueur moyenne / mediane et le taux d'objectif atteint."""
+    import matplotlib
+    if save:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    sessions = [row[0] for row in rows]
+    fig, (ax_length, ax_goal) = plt.subplots(2, 1, sharex=True)
+    ax_length.plot(sessions, [row[2]["mean_length"] for row in rows], "o-", label="moyenne")
+    ax_length.plot(sessions, [row[2]["median_length"] for row in rows], "o-", label="mediane")
+    ax_length.fill_between(sessions, [row[2]["p10_length"] for row in rows],
+                           [row[2]["p90_length"] for row in rows], alpha=0.2,
+                           label="p10-p90")
+    ax_length.set_ylabel("Longueur")
+    ax_length.legend()
+    ax_goal.plot(sessions, [row[2]["goal_rate"] for row in rows], "o-")
+    ax_goal.set_ylabel("Objectif atteint")
+    ax_goal.set_xlabel("sessions d'entrainement")
+    ax_goal.set_xscale("symlog")
+    fig.suptitle("Evaluation gloutonne des sauvegardes")
+    if save:
+        fig.savefig(save)
+    else:
+        plt.show()
+
+
+def parse_arguments():
+    """Recupere les options de l'evaluation."""
+    parser = argparse.ArgumentParser(description="Evaluation gloutonne des agents sauvegardes.")
+    parser.add_argument("path", help="Sauvegarde (.snkq / .pkl) ou dossier de sauvegardes.")
+    parser.add_argument("--episodes", type=int, default=100,
+                        help="Nombre de parties par sauvegarde. Par defaut : 100.")
+    parser.add_argument("--grid_size", type=int, default=None,
+                        help="Taille de la grille (par defaut : celle de l'agent).")
+    parser.add_argument("--goal", type=int, default=10,
+                        help="Longueur objectif. Par defaut : 10.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Graine de la premiere partie. Par defaut : 0.")
+    parser.add_argument("--max_steps", type=int, default=MAX_STEPS,
+                        help=f"Limite de pas par partie. Par defaut : {MAX_STEPS}.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Nombre de processus. Par defaut : nombre de coeurs.")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Ecrit les resultats dans ce fichier CSV.")
+    parser.add_argument("--plot", nargs="?", const="", default=None,
+                        help="Trace la courbe d'apprentissage (dans ce fichier si donne).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+    if os.path.isdir(args.path):
+        checkpoints = find_checkpoints(args.path)
+        if not checkpoints:
+            print(f"Aucune sauvegarde agent_state_sessions_* dans {args.path}.")
+            return
+    else:
+        match = CHECKPOINT_PATTERN.search(os.path.basename(args.path))
+        checkpoints = [(int(match.group(1)) if match else 0, args.path)]
+
+    rows = []
+    for sessions, path in checkpoints:
+        summary = evaluate(path, args.episodes, args.grid_size, args.goal,
+                           args.seed, args.workers, args.max_steps)
+        print_summary(path, summary)
+        rows.append((sessions, path, summary))
+
+    if args.output:
+        write_curve(rows, args.output)
+        print(f"Resultats ecrits dans {args.output}.")
+    if args.plot is not None and len(rows) > 1:
+        plot_curve(rows, args.plot or None)
+
+
+if __name__ == "__main__":
+    main()
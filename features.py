@@ -0,0 +1,82 @@
+"""Caracteristiques d'un etat pour les agents a approximation de fonction.
+
+Un etat est decrit par un vecteur float32 de NUM_FEATURES valeurs, les
+memes quelle que soit la taille de la grille :
+- biais (1)
+- objet vu dans chaque direction, en one-hot sur VISION_SYMBOLS (4 x 6)
+- inverse de la distance a cet objet, dans chaque direction (4)
+- longueur du serpent rapportee a l'objectif (1)
+- direction de la pomme verte la plus proche (distance de Manhattan) :
+  haut, droite, bas, gauche (4, 0 ou 1)
+
+game_features calcule le vecteur d'un SnakeGame (a partir de
+get_observation, sans chaine), vec_features la matrice (N, NUM_FEATURES)
+des N plateaux d'un VecSnakeGame en quelques operations vectorisees.
+"""
+import numpy as np
+
+from snakegame import VISION_SYMBOLS, OBSERVATION_BITS, VIEW_BITS, VIEW_MASK
+
+ONE_HOT = slice(1, 1 + 4 * len(VISION_SYMBOLS))
+DISTANCES = slice(ONE_HOT.stop, ONE_HOT.stop + 4)
+LENGTH = DISTANCES.stop
+APPLE = slice(LENGTH + 1, LENGTH + 5)
+NUM_FEATURES = APPLE.stop
+
+
+def _view_one_hots() -> np.ndarray:
+    """One-hot (4 x 6) de chacune des vues compactes (zeros si invalide)."""
+    shifts = OBSERVATION_BITS * np.arange(3, -1, -1)
+    digits = np.arange(1 << VIEW_BITS)[:, None] >> shifts & ((1 << OBSERVATION_BITS) - 1)
+    valid = (digits < len(VISION_SYMBOLS)).all(axis=1)
+    one_hots = np.eye(1 << OBSERVATION_BITS, len(VISION_SYMBOLS), dtype=np.float32)[digits]
+    return one_hots.reshape(len(digits), -1) * valid[:, None]
+
+
+_ONE_HOTS = _view_one_hots()
+
+
+def _apple_directions(dx, dy) -> np.ndarray:
+    """(haut, droite, bas, gauche) de la pomme, a partir de (dx, dy)."""
+    return np.stack([dy < 0, dx > 0, dy > 0, dx < 0], axis=-1)
+
+
+def game_features(game) -> np.ndarray:
+    """Vecteur de caracteristiques de l'etat courant d'un SnakeGame."""
+    packed, distances = game.get_observation()
+    features = np.zeros(NUM_FEATURES, dtype=np.float32)
+    features[0] = 1
+    features[ONE_HOT] = _ONE_HOTS[packed & VIEW_MASK]
+    features[DISTANCES] = distances
+    np.reciprocal(features[DISTANCES], out=features[DISTANCES])
+    features[LENGTH] = len(game.snake) / game.goal
+    if game.green_apples:
+        head_x, head_y = game.snake[0]
+        x, y = min(game.green_apples,
+                   key=lambda apple: abs(apple[0] - head_x) + abs(apple[1] - head_y))
+        features[APPLE] = _apple_directions(x - head_x, y - head_y)
+    return features
+
+
+def vec_features(vgame) -> np.ndarray:
+    """Matrice (N, NUM_FEATURES) des etats courants d'un VecSnakeGame."""
+    codes, distances = vgame.get_snake_vision()
+    n = vgame.num_envs
+    rows = np.arange(n)
+    features = np.zeros((n, NUM_FEATURES), dtype=np.float32)
+    features[:, 0] = 1
+    features[rows[:, None], ONE_HOT.start + np.arange(4) * len(VISION_SYMBOLS) + codes] = 1
+    features[:, DISTANCES] = 1 / np.maximum(distances, 1)
+    features[:, LENGTH] = vgame.length / vgame.goal
+
+    # Pomme verte la plus proche (indices plats de la grille avec bordure)
+    width = vgame.width
+    heads = vgame.body[np.arange(n), vgame.head_ptr]
+    apples = vgame.green
+    dx = apples % width - (heads % width)[:, None]
+    dy = apples // width - (heads // width)[:, None]
+    manhattan = np.where(apples >= 0, np.abs(dx) + np.abs(dy), np.iinfo(np.int64).max)
+    nearest = manhattan.argmin(axis=1)
+    present = apples[rows, nearest] >= 0
+    features[:, APPLE] = _apple_directions(dx[rows, nearest], dy[rows, nearest]) * present[:, None]
+    return features
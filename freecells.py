@@ -0,0 +1,44 @@
+"""Index des cases libres.
+
+Tableau des cases libres + dictionnaire case -> indice dans le tableau :
+ajout, retrait (echange avec la derniere case) et tirage aleatoire en O(1).
+Sert au placement des pommes de SnakeGame et de launch_Cyrielle.Board.
+"""
+import random
+
+
+class FreeCellIndex:
+    def __init__(self, cells=()):
+        """Initialisation a partir des cases libres de depart."""
+        self.cells = list(cells)
+        self.positions = {cell: i for i, cell in enumerate(self.cells)}
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return cell in self.positions
+
+    def add(self, cell):
+        """Marque une case comme libre."""
+        if cell not in self.positions:
+            self.positions[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell):
+        """Marque une case comme occupee (sans erreur si elle l'etait deja)."""
+        i = self.positions.pop(cell, None)
+        if i is None:
+            return
+        last = self.cells.pop()
+        if i < len(self.cells):  # on bouche le trou avec la derniere case
+            self.cells[i] = last
+            self.positions[last] = i
+
+    def pop_random(self, rng=random):
+        """Tire une case libre au hasard et la marque occupee (None si plein)."""
+        if not self.cells:
+            return None
+        cell = self.cells[rng.randrange(len(self.cells))]
+        self.discard(cell)
+        return cell
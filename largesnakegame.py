@@ -0,0 +1,155 @@
+"""SnakeGame pour les tres grandes grilles (jusqu'a 1000x1000 et plus).
+
+Memes regles et meme vision que SnakeGame, mais le cout d'un pas ne depend
+plus de la taille de la grille :
+- la vision ne parcourt plus les cases une a une jusqu'au mur : chaque
+  ligne et chaque colonne tient la liste triee des cases occupees (serpent
+  et pommes), mise a jour a chaque deplacement, et l'objet le plus proche
+  dans une direction est trouve par bisection (O(log n)) ;
+- il n'y a plus d'index des cases libres (grid^2 entrees a reconstruire a
+  chaque reset) : les pommes sont placees par tirage avec rejet, avec un
+  parcours de la zone en dernier recours quand le plateau est presque
+  plein.
+
+Le tirage des pommes differe de celui de SnakeGame : a graine egale, les
+parties ne sont pas les memes qu'avec SnakeGame.
+"""
+from bisect import bisect_left, bisect_right, insort
+
+from snakegame import (
+    SnakeGame, EMPTY, WALL, SNAKE, RED, OBSERVATION_BITS, VIEW_BITS, SYMBOL_INDEX,
+    distance_bucket
+    )
+
+MAX_TRIES = 32  # tirages avec rejet avant de parcourir la zone
+
+
+class LargeSnakeGame(SnakeGame):
+    def _build_board(self):
+        """Reconstruit le plateau et les index par ligne / colonne."""
+        self._version += 1
+        grid = self.grid_size
+        self.board = bytearray(grid * grid)
+        self.occupancy = bytearray(grid * grid)
+        self.free_cells = None  # remplace par le tirage avec rejet
+        self.rows = [[] for _ in range(grid)]  # x occupes, tries, par ligne
+        self.columns = [[] for _ in range(grid)]  # y occupes, tries, par colonne
+        for x, y in self.snake:
+            cell = y * grid + x
+            if not self.occupancy[cell]:
+                self.rows[y].append(x)
+                self.columns[x].append(y)
+            self.occupancy[cell] += 1
+            self.board[cell] = SNAKE
+        for line in self.rows + self.columns:
+            line.sort()
+        if self.planes is not None:
+            self.planes.rebuild(self)
+
+    def _index_add(self, x, y):
+        insort(self.rows[y], x)
+        insort(self.columns[x], y)
+
+    def _index_remove(self, x, y):
+        row = self.rows[y]
+        del row[bisect_left(row, x)]
+        column = self.columns[x]
+        del column[bisect_left(column, y)]
+
+    def _add_segment(self, x, y):
+        """Marque une case occupee par un segment du serpent."""
+        self._version += 1
+        cell = y * self.grid_size + x
+        if self.board[cell] == EMPTY:  # une pomme est deja indexee
+            self._index_add(x, y)
+        self.occupancy[cell] += 1
+        self.board[cell] = SNAKE
+        if self.planes is not None:
+            self.planes.add_segment(x, y, self.snake[0])
+
+    def _remove_tail(self):
+        """Retire le dernier segment du serpent et libere sa case."""
+        self._version += 1
+        x, y = self.snake.pop()
+        cell = y * self.grid_size + x
+        self.occupancy[cell] -= 1
+        if not self.occupancy[cell]:
+            self.board[cell] = EMPTY
+            self._index_remove(x, y)
+            if self.planes is not None:
+                self.planes.remove_segment(x, y)
+        if self.planes is not None and not self.snake:
+            self.planes.set_head(None)
+
+    def _set_apple(self, pos, code):
+        """Pose une pomme (GREEN ou RED) sur le plateau."""
+        self._version += 1
+        x, y = pos
+        cell = y * self.grid_size + x
+        if self.board[cell] == EMPTY:
+            self._index_add(x, y)
+        self.board[cell] = code
+        if self.planes is not None:
+            self.planes.set_apple(x, y, code)
+
+    def _place_apples_randomly(self, num_apples):
+        """Place les pommes a des positions random (tirage avec rejet).
+
+        Comme SnakeGame : zone 1 <= x, y <= grid - 3, et moins de num_apples
+        positions si le plateau est plein. Les cases tirees sont reservees
+        (marquees RED) jusqu'a ce que _set_apple y pose la pomme.
+        """
+        grid = self.grid_size
+        board = self.board
+        randrange = self.rng.randrange
+        apples = []
+        for _ in range(num_apples):
+            for _ in range(MAX_TRIES):
+                x, y = randrange(1, grid - 2), randrange(1, grid - 2)
+                if board[y * grid + x] == EMPTY:
+                    break
+            else:
+                free = [(x, y) for y in range(1, grid - 2)
+                        for x in range(1, grid - 2) if board[y * grid + x] == EMPTY]
+                if not free:
+                    break
+                x, y = free[randrange(len(free))]
+            self._set_apple((x, y), RED)  # reservation (cf. docstring)
+            apples.append((x, y))
+        return apples
+
+    def _compute_observation(self):
+        """Observation compacte par bisection dans les index ligne / colonne."""
+        if len(self.snake) == 0:
+            print("Erreur: le serpent est vide. Reinitialisation necessaire.")
+            return
+        head_x, head_y = self.snake[0]
+        grid = self.grid_size
+        board = self.board
+        row = self.rows[head_y]
+        column = self.columns[head_x]
+
+        # Premier objet (ou mur) dans chaque direction : haut, droite, bas, gauche
+        i = bisect_left(column, head_y)
+        up = column[i - 1] if i else -1
+        i = bisect_right(row, head_x)
+        right = row[i] if i < len(row) else grid
+        i = bisect_right(column, head_y)
+        down = column[i] if i < len(column) else grid
+        i = bisect_left(row, head_x)
+        left = row[i - 1] if i else -1
+
+        view = buckets = 0
+        distances = []
+        for x, y, distance in ((head_x, up, head_y - up),
+                               (right, head_y, right - head_x),
+                               (head_x, down, down - head_y),
+                               (left, head_y, head_x - left)):
+            if 0 <= x < grid and 0 <= y < grid:
+                code = board[y * grid + x]
+            else:
+                code = WALL
+            view = view << OBSERVATION_BITS | SYMBOL_INDEX[code][distance > 2]
+            buckets = buckets << OBSERVATION_BITS | distance_bucket(distance)
+            distances.append(distance)
+        return buckets << VIEW_BITS | view, tuple(distances)
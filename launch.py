@@ -8,66 +8,62 @@ et lance le programme d'apprentissage. Options:
 - delai d'affichage pour lisibilite (--delay)
 - nombre de segments de serpent a atteindre (--goal)
 - commencer a partir de sessions deja crees: save models / load models (--load)
+- nombre de plateaux simules en parallele sans affichage (--envs)
+- Q-table dense indexee par code d'etat (--dense)
+- chronometrage par phase de la boucle d'apprentissage (--profile)
+- metriques par session ecrites en flux dans un fichier CSV (--metrics)
+- affichage decouple a frequence fixe, entrainement a pleine vitesse (--fps)
+- enregistrement des parties dans un journal rejouable (--record)
+- entrainement parallele acteurs / apprenant sans affichage (--actors)
+- moteur pour tres grandes grilles, cout par pas constant (--large)
+- replay buffer de transitions et mises a jour par minibatch (--replay)
+- etats avec distances et Q-table de taille bornee (--distances, --max_states)
+- etats ramenes a leur orientation canonique, 4 actions (--symmetric)
+- approximation lineaire de Q sur des caracteristiques de l'etat (--linear)
+- reseau de neurones facon DQN, fenetre de plans optionnelle (--mlp, --window)
+
+pygame, matplotlib et display ne sont importes que lorsque l'affichage, la
+vision ou le trace sont demandes (cf. train.py pour l'entrainement sans
+affichage). La boucle d'apprentissage est un pipeline de generateurs dont
+seuls les etages demandes sont montes (cf. pipeline.py).
 A RAJOUTER
 - learn ou don't learn
 - implementer une lifetime
 """
 import argparse
+import numpy as np
+import os
 import pickle
-import pygame
 import sys
+import threading
 import time
 
-import matplotlib.pyplot as plt
 from snakegame import SnakeGame
-from agent import QLearningAgent
-from display import draw_game_display, display_snake_vision
-
-MAX_STEPS = 500
+from largesnakegame import LargeSnakeGame
+from linearagent import LinearQAgent
+from mlpagent import MLPQAgent
+from vecsnakegame import VecSnakeGame, vision_to_tuples
+from profiler import PhaseProfiler
+import pipeline
+from pipeline import MAX_STEPS
+from metrics import MetricsWriter
+from episodes import EpisodeRecorder
+from checkpoint import save_checkpoint, load_checkpoint, convert_pickle, describe
+from agent import (
+    QLearningAgent, DenseQLearningAgent, SymmetricQLearningAgent,
+    BoundedQLearningAgent, DEFAULT_MAX_STATES, encode_vision
+    )
+from replaybuffer import ReplayBuffer
 
 
 def close_on_enter(event: any) -> None:
     """Close the figure when the Enter key is pressed."""
+    import matplotlib.pyplot as plt
+
     if event.key == "enter":  # Si la touche 'Enter' est pressée
         plt.close(event.canvas.figure)  # Ferme la figure associée
 
 
-def pause(DISPLAYSURF, paused=None):
-    """Gestion de la pause avec ESPACE."""
-    # Gestion des evenements clavier
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_SPACE:
-                paused = not paused  # Bascule l'etat de pause
-
-    # Si en pause, attendre jusqu'a reprise
-    while paused:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                paused = not paused  # Reprise
-        # Affichage d'un message pendant la pause
-        if DISPLAYSURF:
-            font = pygame.font.SysFont(None, 36)
-            text = font.render(
-                "PAUSE - Appuyer sur ESPACE pour continuer.",
-                True, (255, 255, 255)
-                )
-            text_rect = text.get_rect(
-                center=(DISPLAYSURF.get_width() // 2,
-                        DISPLAYSURF.get_height() // 2)
-                )
-            DISPLAYSURF.blit(text, text_rect)
-            pygame.display.flip()
-        pygame.time.Clock().tick(10)  # Limite FPS pendant la pause
-    return paused
-
-
 def learning_phase(
         game: SnakeGame,
         agent: QLearningAgent,
@@ -79,85 +75,181 @@ def learning_phase(
         num_sessions=None,
         delay=None,
         vision=None,
-        play_mode=False
+        play_mode=False,
+        profiler=None,
+        metrics=None,
+        snapshots=None,
+        recorder=None
+        ) -> tuple:
+    """Phase d'apprentissage du Q-Learning avec affichage optionnel.
+
+    Monte le pipeline de pipeline.py : seuls les etages demandes sont
+    inseres entre les transitions et le bilan des sessions.
+    profiler (PhaseProfiler) : si fourni, chaque phase de la boucle est
+    chronometree (pause, action, step, observe, update, replay, vision,
+    render).
+    metrics (MetricsWriter) : si fourni, chaque session est ecrite dans le
+    fichier de metriques et les listes retournees restent vides.
+    snapshots (SnapshotBuffer) : affichage decouple (cf. render.py) ; un
+    instantane est publie quand l'affichage en demande un, et la boucle
+    s'arrete quand la fenetre est fermee.
+    recorder (EpisodeRecorder) : chaque session part d'une graine tiree par
+    le recorder et ses actions sont ecrites dans le journal (cf. episodes.py).
+    Si un replay buffer est attache a l'agent, chaque pas appris declenche
+    aussi ses mises a jour par minibatch (agent.replay_step).
+    """
+    delay = 100 if delay is None else int(delay * 1000)  # secondes -> ms
+    seeds = None if recorder is None else iter(recorder.begin, None)
+
+    stream = pipeline.transitions(game, agent, num_sessions, play_mode,
+                                  seeds=seeds, profiler=profiler)
+    if recorder is not None:
+        stream = pipeline.recording(stream, game, recorder)
+    if not play_mode:
+        stream = pipeline.learner(stream, agent, profiler)
+        if agent.replay is not None:
+            stream = pipeline.replayer(stream, agent, profiler)
+    if vision:
+        stream = pipeline.vision(stream, game, profiler)
+    if DISPLAYSURF is not None:
+        if images is not None and display:
+            stream = pipeline.renderer(stream, game, DISPLAYSURF, grid, mult,
+                                       images, delay, profiler)
+        stream = pipeline.events(stream, DISPLAYSURF, profiler)
+    if snapshots is not None:
+        stream = pipeline.snapshots(stream, game, snapshots)
+    return pipeline.summarize(stream, game, agent, metrics)
+
+
+def vec_learning_phase(
+        vgame: VecSnakeGame,
+        agent: QLearningAgent,
+        num_sessions=None,
+        play_mode=False,
+        metrics=None,
+        profiler=None
         ) -> tuple:
-    """Phase d'apprentissage du Q-Learning avec affichage optionnel."""
+    """Phase d'apprentissage sur N plateaux avances ensemble (sans affichage).
+
+    metrics (MetricsWriter) : comme pour learning_phase.
+    profiler (PhaseProfiler) : phases action, step, observe, reset et
+    update, chacune chronometree pour les N plateaux a la fois.
+    Un agent qui evalue les etats par lot (make_states, get_actions,
+    update_batch, cf. LinearQAgent) traite les N plateaux en un appel ;
+    s'il a un replay buffer (cf. MLPQAgent), les transitions y sont rangees
+    par lot (replay_batch) et l'agent en tire ses minibatchs.
+    Les cibles utilisent l'etat suivant reel, observe avant la
+    reinitialisation des plateaux termines (y compris par max_steps).
+    """
     reward_total = []
-    delay = 100
     timer = []
+    finished = 0
+    num_envs = vgame.num_envs
+    session_steps = np.zeros(num_envs, dtype=np.int64)
+    session_reward = np.zeros(num_envs)
+    session_start = np.full(num_envs, time.time())
+    max_length = vgame.get_snake_length()
+
+    batched = hasattr(agent, "get_actions")
+    if batched:
+        observe = agent.make_states
+
+        def choose(states):
+            return agent.get_actions(states, play_mode)
+
+        def learn(states, actions, rewards, final_states, terminated):
+            if agent.replay is not None:
+                agent.replay_batch(states, actions, rewards, final_states, terminated)
+            else:
+                agent.update_batch(states, actions, rewards, final_states, terminated)
+    else:
+        # Un agent dense recoit directement les codes entiers des etats
+        if isinstance(agent, DenseQLearningAgent):
+            def to_states(codes):
+                return encode_vision(codes).tolist()
+        else:
+            to_states = vision_to_tuples
+
+        def observe(vgame):
+            return to_states(vgame.get_snake_vision()[0])
+
+        def choose(states):
+            return [agent.get_action(state, play_mode) for state in states]
+
+        def learn(states, actions, rewards, final_states, terminated):
+            for i in range(num_envs):
+                agent.update(states[i], actions[i], rewards[i], final_states[i])
+                if agent.replay is not None:
+                    agent.replay_step(states[i], actions[i], rewards[i],
+                                      final_states[i], terminated[i])
+
+    # Chronometrage par phase : fonctions remplacees au montage
+    if profiler is not None:
+        choose = profiler.timed("action", choose)
+        step = profiler.timed("step", vgame.step)
+        observe = profiler.timed("observe", observe)
+        reset_done = profiler.timed("reset", vgame.reset_done)
+        learn = profiler.timed("update", learn)
+    else:
+        step = vgame.step
+        reset_done = vgame.reset_done
+
+    states = observe(vgame)
+
+    while finished < num_sessions:
+        actions = choose(states)
+        rewards, dones = step(actions, False)  # reinitialisation apres observation
+        session_reward += rewards
+        session_steps += 1
+        max_length = np.maximum(max_length, vgame.final_length)
+
+        # Etat suivant reel, avant reinitialisation des plateaux termines
+        # (apres une collision le plateau est inchange : meme vision)
+        final_states = observe(vgame)
+        if dones.any():
+            reset_done()
+            next_states = observe(vgame)  # etat de la nouvelle partie
+        else:
+            next_states = final_states
+        lengths = vgame.get_snake_length()
 
-    for session in range(num_sessions):
-        state, _ = tuple(game.get_snake_vision())
-        session_reward = 0
-        session_start = time.time()  # On set un timer
-        max_length = game.get_snake_length()
-        steps = 0
-        game_over = False
-        paused = False  # variable pour gerer l'etat de pause
-
-        while not game_over and steps < MAX_STEPS:
-            if DISPLAYSURF is not None:
-                paused = pause(DISPLAYSURF, paused)
-
-            # Choisir une action via l'agent
-            action = agent.get_action(state, play_mode)
-
-            # Effectuer l'action et obtenir la recompense
-            reward, game_over = game.step(action)
-            session_reward += reward
-
-            # Observer le nouvel etat
-            next_state, _ = tuple(game.get_snake_vision())
-
-            # Maj des Q-values si entrainement actif
+        if not play_mode:
+            learn(states, actions, rewards, final_states, vgame.terminated)
+
+        # Sessions terminees (plateaux deja reinitialises par reset_done)
+        now = time.time()
+        for i in np.flatnonzero(dones):
+            if finished == num_sessions:
+                break
+            if metrics is not None:
+                metrics.write(finished, session_reward[i], session_steps[i],
+                              vgame.final_length[i], max_length[i],
+                              agent.epsilon, agent.num_states(),
+                              now - session_start[i])
+            else:
+                reward_total.append(session_reward[i])
+                timer.append(now - session_start[i])
+            if max_length[i] >= vgame.init_goal:
+                print(f"[Session {finished}] Game over. "
+                      f"max length={max_length[i]}, "
+                      f"total reward={session_reward[i]}")
+            finished += 1
+            session_reward[i] = 0
+            session_steps[i] = 0
+            session_start[i] = now
             if not play_mode:
-                agent.update(state, action, reward, next_state)
-
-            # Passer au prochain etat
-            state = next_state
-
-            current_length = game.get_snake_length()
-            if current_length > max_length:
-                max_length = current_length
-
-            steps += 1
-
-            if vision:
-                display_snake_vision(game)
-
-            # Affichage pendant l'entrainement
-            if DISPLAYSURF is not None and images is not None and display:
-                draw_game_display(DISPLAYSURF, game, grid, mult, images)
-                pygame.display.flip()
-                # paused = not paused
-                # Ajouter un delai pour ralentir l'affichage (en millisecondes)
-                pygame.time.delay(delay)
+                agent.decay_epsilon()
 
-        session_end = time.time()
-        session_time = session_end - session_start
-        # paused = not paused
-
-        reward_total.append(session_reward)
-        timer.append(session_time)
-        # print(f"session {session}, Recompense totale : {session_reward}")
-        if max_length >= game.init_goal:
-            print(f"[Session {session}] Game over. "
-                  f"Final length={game.get_snake_length()}, "
-                  f"max length={max_length}, "
-                  f"total reward={session_reward}, steps={steps}")
-
-        # Reinitialiser l'env pour la prochaine session
-        game.reset()
-
-        # Reduction progressive d'epsilon apres chaque episode
-        if not play_mode:
-            agent.decay_epsilon()
+        max_length = np.where(dones, lengths, np.maximum(max_length, lengths))
+        states = next_states
 
     return reward_total, timer
 
 
 def load_images(mult: int) -> dict:
     """Charge et redimensionne les images."""
+    import pygame
+
     return {
         "green_apple": pygame.transform.scale(pygame.image.load("Graphics/GreenApple.png"), (mult, mult)),
         "red_apple": pygame.transform.scale(pygame.image.load("Graphics/RedApple.png"), (mult, mult)),
@@ -169,43 +261,136 @@ def load_images(mult: int) -> dict:
 
 
 def save_agent_state(agent: QLearningAgent, filename: str):
-    """Sauvegarde l'etat d'un agent entraine dans un fichier."""
+    """Sauvegarde l'etat d'un agent entraine (binaire .snkq, ou pickle si .pkl)."""
+    if not filename.endswith(".pkl"):
+        try:
+            save_checkpoint(agent, filename)
+        except ValueError as error:
+            # Etats non representables en .snkq : on garde le pickle
+            print(f"{filename} : {error}")
+            filename = os.path.splitext(filename)[0] + ".pkl"
+        else:
+            print(f"Etat de l'agent sauvegarde dans {filename}.")
+            return
     with open(filename, "wb") as file:
         pickle.dump(agent, file)
     print(f"Etat de l'agent sauvegarde dans {filename}.")
 
 
 def load_agent_state(filename: str) -> QLearningAgent:
-    """Charge l'etat d'un agent a partir d'un fichier."""
+    """Charge l'etat d'un agent a partir d'un fichier.
+
+    Sans extension, cherche d'abord <filename>.snkq puis <filename>.pkl ;
+    une sauvegarde pickle est convertie au format .snkq au passage si la
+    conversion est sans perte, sinon l'agent est charge depuis le pickle.
+    """
+    base, ext = os.path.splitext(filename)
+    if ext not in (".snkq", ".pkl"):
+        base, ext = filename, ".snkq"
+        if not os.path.exists(base + ext) and os.path.exists(base + ".pkl"):
+            ext = ".pkl"
+    filename = base + ext
+
     try:
-        with open(filename, "rb") as file:
-            agent = pickle.load(file)
-        print(f"Etat de l'agent charge depuis {filename}.")
-
-        # AFFICHAGE des attributs de l'agent :
-        print(f"Alpha: {agent.alpha}")
-        print(f"Gamma: {agent.gamma}")
-        print(f"Epsilon: {agent.epsilon}")
-        print(f"taille de la Q-table: {len(agent.q_table)} etats enregistres.")
-
-        # afficher quelques entrees de la Q-table:
-        print("\nQuelques entrees de la Q-table: ")
-        for i, (state, actions) in enumerate(agent.q_table.items()):
-            print(f"{i}: {state} -> Actions: {actions}")
-            # if i == 5:  # Affiche seulement les 5 premiers
-            #     break
-        print("\n")
-        return agent
+        if ext == ".pkl":
+            try:
+                converted = convert_pickle(filename)
+            except ValueError as error:
+                print(f"{filename} non converti ({error})")
+                with open(filename, "rb") as file:
+                    agent = pickle.load(file)
+                describe(agent, filename)
+                return agent
+            print(f"Sauvegarde {filename} convertie en {converted}.")
+            filename = converted
+        agent = load_checkpoint(filename)
     except FileNotFoundError:
         print(f"Fichier {filename} introuvable. Entrainement a partir de 0.")
         return None
 
+    # AFFICHAGE du resume de l'agent (pas de parcours de la Q-table)
+    describe(agent, filename)
+    return agent
+
 
 def calculate_mult_based_on_grid(grid: int, max_window_size=800):
     """Calcule la valeur de mult pour que la fenetre soit de taille definie."""
     return max_window_size // (grid + 2)
 
 
+def create_agent(grid: int, alpha: float, load, play_mode: bool, dense: bool,
+                 distances=False, max_states=None, symmetric=False,
+                 linear=False, mlp=False, window=0):
+    """Cree un nouvel agent ou charge un agent deja entraine.
+
+    distances : etats avec distances, Q-table bornee a max_states etats
+    (DEFAULT_MAX_STATES si None ; agent charge : sa taille, ou max_states).
+    symmetric : Q-table partagee entre rotations / miroirs (4 actions).
+    linear : approximation lineaire de Q (cf. linearagent.py).
+    mlp : reseau de neurones, fenetre de plans de rayon window (cf. mlpagent.py).
+    """
+    if mlp:
+        def agent_class(grid, alpha):
+            return MLPQAgent(grid, alpha=alpha, window=window)
+    elif linear:
+        agent_class = LinearQAgent
+    elif symmetric:
+        agent_class = SymmetricQLearningAgent
+    elif distances:
+        def agent_class(grid, alpha):
+            return BoundedQLearningAgent(grid, alpha=alpha,
+                                         max_states=max_states or DEFAULT_MAX_STATES)
+    else:
+        agent_class = DenseQLearningAgent if dense else QLearningAgent
+
+    # Gestion du chargement d'un agent deja entraine
+    if load:
+        load_file = f"agent_state_sessions_{load}"
+        print(f"Chargement de l'agent depuis {load_file}.")
+        agent = load_agent_state(load_file)
+        if agent is None:
+            print("Echec du chagement, creation d'un nouvel agent.")
+            agent = agent_class(grid, alpha=alpha)
+        elif symmetric and not isinstance(agent, SymmetricQLearningAgent):
+            # Valeurs de chaque orientation moyennees par etat canonique
+            agent = SymmetricQLearningAgent.from_agent(agent)
+        elif (not dense and isinstance(agent, DenseQLearningAgent)
+              and not isinstance(agent, SymmetricQLearningAgent)):
+            # Q-table dict demandee : conversion de la Q-table chargee
+            table = agent.q_table
+            agent = QLearningAgent(agent.grid_size, agent.num_actions,
+                                   agent.epsilon, agent.alpha, agent.gamma)
+            agent.q_table = table
+        elif dense and type(agent) is QLearningAgent:
+            # Q-table dict (pickle non converti) : --dense / --replay la veulent dense
+            agent = DenseQLearningAgent.from_agent(agent)
+        bounded = isinstance(agent, BoundedQLearningAgent)
+        if (distances or max_states is not None) and not bounded:
+            # Les distances ne se deduisent pas des etats d'une autre Q-table
+            raise ValueError(f"{load_file} : agent sans etats avec distances, "
+                             "non convertible pour --distances / --max_states.")
+        if bounded and max_states is not None and max_states != agent.max_states:
+            print(f"Q-table bornee : {agent.max_states} -> {max_states} etats.")
+            agent.resize(max_states)
+        if not play_mode:
+            agent.epsilon = 0.99
+    else:
+        print("Pas de session chargee. creation d'un nouvel agent.")
+        # print(f"grid = {grid}, play-mode = {play_mode}, alpha = {alpha}")
+        agent = agent_class(grid, alpha=alpha)
+        # print(agent)
+    return agent
+
+
+def report_table_stats(agent: BoundedQLearningAgent) -> None:
+    """Affiche le remplissage, le taux de succes et les evictions de la Q-table."""
+    stats = agent.stats()
+    print(f"Q-table bornee : {stats['states']}/{stats['max_states']} etats "
+          f"({stats['memory_bytes'] / 1024:.0f} Kio), "
+          f"taux de succes = {stats['hit_rate']:.1%}, "
+          f"evictions = {stats['evictions']}")
+
+
 def Q_Learning_algo(
         grid: int,
         display: bool,
@@ -216,15 +401,34 @@ def Q_Learning_algo(
         alpha: float,
         load: bool,
         play_mode: bool,
+        envs: int = 1,
+        dense: bool = False,
+        profile: bool = False,
+        metrics_file=None,
+        fps=None,
+        record_file=None,
+        actors: int = 1,
+        large: bool = False,
+        replay: int = 0,
+        replay_batch: int = 32,
+        replay_updates: int = 1,
+        distances: bool = False,
+        max_states: int = None,
+        symmetric: bool = False,
+        linear: bool = False,
+        mlp: bool = False,
+        window: int = 0,
         ) -> None:
     """Lance l'apprentissage via Q-Learning, avec ou sans affichage."""
-    pygame.init()  # initialize the pygame engine
-
     # Si mode jeu : forcer une seule session et activer l'affichage
     if play_mode:
         sessions = 1
         display = True
 
+    if display:
+        import pygame
+        pygame.init()  # initialize the pygame engine
+
     # Definition du facteur multiplicateur pour passer de grid a pixel
     mult = calculate_mult_based_on_grid(grid)
     fullgrid = grid + 2  # On ajoute des bords murs pour affichage
@@ -233,23 +437,23 @@ def Q_Learning_algo(
     images = None
 
     # Creation du jeu
-    game = SnakeGame(grid, goal=goal)
-
-    # Gestion du chargement d'un agent deja entraine
-    if load:
-        load_file = f"agent_state_sessions_{load}.pkl"
-        print(f"Chargement de l'agent depuis {load_file}.")
-        agent = load_agent_state(load_file)
-        if agent is None:
-            print("Echec du chagement, creation d'un nouvel agent.")
-            agent = QLearningAgent(grid, alpha=alpha)
-        if not play_mode:
-            agent.epsilon = 0.99
-    else:
-        print("Pas de session chargee. creation d'un nouvel agent.")
-        # print(f"grid = {grid}, play-mode = {play_mode}, alpha = {alpha}")
-        agent = QLearningAgent(grid, alpha=alpha)
-        # print(agent)
+    game_class = LargeSnakeGame if large else SnakeGame
+    game = game_class(grid, goal=goal)
+
+    # Le replay buffer demande la Q-table dense (codes d'etat entiers)
+    agent = create_agent(grid, alpha, load, play_mode, dense or replay > 0,
+                         distances, max_states, symmetric, linear, mlp, window)
+    # Les etats avec distances ne passent que par la boucle scalaire
+    bounded = isinstance(agent, BoundedQLearningAgent)
+    # Les acteurs lisent une Q-table dense brute (ni symetrique, ni lineaire)
+    symmetric = isinstance(agent, SymmetricQLearningAgent)
+    linear = isinstance(agent, LinearQAgent)
+    # Le reseau a toujours un replay buffer ; --replay en fixe la capacite
+    mlp = isinstance(agent, MLPQAgent)
+    if replay and not play_mode and mlp:
+        agent.attach_replay(agent.replay_buffer(replay), replay_batch, replay_updates)
+    elif replay and not play_mode and isinstance(agent, DenseQLearningAgent):
+        agent.attach_replay(ReplayBuffer(replay), replay_batch, replay_updates)
 
     # Definition de l'affichage si active
     if display:
@@ -259,25 +463,101 @@ def Q_Learning_algo(
         # Charger et redimensionner les images
         images = load_images(mult)
 
+    # Instrumentation par phase (rapport en fin de run ou sur SIGUSR1)
+    profiler = None
+    if profile:
+        profiler = PhaseProfiler()
+        profiler.install_signal_handler()
+
+    # Metriques ecrites en flux dans un fichier (pas de trace en fin de run)
+    metrics = MetricsWriter(metrics_file) if metrics_file else None
+
+    # Journal des parties rejouables (boucle scalaire uniquement)
+    recorder = EpisodeRecorder(record_file, large=large) if record_file else None
+
     # Phase d'apprentissage / de jeu
-    reward_total, timer = learning_phase(
-        game, agent, DISPLAYSURF, grid, mult, images, display=display,
-        num_sessions=sessions, delay=delay, vision=vision, play_mode=play_mode
-        )
+    if (actors > 1 and not display and not vision and recorder is None
+            and not bounded and not symmetric and not linear and not mlp):
+        from parallel import actor_learner_phase
+
+        if not isinstance(agent, DenseQLearningAgent):
+            agent = DenseQLearningAgent.from_agent(agent)
+        if profiler is not None:
+            # Les acteurs sont d'autres processus : rien a chronometrer ici
+            print("--profile : non disponible avec --actors, ignore.")
+            profiler = None
+        reward_total, timer = actor_learner_phase(
+            agent, grid, goal, num_sessions=sessions, num_actors=actors,
+            metrics=metrics, large=large
+            )
+    elif (envs > 1 and not display and not vision and recorder is None
+          and not large and not bounded and not (mlp and agent.window)):
+        vgame = VecSnakeGame(envs, grid, goal=goal, max_steps=MAX_STEPS)
+        reward_total, timer = vec_learning_phase(
+            vgame, agent, num_sessions=sessions, play_mode=play_mode,
+            metrics=metrics, profiler=profiler
+            )
+    elif display and fps:
+        # Entrainement dans un thread, affichage a fps images/s ici
+        from render import SnapshotBuffer, render_loop
+
+        buffer = SnapshotBuffer()
+        result = {}
+
+        def run():
+            result["phase"] = learning_phase(
+                game, agent, vision=vision, num_sessions=sessions,
+                play_mode=play_mode, profiler=profiler, metrics=metrics,
+                snapshots=buffer, recorder=recorder
+                )
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        render_loop(DISPLAYSURF, buffer, worker, grid, mult, images, fps)
+        worker.join()
+        reward_total, timer = result["phase"]
+    else:
+        reward_total, timer = learning_phase(
+            game, agent, DISPLAYSURF, grid, mult, images, display=display,
+            num_sessions=sessions, delay=delay, vision=vision,
+            play_mode=play_mode, profiler=profiler, metrics=metrics,
+            recorder=recorder
+            )
     # print(f"reward = {reward_total}")
 
     # Sauvegarder l'etat de l'agent
     if not play_mode:
-        save_file = f"agent_state_sessions_{sessions}.pkl"
+        save_file = f"agent_state_sessions_{sessions}.snkq"
         print(f"Sauvegarde de l'agent dans {save_file}.")
         save_agent_state(agent, save_file)
 
-    pygame.quit()
-
-    print(f"Temps max d'une session = {(max(timer) * 1000):.2f} ms")
+    if display:
+        pygame.quit()
+
+    if recorder is not None:
+        recorder.close()
+        print(f"{recorder.count} parties enregistrees dans {record_file} "
+              f"(relecture : python episodes.py {record_file}).")
+
+    if metrics is not None:
+        metrics.close()
+        print(f"Temps max d'une session = {metrics.stats.max_duration_ms:.2f} ms")
+        print(f"Recompense moyenne ({metrics.stats.window} dernieres sessions) = "
+              f"{metrics.stats.mean_reward:.1f}, "
+              f"longueur max = {metrics.stats.best_length}")
+        print(f"Metriques ecrites dans {metrics_file} "
+              f"(trace : python metrics.py {metrics_file}).")
+    else:
+        print(f"Temps max d'une session = {(max(timer) * 1000):.2f} ms")
+    if profiler is not None:
+        profiler.report()
+    if bounded:
+        report_table_stats(agent)
 
     # Tracer l'evolution des recompenses
-    if not play_mode:
+    if not play_mode and metrics is None:
+        import matplotlib.pyplot as plt
+
         plt.plot(reward_total)
         plt.xlabel("sessions")
         plt.ylabel("Recompenses cumulees")
@@ -335,13 +615,112 @@ def parse_arguments():
         nargs='?',  # permet un argument optionnel
         const='1',  # valeur par defaut si l'option est fournie sans valeur
         # choices=['1', '10', '100', '1000', '10000', '100000', '1000000'],
-        help="Charge un etat d'entrainement (1, 10 ou 100)."
+        help="Charge un etat d'entrainement (agent_state_sessions_<load>.snkq ou .pkl)."
     )
     parser.add_argument(
         "--dontlearn",
         action="store_true",
         help="Jouer avec l'agent sans apprentissage"
     )
+    parser.add_argument(
+        "--envs",
+        type=int,
+        default=1,
+        help="Nombre de plateaux simules en parallele (sans affichage). Par defaut: 1."
+    )
+    parser.add_argument(
+        "--dense",
+        action="store_true",
+        help="Q-table dense (tableau float32 indexe par code d'etat)."
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Chronometre chaque phase de la boucle (p50/p95/p99 en fin de run ou sur SIGUSR1)."
+    )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default=None,
+        help="Ecrit les metriques de chaque session dans ce fichier CSV (au lieu du trace final)."
+    )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=None,
+        help="Avec --display : affichage dans une boucle separee a FPS images/s, "
+             "l'entrainement tourne a pleine vitesse."
+    )
+    parser.add_argument(
+        "--actors",
+        type=int,
+        default=1,
+        help="Nombre de processus acteurs (Q-table en memoire partagee, sans affichage). Par defaut: 1."
+    )
+    parser.add_argument(
+        "--large",
+        action="store_true",
+        help="Moteur pour tres grandes grilles (vision par index, cout par pas independant de la grille)."
+    )
+    parser.add_argument(
+        "--replay",
+        type=int,
+        default=0,
+        help="Capacite du replay buffer (0 = desactive). Implique --dense."
+    )
+    parser.add_argument(
+        "--replay_batch",
+        type=int,
+        default=32,
+        help="Taille des minibatchs rejoues. Par defaut: 32."
+    )
+    parser.add_argument(
+        "--replay_updates",
+        type=int,
+        default=1,
+        help="Minibatchs rejoues par pas d'apprentissage. Par defaut: 1."
+    )
+    parser.add_argument(
+        "--distances",
+        action="store_true",
+        help="Etats avec distances (par tranches), Q-table bornee (cf. --max_states)."
+    )
+    parser.add_argument(
+        "--max_states",
+        type=int,
+        default=None,
+        help="Avec --distances : nombre max d'etats de la Q-table. Par defaut: 100000 "
+             "(agent charge : sa taille)."
+    )
+    parser.add_argument(
+        "--symmetric",
+        action="store_true",
+        help="Q-table partagee entre rotations et miroirs du plateau (4 actions)."
+    )
+    parser.add_argument(
+        "--linear",
+        action="store_true",
+        help="Agent lineaire sur caracteristiques (memoire constante, cf. linearagent.py)."
+    )
+    parser.add_argument(
+        "--mlp",
+        action="store_true",
+        help="Reseau de neurones facon DQN (replay, reseau cible, cf. mlpagent.py)."
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=0,
+        help="Avec --mlp : rayon de la fenetre de plans autour de la tete en entree "
+             "(0 = caracteristiques seules ; > 0 desactive --envs). Par defaut: 0."
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        default=None,
+        help="Enregistre chaque partie (graine + actions) dans ce journal .snke "
+             "(relecture : python episodes.py FICHIER). Desactive --envs."
+    )
     return parser.parse_args()
 
 
@@ -360,6 +739,23 @@ def main() -> None:
             alpha=args.alpha,
             load=args.load,
             play_mode=args.dontlearn,
+            envs=args.envs,
+            dense=args.dense,
+            profile=args.profile,
+            metrics_file=args.metrics,
+            fps=args.fps,
+            record_file=args.record,
+            actors=args.actors,
+            large=args.large,
+            replay=args.replay,
+            replay_batch=args.replay_batch,
+            replay_updates=args.replay_updates,
+            distances=args.distances,
+            max_states=args.max_states,
+            symmetric=args.symmetric,
+            linear=args.linear,
+            mlp=args.mlp,
+            window=args.window,
             )
     except KeyboardInterrupt:
         print("\nInterruption du programme par l'utilisateur (Ctrl + C)")
@@ -7,6 +7,8 @@ import argparse
 import pygame
 import time
 
+from freecells import FreeCellIndex
+
 # ------------------------------------------------------------------
 # CONSTANTES GLOBALES
 # ------------------------------------------------------------------
@@ -74,6 +76,13 @@ class Board:
             # Par sécurité, on force une position simple
             self.snake = [(0,0), (0,1), (0,2)]
 
+        # --- Index des cases libres (pour placer les pommes en O(1)) ---
+        self.free_cells = FreeCellIndex((x, y)
+                                        for x in range(self.size)
+                                        for y in range(self.size))
+        for segment in self.snake:
+            self.free_cells.discard(segment)
+
         # --- Placer les pommes dans des sets ---
         self.green_apples = set()
         self.red_apples = set()
@@ -93,15 +102,11 @@ class Board:
         Place UNE pomme (verte ou rouge) au hasard sur une case libre.
         apple_type = 'G' ou 'R'
         """
-        # Récupérer toutes les cases occupées par serpent + pommes existantes
-        occupied = set(self.snake) | self.green_apples | self.red_apples
-        empty_positions = [(x, y)
-                           for x in range(self.size)
-                           for y in range(self.size)
-                           if (x, y) not in occupied]
-        if not empty_positions:
+        # Tirer une case libre dans l'index (aucune pomme si plateau plein)
+        cell = self.free_cells.pop_random()
+        if cell is None:
             return
-        new_x, new_y = random.choice(empty_positions)
+        new_x, new_y = cell
         if apple_type == 'G':
             self.green_apples.add((new_x, new_y))
         else:
@@ -153,6 +158,7 @@ class Board:
 
         # Avancer le serpent
         self.snake.insert(0, new_head)
+        self.free_cells.discard(new_head)
         reward = -20  # petite pénalité par défaut
 
         # Vérif si on mange une pomme verte
@@ -171,14 +177,14 @@ class Board:
             self._place_apple('R')
             # Rétrécir le serpent d'une unité en plus
             if len(self.snake) > 1:
-                self.snake.pop()
+                self.free_cells.add(self.snake.pop())
             if len(self.snake) == 0:
                 self.game_over = True
                 return -10
 
         else:
             # Pas de pomme mangée -> enlever le dernier segment
-            self.snake.pop()
+            self.free_cells.add(self.snake.pop())
 
         # Mettre à jour la grille
         self._update_grid()
@@ -0,0 +1,79 @@
+"""Agent a approximation lineaire de la fonction Q.
+
+Q(s, a) = W[a] . phi(s), ou phi(s) est le vecteur de caracteristiques de
+features.py. La memoire est constante (num_actions x NUM_FEATURES poids)
+quelle que soit la taille de la grille, et un agent entraine sur une grille
+se joue sur une autre.
+
+Apprentissage : TD semi-gradient, normalise par |phi(s)|^2 (NLMS) pour
+rester stable avec les recompenses du jeu (jusqu'a +2000) :
+    W[a] += alpha * (r + gamma * max Q(s') - Q(s, a)) * phi(s) / |phi(s)|^2
+
+Memes methodes que QLearningAgent (make_state, get_action, update,
+decay_epsilon), plus leurs versions par lot pour VecSnakeGame
+(make_states, get_actions, update_batch).
+"""
+import random
+
+import numpy as np
+
+from agent import QLearningAgent
+from features import NUM_FEATURES, game_features, vec_features
+
+
+class LinearQAgent(QLearningAgent):
+    def __init__(self, grid_size, num_actions=4, epsilon=0.99, alpha=None, gamma=0.9):
+        """Initialisation : poids nuls (4 actions : haut, droite, bas, gauche)."""
+        super().__init__(grid_size, num_actions, epsilon, alpha, gamma)
+        self.alpha = 0.1 if alpha is None else alpha
+        self.weights = np.zeros((num_actions, NUM_FEATURES), dtype=np.float32)
+
+    def make_state(self, game):
+        """Etat de l'agent : vecteur de caracteristiques (cf. features.py)."""
+        return game_features(game)
+
+    def make_states(self, vgame):
+        """Etats des N plateaux d'un VecSnakeGame, matrice (N, NUM_FEATURES)."""
+        return vec_features(vgame)
+
+    def get_q_values(self, state):
+        return self.weights @ state
+
+    def get_action(self, state, play_mode):
+        """Choisit une action en utilisant la strategie epsilon-greedy."""
+        if not play_mode and random.random() < self.epsilon:
+            return random.randint(0, self.num_actions - 1)
+        return int((self.weights @ state).argmax())
+
+    def get_actions(self, states, play_mode):
+        """Actions epsilon-greedy de N etats en un produit matriciel."""
+        actions = (states @ self.weights.T).argmax(axis=1)
+        if not play_mode:
+            explore = np.random.random(len(states)) < self.epsilon
+            actions[explore] = np.random.randint(0, self.num_actions, explore.sum())
+        return actions
+
+    def update(self, state, action, reward, next_state):
+        """Met a jour les poids de l'action jouee (TD semi-gradient)."""
+        weights = self.weights
+        td_error = reward + self.gamma * (weights @ next_state).max() - weights[action] @ state
+        weights[action] += (self.alpha * td_error / (state @ state)) * state
+
+    def update_batch(self, states, actions, rewards, next_states, dones=None):
+        """TD semi-gradient sur un lot de transitions (cibles d'avant le lot).
+
+        dones : fins de partie reelles, sans Q(s') dans la cible (cf. MLPQAgent).
+        """
+        weights = self.weights
+        q_values = states @ weights.T
+        next_q = (next_states @ weights.T).max(axis=1)
+        if dones is not None:
+            next_q[dones] = 0
+        td_error = (rewards + self.gamma * next_q
+                    - q_values[np.arange(len(actions)), actions])
+        steps = (self.alpha * td_error / np.einsum("ij,ij->i", states, states))
+        np.add.at(weights, actions, (steps[:, None] * states).astype(np.float32))
+
+    def num_states(self) -> int:
+        """Nombre de poids (constant)."""
+        return self.weights.size
@@ -0,0 +1,155 @@
+"""Metriques d'entrainement en flux.
+
+MetricsWriter ajoute une ligne CSV par session (ecriture bufferisee, fichier
+en ajout seul) et tient des agregats glissants en O(1) : la memoire ne
+depend pas du nombre de sessions. read_metrics() relit le fichier a partir
+d'un offset, ce qui permet de tracer pendant ou apres un run.
+
+Trace : python metrics.py metrics.csv [--follow 5] [--save courbe.png]
+"""
+import argparse
+import csv
+import io
+import os
+from collections import deque
+
+FIELDS = ("session", "reward", "steps", "final_length", "max_length",
+          "epsilon", "q_states", "duration_ms")
+BUFFER_SIZE = 1 << 16
+
+
+class RollingStats:
+    def __init__(self, window=100):
+        """Agregats glissants sur les window dernieres sessions."""
+        self.window = window
+        self.rewards = deque(maxlen=window)
+        self.reward_sum = 0.0
+        self.count = 0
+        self.best_length = 0
+        self.max_duration_ms = 0.0
+
+    def add(self, reward, max_length, duration_ms):
+        if len(self.rewards) == self.window:
+            self.reward_sum -= self.rewards[0]
+        self.rewards.append(reward)
+        self.reward_sum += reward
+        self.count += 1
+        self.best_length = max(self.best_length, max_length)
+        self.max_duration_ms = max(self.max_duration_ms, duration_ms)
+
+    @property
+    def mean_reward(self) -> float:
+        """Recompense moyenne sur la fenetre."""
+        return self.reward_sum / len(self.rewards) if self.rewards else 0.0
+
+
+class MetricsWriter:
+    def __init__(self, filename: str, window=100):
+        """Ouvre le fichier en ajout (en-tete ecrit s'il est nouveau)."""
+        self.filename = filename
+        is_new = not os.path.exists(filename) or os.path.getsize(filename) == 0
+        self.file = open(filename, "a", newline="", buffering=BUFFER_SIZE,
+                         encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        if is_new:
+            self.writer.writerow(FIELDS)
+        self.stats = RollingStats(window)
+
+    def write(self, session, reward, steps, final_length, max_length,
+              epsilon, q_states, duration):
+        """Enregistre une session (duration en secondes)."""
+        duration_ms = duration * 1000
+        # Recompense ecrite telle quelle : f"{reward:g}" arrondit a 6 chiffres
+        self.writer.writerow((session, reward, steps, final_length,
+                              max_length, f"{epsilon:.6g}", q_states,
+                              f"{duration_ms:.3f}"))
+        self.stats.add(reward, max_length, duration_ms)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_metrics(filename: str, offset=0) -> tuple:
+    """Lit les lignes completes a partir de offset, retourne (lignes, offset)."""
+    with open(filename, "rb") as file:
+        file.seek(offset)
+        data = file.read()
+    end = data.rfind(b"\n") + 1  # ligne en cours d'ecriture ignoree
+    text = data[:end].decode("utf-8")
+    rows = []
+    for row in csv.reader(io.StringIO(text)):
+        if not row or row[0] == FIELDS[0]:
+            continue
+        rows.append({name: float(value) for name, value in zip(FIELDS, row)})
+    return rows, offset + end
+
+
+def plot_metrics(filename: str, window=100, follow=None, save=None) -> None:
+    """Trace la recompense (et sa moyenne glissante) et la longueur max."""
+    import matplotlib
+    if save and not follow:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    sessions, rewards, means, lengths = [], [], [], []
+    stats = RollingStats(window)
+    fig, (ax_reward, ax_length) = plt.subplots(2, 1, sharex=True)
+    offset = 0
+
+    while True:
+        rows, offset = read_metrics(filename, offset)
+        for row in rows:
+            stats.add(row["reward"], row["max_length"], row["duration_ms"])
+            sessions.append(row["session"])
+            rewards.append(row["reward"])
+            means.append(stats.mean_reward)
+            lengths.append(row["max_length"])
+
+        ax_reward.clear()
+        ax_reward.plot(sessions, rewards, alpha=0.3, label="recompense")
+        ax_reward.plot(sessions, means, label=f"moyenne ({window})")
+        ax_reward.set_ylabel("Recompenses cumulees")
+        ax_reward.legend()
+        ax_length.clear()
+        ax_length.plot(sessions, lengths)
+        ax_length.set_xlabel("sessions")
+        ax_length.set_ylabel("Longueur max")
+        fig.suptitle("Progression des recompenses")
+
+        if save:
+            fig.savefig(save)
+        if not follow:
+            break
+        plt.pause(follow)  # rafraichit la fenetre puis relit la suite
+        if not plt.fignum_exists(fig.number):
+            return
+    if not save:
+        plt.show()
+
+
+def parse_arguments():
+    """Recupere les options du trace."""
+    parser = argparse.ArgumentParser(description="Trace les metriques d'entrainement.")
+    parser.add_argument("filename", help="Fichier CSV ecrit par --metrics.")
+    parser.add_argument("--window", type=int, default=100,
+                        help="Fenetre de la moyenne glissante. Par defaut : 100.")
+    parser.add_argument("--follow", type=float, default=None,
+                        help="Relit le fichier toutes les N secondes (run en cours).")
+    parser.add_argument("--save", type=str, default=None,
+                        help="Enregistre la figure dans ce fichier (png, pdf...).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+    plot_metrics(args.filename, args.window, args.follow, args.save)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Agent Q-network (perceptron multicouche en NumPy, facon DQN).
+
+Q(s, .) est calcule par un petit reseau dense (ReLU) a partir du vecteur de
+caracteristiques de features.py, eventuellement complete par une fenetre
+des plans du plateau centree sur la tete (window > 0, cf. planes.py ;
+window = grid_size couvre tout le plateau quelle que soit la tete). Le
+cout d'un pas est celui de quelques produits matriciels de taille fixe,
+quelle que soit la taille de la grille.
+
+Apprentissage facon DQN, sur CPU :
+- les transitions (avec la fin de partie) vont dans un ReplayBuffer de
+  vecteurs ; tous les train_period pas, replay_updates minibatchs y sont
+  tires et appliques (perte de Huber, optimiseur Adam) ;
+- les cibles viennent d'un reseau cible, copie du reseau tous les
+  target_period minibatchs ;
+- les recompenses sont multipliees par reward_scale (valeurs Q de l'ordre
+  de l'unite) ; l'action choisie n'en depend pas.
+
+Les parametres sont ranges dans un seul tableau float32 (theta), chaque
+couche en etant une vue : Adam et la copie vers le reseau cible sont des
+operations sur un tableau. update() ne fait rien : l'agent n'apprend que
+par replay_step (ou replay_batch pour VecSnakeGame), qui recoivent la fin
+de partie.
+"""
+import math
+import random
+
+import numpy as np
+
+from agent import QLearningAgent
+from features import NUM_FEATURES, game_features, vec_features
+from replaybuffer import ReplayBuffer
+
+ADAM_BETAS = (0.9, 0.999)
+ADAM_EPSILON = 1e-8
+
+
+class MLPQAgent(QLearningAgent):
+    learning_rate = 1e-3  # pas d'Adam (alpha n'est pas utilise)
+    train_period = 4  # pas entre deux series de minibatchs
+    target_period = 500  # minibatchs entre deux copies vers le reseau cible
+    reward_scale = 0.01
+    replay_capacity = 50_000
+
+    def __init__(self, grid_size, num_actions=4, epsilon=0.99, alpha=None,
+                 gamma=0.9, hidden=(64, 64), window=0, seed=None):
+        """Initialisation (poids de He) et replay buffer par defaut.
+
+        hidden : tailles des couches cachees.
+        window : rayon de la fenetre de plans ajoutee en entree (0 = sans).
+        """
+        super().__init__(grid_size, num_actions, epsilon, alpha, gamma)
+        self.hidden = tuple(hidden)
+        self.window = window
+        self.num_inputs = NUM_FEATURES
+        if window:
+            from planes import CHANNELS
+            self.num_inputs += len(CHANNELS) * (2 * window + 1) ** 2
+        self.sizes = (self.num_inputs, *self.hidden, num_actions)
+        self.theta = np.zeros(sum(n * m + m for n, m in zip(self.sizes, self.sizes[1:])),
+                              dtype=np.float32)
+        rng = np.random.default_rng(seed)
+        for weights, _ in self._layers(self.theta):
+            weights[:] = rng.normal(0, math.sqrt(2 / len(weights)), weights.shape)
+        self.target_theta = self.theta.copy()
+        self._moments = np.zeros((2, len(self.theta)), dtype=np.float32)
+        self.updates = 0  # minibatchs appliques
+        self.steps = 0  # transitions recues
+        self._build_views()
+        self.attach_replay(self.replay_buffer(self.replay_capacity))
+
+    def _layers(self, flat: np.ndarray) -> list:
+        """Vues (poids, biais) de chaque couche dans le tableau plat."""
+        layers = []
+        offset = 0
+        for n, m in zip(self.sizes, self.sizes[1:]):
+            weights = flat[offset:offset + n * m].reshape(n, m)
+            offset += n * m
+            layers.append((weights, flat[offset:offset + m]))
+            offset += m
+        return layers
+
+    def _build_views(self) -> None:
+        self._grad = np.zeros_like(self.theta)
+        self.layers = self._layers(self.theta)
+        self.target_layers = self._layers(self.target_theta)
+        self._grad_layers = self._layers(self._grad)
+
+    def replay_buffer(self, capacity: int) -> ReplayBuffer:
+        """ReplayBuffer de vecteurs d'etat adapte a l'entree du reseau."""
+        return ReplayBuffer(capacity, state_shape=(self.num_inputs,),
+                            state_dtype=np.float32)
+
+    def attach_replay(self, buffer, batch_size=64, updates_per_step=1):
+        """Remplace le replay buffer (cf. replay_buffer pour le creer)."""
+        self.replay = buffer
+        self.replay_batch_size = batch_size
+        self.replay_updates = updates_per_step
+
+    def make_state(self, game):
+        """Etat : caracteristiques, puis fenetre de plans si window > 0."""
+        features = game_features(game)
+        if not self.window:
+            return features
+        if game.planes is None or game.planes.margin < self.window:
+            from planes import BoardPlanes
+            game.attach_planes(BoardPlanes(game.grid_size, margin=self.window))
+        return np.concatenate([features, game.get_window(self.window).ravel()])
+
+    def make_states(self, vgame):
+        """Etats des N plateaux d'un VecSnakeGame (sans fenetre de plans)."""
+        if self.window:
+            raise ValueError("MLPQAgent : pas de fenetre de plans avec VecSnakeGame.")
+        return vec_features(vgame)
+
+    @staticmethod
+    def _forward(layers: list, inputs: np.ndarray) -> tuple:
+        """Sorties du reseau et activations de chaque couche (pour le gradient)."""
+        activations = [inputs]
+        last = len(layers) - 1
+        for i, (weights, bias) in enumerate(layers):
+            inputs = inputs @ weights + bias
+            if i < last:
+                np.maximum(inputs, 0, out=inputs)
+            activations.append(inputs)
+        return inputs, activations
+
+    def get_q_values(self, state):
+        return self._forward(self.layers, state)[0]
+
+    def get_action(self, state, play_mode):
+        """Choisit une action en utilisant la strategie epsilon-greedy."""
+        if not play_mode and random.random() < self.epsilon:
+            return random.randint(0, self.num_actions - 1)
+        return int(self._forward(self.layers, state)[0].argmax())
+
+    def get_actions(self, states, play_mode):
+        """Actions epsilon-greedy de N etats en une passe du reseau."""
+        actions = self._forward(self.layers, states)[0].argmax(axis=1)
+        if not play_mode:
+            explore = np.random.random(len(states)) < self.epsilon
+            actions[explore] = np.random.randint(0, self.num_actions, explore.sum())
+        return actions
+
+    def update(self, state, action, reward, next_state):
+        """Rien : l'apprentissage passe par replay_step (cf. docstring du module)."""
+
+    def update_batch(self, states, actions, rewards, next_states, dones=None):
+        """Un pas d'Adam sur un minibatch (perte de Huber, cibles du reseau cible).
+
+        dones : fins de partie reelles (pas de Q(s') dans la cible) ; une fin
+        par limite de pas n'en est pas une.
+        """
+        count = len(actions)
+        rows = np.arange(count)
+        next_q = self._forward(self.target_layers, next_states)[0].max(axis=1)
+        if dones is not None:
+            next_q[dones] = 0
+        targets = np.asarray(rewards, dtype=np.float32) * self.reward_scale + self.gamma * next_q
+
+        q_values, activations = self._forward(self.layers, states)
+        delta = np.zeros_like(q_values)
+        delta[rows, actions] = np.clip(q_values[rows, actions] - targets, -1, 1) / count
+        for i in range(len(self.layers) - 1, -1, -1):
+            grad_weights, grad_bias = self._grad_layers[i]
+            np.matmul(activations[i].T, delta, out=grad_weights)
+            delta.sum(axis=0, out=grad_bias)
+            if i:
+                delta = (delta @ self.layers[i][0].T) * (activations[i] > 0)
+        self._adam_step()
+
+        self.updates += 1
+        if self.updates % self.target_period == 0:
+            np.copyto(self.target_theta, self.theta)
+
+    def _adam_step(self) -> None:
+        beta1, beta2 = ADAM_BETAS
+        first, second = self._moments
+        grad = self._grad
+        first *= beta1
+        first += (1 - beta1) * grad
+        second *= beta2
+        second += (1 - beta2) * grad * grad
+        t = self.updates + 1
+        step = self.learning_rate * math.sqrt(1 - beta2 ** t) / (1 - beta1 ** t)
+        self.theta -= step * first / (np.sqrt(second) + ADAM_EPSILON)
+
+    def _train(self, new_steps: int) -> None:
+        """Minibatchs dus apres new_steps transitions (cf. train_period)."""
+        due = (self.steps + new_steps) // self.train_period - self.steps // self.train_period
+        self.steps += new_steps
+        if len(self.replay) < self.replay_batch_size:
+            return
+        for _ in range(due * self.replay_updates):
+            self.update_batch(*self.replay.sample(self.replay_batch_size))
+
+    def replay_step(self, state, action, reward, next_state, done):
+        """Range la transition et applique les minibatchs dus."""
+        self.replay.add(state, action, reward, next_state, done)
+        self._train(1)
+
+    def replay_batch(self, states, actions, rewards, next_states, dones):
+        """Range un lot de transitions (VecSnakeGame) et applique les minibatchs dus."""
+        self.replay.add_batch(states, actions, rewards, next_states, dones)
+        self._train(len(actions))
+
+    def num_states(self) -> int:
+        """Nombre de parametres du reseau (constant)."""
+        return self.theta.size
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ("replay", "layers", "target_layers", "_grad", "_grad_layers"):
+            state.pop(name, None)  # vues recreees au chargement, buffer non sauve
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_views()
+        self.replay = self.replay_buffer(self.replay_capacity)
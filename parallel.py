@@ -0,0 +1,179 @@
+"""Entrainement parallele acteurs / apprenant.
+
+Les valeurs Q de l'agent sont placees dans un segment
+multiprocessing.shared_memory. Chaque acteur (un processus) joue ses
+propres parties de SnakeGame avec une politique epsilon-greedy lue dans une
+copie locale de la table, rafraichie tous les refresh_steps pas, et envoie
+ses transitions (code d'etat, action, recompense, code suivant, fin) par
+lots dans une file. L'apprenant (le processus appelant) applique chaque lot
+recu avec DenseQLearningAgent.update_batch (puis replay_batch s'il y a un
+replay buffer), directement dans la memoire partagee.
+
+Epsilon suit le calendrier de l'entrainement sequentiel : l'acteur i
+commence a epsilon * decay_rate ** i et decroit de decay_rate ** num_actors
+par session (sessions entrelacees) ; l'apprenant decroit epsilon de l'agent
+a chaque session terminee, quel que soit l'acteur.
+
+L'apprenant ne fait qu'une mise a jour vectorisee par lot : tant qu'il
+suit, le debit croit avec le nombre d'acteurs. A la fin, les valeurs Q reviennent
+dans la memoire privee de l'agent, sauvegarde comme d'habitude (.snkq).
+"""
+import multiprocessing
+import random
+import time
+from multiprocessing import shared_memory
+from queue import Empty
+
+import numpy as np
+
+from agent import DenseQLearningAgent, encode_observation
+from largesnakegame import LargeSnakeGame
+from pipeline import MAX_STEPS
+from snakegame import SnakeGame
+
+TRANSITION = np.dtype([("code", "<i4"), ("action", "u1"), ("reward", "<f4"),
+                       ("next_code", "<i4"), ("done", "u1")])
+
+
+def _actor(shm_name: str, shape: tuple, queue, seed: int, num_sessions: int,
+           grid: int, goal: int, epsilon: float, decay_rate: float,
+           min_epsilon: float, batch_size: int, refresh_steps: int,
+           max_steps: int, large: bool) -> None:
+    """Boucle d'un acteur (processus fils) : joue et envoie ses transitions.
+
+    decay_rate : decroissance d'epsilon par session de cet acteur.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    shared = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+    try:
+        policy = shared.copy()  # copie locale, rafraichie periodiquement
+        num_actions = shape[1]
+        rng = random.Random(seed)
+        game_class = LargeSnakeGame if large else SnakeGame
+        game = game_class(grid, goal=goal, seed=rng.getrandbits(63))
+        batch = []
+        sessions = []  # resume des sessions terminees depuis le dernier envoi
+        total_steps = 0
+
+        for _ in range(num_sessions):
+            start = time.time()
+            state = encode_observation(game.get_observation()[0])
+            session_reward = 0
+            max_length = game.get_snake_length()
+            steps = 0
+            done = False
+            while not done and steps < max_steps:
+                if rng.random() < epsilon:
+                    action = rng.randint(0, num_actions - 1)
+                else:
+                    action = int(policy[state].argmax())
+                reward, done = game.step(action)
+                next_state = encode_observation(game.get_observation()[0])
+                batch.append((state, action, reward, next_state, done))
+                session_reward += reward
+                max_length = max(max_length, game.get_snake_length())
+                state = next_state
+                steps += 1
+                total_steps += 1
+
+                if len(batch) == batch_size:
+                    queue.put((np.array(batch, dtype=TRANSITION).tobytes(), sessions))
+                    batch, sessions = [], []
+                if total_steps % refresh_steps == 0:
+                    np.copyto(policy, shared)
+
+            sessions.append((session_reward, steps, game.get_snake_length(),
+                             max_length, epsilon, time.time() - start))
+            game.reset()
+            epsilon = max(min_epsilon, epsilon * decay_rate)
+
+        queue.put((np.array(batch, dtype=TRANSITION).tobytes(), sessions))
+        queue.put(None)  # fin de l'acteur
+    finally:
+        del shared
+        shm.close()
+
+
+def actor_learner_phase(
+        agent: DenseQLearningAgent,
+        grid: int,
+        goal: int,
+        num_sessions: int,
+        num_actors: int,
+        metrics=None,
+        seed=None,
+        batch_size=256,
+        refresh_steps=500,
+        large=False,
+        ) -> tuple:
+    """Entraine agent avec num_actors acteurs (num_sessions au total).
+
+    metrics (MetricsWriter) : comme pour learning_phase.
+    large : les acteurs jouent sur LargeSnakeGame.
+    Retourne (reward_total, timer) comme learning_phase.
+    """
+    reward_total = []
+    timer = []
+    base_seed = random.randrange(1 << 32) if seed is None else seed
+    shm = shared_memory.SharedMemory(create=True, size=agent.q_values.nbytes)
+    try:
+        agent.set_buffer(shm.buf)
+        context = multiprocessing.get_context()
+        queue = context.Queue(maxsize=4 * num_actors)  # limite l'avance des acteurs
+        actors = []
+        for i in range(num_actors):
+            quota = num_sessions // num_actors + (i < num_sessions % num_actors)
+            actors.append(context.Process(
+                target=_actor, daemon=True,
+                args=(shm.name, agent.q_values.shape, queue, base_seed + i,
+                      quota, grid, goal,
+                      max(agent.min_epsilon, agent.epsilon * agent.decay_rate ** i),
+                      agent.decay_rate ** num_actors, agent.min_epsilon,
+                      batch_size, refresh_steps, MAX_STEPS, large)))
+        for actor in actors:
+            actor.start()
+
+        finished = 0
+        running = num_actors
+        while running:
+            try:
+                message = queue.get(timeout=1.0)
+            except Empty:
+                if any(actor.exitcode not in (None, 0) for actor in actors):
+                    raise RuntimeError("Un acteur s'est arrete sur une erreur.")
+                continue
+            if message is None:
+                running -= 1
+                continue
+            data, sessions = message
+            batch = np.frombuffer(data, dtype=TRANSITION)
+            if len(batch):
+                codes, actions = batch["code"], batch["action"]
+                rewards, next_codes = batch["reward"], batch["next_code"]
+                agent.update_batch(codes, actions, rewards, next_codes)
+                if agent.replay is not None:
+                    agent.replay_batch(codes, actions, rewards, next_codes,
+                                       batch["done"].astype(bool))
+
+            for reward, steps, final_length, max_length, epsilon, duration in sessions:
+                if metrics is not None:
+                    metrics.write(finished, reward, steps, final_length,
+                                  max_length, epsilon, agent.num_states(),
+                                  duration)
+                else:
+                    reward_total.append(reward)
+                    timer.append(duration)
+                if max_length >= goal:
+                    print(f"[Session {finished}] Game over. "
+                          f"Final length={final_length}, "
+                          f"max length={max_length}, "
+                          f"total reward={reward}, steps={steps}")
+                finished += 1
+                agent.decay_epsilon()  # une baisse par session, tous acteurs confondus
+        for actor in actors:
+            actor.join()
+    finally:
+        agent.set_buffer()  # retour en memoire privee avant de liberer
+        shm.close()
+        shm.unlink()
+    return reward_total, timer
@@ -0,0 +1,241 @@
+"""Boucle d'apprentissage en pipeline de generateurs.
+
+transitions() joue les sessions (agent + SnakeGame) et produit un
+Transition par pas. Les etages sont des generateurs qui consomment ce flux
+et le retransmettent : apprentissage (learner), replay buffer (replayer),
+journal des parties (recording), vision dans le terminal (vision),
+affichage pygame (renderer), pause au clavier (events) et instantanes pour
+l'affichage decouple (snapshots). summarize() consomme le flux et tient le
+bilan des sessions (metriques ou listes).
+
+Un etage n'est insere que si sa fonctionnalite est demandee : sans
+affichage, la boucle ne contient aucun test de vision ou d'affichage. Le
+chronometrage par phase (PhaseProfiler) remplace les fonctions chronometrees
+au montage, sans test par pas non plus.
+
+Le dernier Transition d'une session (last=True) porte son bilan ; la
+partie n'est reinitialisee qu'une fois ce Transition passe par tous les
+etages. Le code d'un etage place apres son yield s'execute avant le pas
+suivant (ex. pause, baisse d'epsilon apres l'ecriture des metriques).
+
+Exemple (un nouvel etage se branche sans toucher a la boucle) :
+    stream = transitions(game, agent, 1000)
+    stream = learner(stream, agent)
+    reward_total, timer = summarize(stream, game, agent)
+"""
+import sys
+import time
+from operator import attrgetter
+from typing import NamedTuple
+
+MAX_STEPS = 500
+
+
+class Transition(NamedTuple):
+    """Un pas de jeu, et le bilan de la session en cours."""
+    session: int
+    step: int  # pas joues dans la session, celui-ci compris
+    state: object
+    action: int
+    reward: float
+    next_state: object
+    done: bool  # fin de partie
+    last: bool  # dernier pas de la session (fin de partie ou MAX_STEPS)
+    session_reward: float
+    max_length: int
+
+
+def _timed(profiler, phase: str, function):
+    """function, chronometree dans la phase si un profiler est fourni."""
+    return function if profiler is None else profiler.timed(phase, function)
+
+
+def transitions(game, agent, num_sessions: int, play_mode=False,
+                max_steps=MAX_STEPS, seeds=None, profiler=None):
+    """Joue num_sessions sessions et produit un Transition par pas.
+
+    seeds : iterateur des graines des parties (ex. EpisodeRecorder.begin).
+    profiler : phases action, step et observe.
+    """
+    get_action = _timed(profiler, "action", agent.get_action)
+    step = _timed(profiler, "step", game.step)
+    observe = _timed(profiler, "observe", agent.make_state)
+    length = game.get_snake_length
+    new = tuple.__new__  # evite Transition.__new__ (Python) a chaque pas
+
+    for session in range(num_sessions):
+        if seeds is not None:
+            game.reset(seed=next(seeds))  # partie rejouable
+        state = observe(game)
+        session_reward = 0
+        max_length = length()
+        for steps in range(1, max_steps + 1):
+            action = get_action(state, play_mode)
+            reward, game_over = step(action)
+            session_reward += reward
+            next_state = observe(game)
+            current_length = length()
+            if current_length > max_length:
+                max_length = current_length
+            last = game_over or steps == max_steps
+            yield new(Transition, (session, steps, state, action, reward,
+                                   next_state, game_over, last, session_reward,
+                                   max_length))
+            if last:
+                break
+            state = next_state
+
+        # Reinitialiser l'env pour la prochaine session
+        game.reset()
+
+
+def learner(stream, agent, profiler=None):
+    """Maj des Q-values a chaque pas, epsilon reduit en fin de session."""
+    update = _timed(profiler, "update", agent.update)
+    decay_epsilon = agent.decay_epsilon
+    for t in stream:
+        _, _, state, action, reward, next_state, _, last, _, _ = t
+        update(state, action, reward, next_state)
+        yield t
+        if last:
+            decay_epsilon()
+
+
+def replayer(stream, agent, profiler=None):
+    """Range chaque pas dans le replay buffer de l'agent (agent.replay_step)."""
+    replay_step = _timed(profiler, "replay", agent.replay_step)
+    for t in stream:
+        _, _, state, action, reward, next_state, done, _, _, _ = t
+        replay_step(state, action, reward, next_state, done)
+        yield t
+
+
+def recording(stream, game, recorder):
+    """Ecrit les actions et le resultat de chaque partie dans le journal.
+
+    Les graines viennent du recorder : transitions(..., seeds=iter(recorder.begin, None)).
+    """
+    record = recorder.record
+    for t in stream:
+        record(t.action)
+        if t.last:
+            recorder.end(game, t.session_reward, t.max_length)
+        yield t
+
+
+def vision(stream, game, profiler=None):
+    """Affiche la vision du serpent dans le terminal apres chaque pas."""
+    from display import display_snake_vision
+
+    show = _timed(profiler, "vision", display_snake_vision)
+    for t in stream:
+        show(game)
+        yield t
+
+
+def renderer(stream, game, DISPLAYSURF, grid, mult, images, delay_ms: int,
+             profiler=None):
+    """Dessine le plateau apres chaque pas, puis attend delay_ms."""
+    import pygame
+    from display import draw_game_display
+
+    def render():
+        # Seules les cases modifiees sont envoyees a l'ecran
+        pygame.display.update(draw_game_display(DISPLAYSURF, game, grid, mult, images))
+    render = _timed(profiler, "render", render)
+    delay = pygame.time.delay
+
+    for t in stream:
+        render()
+        # Ajouter un delai pour ralentir l'affichage (en millisecondes)
+        delay(delay_ms)
+        yield t
+
+
+def pause(DISPLAYSURF, paused=None):
+    """Gestion de la pause avec ESPACE."""
+    import pygame
+
+    # Gestion des evenements clavier
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                paused = not paused  # Bascule l'etat de pause
+
+    # Si en pause, attendre jusqu'a reprise
+    if paused and DISPLAYSURF:
+        # Le message de pause recouvre le plateau : redessin complet ensuite
+        from display import invalidate_display, draw_pause_message
+        invalidate_display(DISPLAYSURF)
+    while paused:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                paused = not paused  # Reprise
+        # Affichage d'un message pendant la pause
+        if DISPLAYSURF:
+            draw_pause_message(DISPLAYSURF)
+            pygame.display.flip()
+        pygame.time.Clock().tick(10)  # Limite FPS pendant la pause
+    return paused
+
+
+def events(stream, DISPLAYSURF, profiler=None):
+    """Evenements pygame (pause, fermeture) traites avant chaque pas."""
+    poll = _timed(profiler, "pause", pause)
+    paused = False
+    for t in stream:
+        yield t
+        paused = poll(DISPLAYSURF, paused)
+
+
+def snapshots(stream, game, buffer):
+    """Publie un instantane quand l'affichage decouple en demande un.
+
+    Bloque pendant la pause ; le flux s'arrete quand la fenetre est fermee
+    (la session en cours n'est pas comptee).
+    """
+    from render import BoardSnapshot
+
+    for t in stream:
+        yield t
+        if buffer.wanted:
+            buffer.publish(BoardSnapshot.of(game, t.session, t.step))
+        buffer.running.wait()  # bloque pendant la pause
+        if buffer.closed:
+            return
+
+
+def summarize(stream, game, agent, metrics=None) -> tuple:
+    """Consomme le flux et fait le bilan de chaque session.
+
+    metrics (MetricsWriter) : si fourni, chaque session est ecrite dans le
+    fichier de metriques et les listes retournees restent vides.
+    Retourne (reward_total, timer) : recompense et duree de chaque session.
+    """
+    reward_total = []
+    timer = []
+    session_start = time.time()
+    # Seuls les derniers pas des sessions arrivent ici (filtre en C)
+    for t in filter(attrgetter("last"), stream):
+        session_end = time.time()
+        session_time = session_end - session_start
+        session_start = session_end
+        if metrics is not None:
+            metrics.write(t.session, t.session_reward, t.step,
+                          game.get_snake_length(), t.max_length, agent.epsilon,
+                          agent.num_states(), session_time)
+        else:
+            reward_total.append(t.session_reward)
+            timer.append(session_time)
+        if t.max_length >= game.init_goal:
+            print(f"[Session {t.session}] Game over. "
+                  f"Final length={game.get_snake_length()}, "
+                  f"max length={t.max_length}, "
+                  f"total reward={t.session_reward}, steps={t.step}")
+    return reward_total, timer
@@ -0,0 +1,142 @@
+"""Plans d'observation du plateau complet (tableaux NumPy uint8).
+
+Un BoardPlanes tient 5 plans (tete, corps, pomme verte, pomme rouge, mur)
+dans un tableau persistant, mis a jour case par case a chaque deplacement
+du serpent (cf. SnakeGame.attach_planes) : aucune reconstruction du plateau
+par pas, seul un reset le reconstruit.
+
+Le plateau est entoure d'une marge de cases de mur (margin >= 1) : la vue
+du plateau complet (avec son contour de murs) et les fenetres centrees sur
+la tete (rayon <= margin) sont de simples vues en lecture seule du tableau,
+sans copie. Le plan corps contient toutes les cases du serpent, tete
+comprise.
+
+stack_planes range les plans de plusieurs parties dans un seul tableau
+(N, 5, H, W) : la vue du lot est elle aussi sans copie.
+
+Exemple :
+    game = SnakeGame(10, goal=10, planes=True)
+    planes = game.get_planes()      # (5, 12, 12), lecture seule
+    window = game.get_window(1)     # (5, 3, 3) autour de la tete
+"""
+import numpy as np
+
+from snakegame import SNAKE, GREEN, RED
+
+CHANNELS = ("head", "body", "green", "red", "wall")
+HEAD_PLANE, BODY_PLANE, GREEN_PLANE, RED_PLANE, WALL_PLANE = range(len(CHANNELS))
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Vue en lecture seule d'un tableau (sans copie)."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class BoardPlanes:
+    def __init__(self, grid: int, margin=1, buffer=None):
+        """Plans d'un plateau grid x grid entoure de margin cases de mur.
+
+        buffer : tableau uint8 (5, grid + 2 * margin, grid + 2 * margin)
+        contigu ou ranger les plans (cf. stack_planes) ; alloue si absent.
+        """
+        if margin < 1:
+            raise ValueError("BoardPlanes : marge d'au moins une case de mur.")
+        width = grid + 2 * margin
+        shape = (len(CHANNELS), width, width)
+        if buffer is None:
+            buffer = np.zeros(shape, dtype=np.uint8)
+        elif buffer.shape != shape or buffer.dtype != np.uint8:
+            raise ValueError(f"BoardPlanes : tableau {shape} uint8 attendu.")
+        self.grid_size = grid
+        self.margin = margin
+        self.data = buffer
+        self.data[:] = 0
+        self.data[WALL_PLANE] = 1
+        self.data[WALL_PLANE, margin:margin + grid, margin:margin + grid] = 0
+
+        # Acces scalaires par indice plat (cf. _cell)
+        self._flat = memoryview(self.data.reshape(-1))
+        self._width = width
+        self._plane = width * width
+        self._origin = margin * width + margin
+        self._head = None  # indice plat de la tete dans un plan
+
+        # Plateau et son contour de murs
+        self.view = _read_only(self.data[:, margin - 1:margin + grid + 1,
+                                         margin - 1:margin + grid + 1])
+
+    def _cell(self, x: int, y: int) -> int:
+        return self._origin + y * self._width + x
+
+    def rebuild(self, game) -> None:
+        """Recopie le plateau de game (serpent et pommes) dans les plans."""
+        grid = self.grid_size
+        margin = self.margin
+        board = np.frombuffer(game.board, dtype=np.uint8).reshape(grid, grid)
+        inside = self.data[:, margin:margin + grid, margin:margin + grid]
+        self.data[:WALL_PLANE] = 0
+        inside[BODY_PLANE] = board == SNAKE
+        inside[GREEN_PLANE] = board == GREEN
+        inside[RED_PLANE] = board == RED
+        self._head = None
+        self.set_head(game.snake[0] if game.snake else None)
+
+    def set_head(self, pos) -> None:
+        """Deplace la tete en pos (None : plus de tete)."""
+        flat = self._flat
+        if self._head is not None:
+            flat[HEAD_PLANE * self._plane + self._head] = 0
+        self._head = None if pos is None else self._cell(*pos)
+        if self._head is not None:
+            flat[HEAD_PLANE * self._plane + self._head] = 1
+
+    def add_segment(self, x: int, y: int, head) -> None:
+        """Segment du serpent en (x, y) (la pomme eventuelle est mangee)."""
+        flat = self._flat
+        plane = self._plane
+        cell = self._cell(x, y)
+        flat[BODY_PLANE * plane + cell] = 1
+        flat[GREEN_PLANE * plane + cell] = 0
+        flat[RED_PLANE * plane + cell] = 0
+        self.set_head(head)
+
+    def remove_segment(self, x: int, y: int) -> None:
+        """Case (x, y) liberee par le serpent."""
+        self._flat[BODY_PLANE * self._plane + self._cell(x, y)] = 0
+
+    def set_apple(self, x: int, y: int, code: int) -> None:
+        """Pomme (GREEN ou RED) posee en (x, y)."""
+        flat = self._flat
+        plane = self._plane
+        cell = self._cell(x, y)
+        flat[GREEN_PLANE * plane + cell] = code == GREEN
+        flat[RED_PLANE * plane + cell] = code == RED
+
+    def window(self, x: int, y: int, radius=1) -> np.ndarray:
+        """Vue (5, 2 * radius + 1, 2 * radius + 1) centree sur (x, y)."""
+        if radius > self.margin:
+            raise ValueError(f"Fenetre de rayon {radius} : marge de {self.margin} case(s).")
+        top = self.margin + y - radius
+        left = self.margin + x - radius
+        size = 2 * radius + 1
+        return _read_only(self.data[:, top:top + size, left:left + size])
+
+
+def stack_planes(games: list, margin=1) -> np.ndarray:
+    """Plans de plusieurs parties dans un seul tableau, vue du lot.
+
+    Attache a chaque partie des plans ranges dans un tableau commun et
+    retourne sa vue en lecture seule (N, 5, grid + 2, grid + 2), toujours a
+    jour. Toutes les parties doivent avoir la meme taille de grille.
+    """
+    grid = games[0].grid_size
+    if any(game.grid_size != grid for game in games):
+        raise ValueError("stack_planes : parties de tailles differentes.")
+    width = grid + 2 * margin
+    data = np.zeros((len(games), len(CHANNELS), width, width), dtype=np.uint8)
+    for game, buffer in zip(games, data):
+        game.attach_planes(BoardPlanes(grid, margin, buffer))
+    return _read_only(data[:, :, margin - 1:margin + grid + 1,
+                           margin - 1:margin + grid + 1])
@@ -0,0 +1,108 @@
+"""Instrumentation par phase de la boucle d'apprentissage.
+
+PhaseProfiler accumule des durees (perf_counter_ns) par phase dans des
+histogrammes a seaux fixes (4 sous-seaux par puissance de 2, soit ~20%
+d'erreur relative au plus) : memoire constante quelle que soit la duree du
+run, et p50/p95/p99 disponibles a tout moment (fin de run ou signal).
+"""
+import signal
+import sys
+import time
+
+NUM_BUCKETS = 64 * 4
+
+
+def bucket_index(ns: int) -> int:
+    """Indice du seau d'une duree en nanosecondes."""
+    if ns < 8:
+        return max(ns, 0)
+    bits = ns.bit_length()
+    return bits * 4 + ((ns >> (bits - 3)) & 3)
+
+
+def bucket_value(index: int) -> float:
+    """Valeur representative (milieu) d'un seau."""
+    if index < 8:
+        return float(index)
+    bits, sub = divmod(index, 4)
+    low = (4 + sub) << (bits - 3)
+    return low + (1 << (bits - 3)) / 2
+
+
+class PhaseProfiler:
+    def __init__(self):
+        """Initialisation : un histogramme par phase, cree a la demande."""
+        self.histograms = {}
+        self.totals = {}
+        self.clock = time.perf_counter_ns
+
+    def record(self, phase: str, ns: int) -> None:
+        """Ajoute une duree a l'histogramme de la phase."""
+        counts = self.histograms.get(phase)
+        if counts is None:
+            counts = self.histograms[phase] = [0] * NUM_BUCKETS
+            self.totals[phase] = 0
+        counts[bucket_index(ns)] += 1
+        self.totals[phase] += ns
+
+    def lap(self, phase: str, start: int) -> int:
+        """Enregistre le temps ecoule depuis start et retourne l'instant courant."""
+        now = self.clock()
+        self.record(phase, now - start)
+        return now
+
+    def timed(self, phase: str, function):
+        """function dont chaque appel est chronometre dans la phase."""
+        clock = self.clock
+        record = self.record
+
+        def wrapper(*args):
+            start = clock()
+            result = function(*args)
+            record(phase, clock() - start)
+            return result
+        return wrapper
+
+    def percentile(self, phase: str, q: float) -> float:
+        """Percentile q (0-100) approche des durees de la phase, en ns."""
+        counts = self.histograms[phase]
+        target = q / 100 * sum(counts)
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if count and seen >= target:
+                return bucket_value(index)
+        return 0.0
+
+    def summary(self) -> dict:
+        """Resume par phase : nombre d'appels, total, p50/p95/p99 (ns)."""
+        return {
+            phase: {
+                "count": sum(counts),
+                "total_ms": self.totals[phase] / 1e6,
+                "p50_ns": self.percentile(phase, 50),
+                "p95_ns": self.percentile(phase, 95),
+                "p99_ns": self.percentile(phase, 99),
+            }
+            for phase, counts in self.histograms.items()
+        }
+
+    def report(self, file=None) -> None:
+        """Affiche le tableau des phases, triees par temps total."""
+        file = file or sys.stdout
+        rows = sorted(self.summary().items(), key=lambda item: -item[1]["total_ms"])
+        grand_total = sum(row["total_ms"] for _, row in rows) or 1.0
+        print(f"{'phase':10s} {'appels':>10s} {'total ms':>10s} {'part':>6s} "
+              f"{'p50 ns':>10s} {'p95 ns':>10s} {'p99 ns':>10s}", file=file)
+        for phase, row in rows:
+            print(f"{phase:10s} {row['count']:10d} {row['total_ms']:10.1f} "
+                  f"{row['total_ms'] / grand_total:6.1%} {row['p50_ns']:10.0f} "
+                  f"{row['p95_ns']:10.0f} {row['p99_ns']:10.0f}", file=file)
+
+    def install_signal_handler(self, signum=None) -> None:
+        """Affiche le rapport a la reception d'un signal (SIGUSR1 par defaut)."""
+        if signum is None:
+            signum = getattr(signal, "SIGUSR1", None)
+            if signum is None:  # pas de SIGUSR1 (Windows)
+                return
+        signal.signal(signum, lambda *_: self.report(sys.stderr))
@@ -0,0 +1,90 @@
+"""Affichage decouple de l'entrainement.
+
+La boucle d'apprentissage publie des instantanes immuables du plateau dans
+un tampon a une place (SnapshotBuffer) ; render_loop les dessine a une
+frequence fixe depuis le thread principal et gere les evenements (pause,
+fermeture). Un instantane n'est construit que lorsque l'affichage en
+redemande un : quand l'entrainement va plus vite que l'ecran, les etats
+intermediaires ne sont simplement jamais dessines.
+"""
+import threading
+from typing import NamedTuple
+
+import pygame
+
+from display import draw_game_display, draw_pause_message, invalidate_display
+
+
+class BoardSnapshot(NamedTuple):
+    """Etat fige d'un plateau (compatible avec draw_game_display)."""
+    snake: tuple
+    green_apples: tuple
+    red_apple: tuple
+    session: int
+    step: int
+
+    @classmethod
+    def of(cls, game, session=0, step=0):
+        snake, green_apples, red_apple = game.get_state()
+        return cls(tuple(snake), tuple(green_apples), red_apple, session, step)
+
+    def get_state(self):
+        return self.snake, self.green_apples, self.red_apple
+
+
+class SnapshotBuffer:
+    def __init__(self):
+        """Tampon a une place entre l'entrainement et l'affichage."""
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self.wanted = True  # l'affichage attend un nouvel instantane
+        self.running = threading.Event()  # efface pendant la pause
+        self.running.set()
+        self.closed = False  # fenetre fermee : l'entrainement s'arrete
+
+    def publish(self, snapshot: BoardSnapshot) -> None:
+        """Remplace l'instantane courant (cote entrainement)."""
+        with self._lock:
+            self._snapshot = snapshot
+            self.wanted = False
+
+    def take(self):
+        """Recupere le dernier instantane, ou None (cote affichage)."""
+        with self._lock:
+            snapshot, self._snapshot = self._snapshot, None
+            self.wanted = True
+        return snapshot
+
+    def close(self) -> None:
+        """Demande l'arret de l'entrainement (et leve une eventuelle pause)."""
+        self.closed = True
+        self.running.set()
+
+
+def render_loop(DISPLAYSURF, buffer: SnapshotBuffer, worker: threading.Thread,
+                grid: int, mult: int, images: dict, fps: float) -> None:
+    """Dessine les instantanes a fps images/s tant que worker tourne."""
+    clock = pygame.time.Clock()
+    paused = False
+    while worker.is_alive():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                buffer.close()
+                return
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                paused = not paused  # Bascule l'etat de pause
+                if paused:
+                    buffer.running.clear()
+                else:
+                    invalidate_display(DISPLAYSURF)
+                    buffer.running.set()
+
+        if paused:
+            draw_pause_message(DISPLAYSURF)
+            pygame.display.flip()
+        else:
+            snapshot = buffer.take()
+            if snapshot is not None:
+                pygame.display.update(
+                    draw_game_display(DISPLAYSURF, snapshot, grid, mult, images))
+        clock.tick(fps)
@@ -0,0 +1,65 @@
+"""Replay buffer des transitions.
+
+Tableaux NumPy prealloues utilises en anneau : codes d'etat, actions,
+recompenses, codes d'etat suivant et fins de partie. Une fois plein, chaque
+nouvelle transition remplace la plus ancienne. Les minibatchs sont tires
+uniformement (avec remise) et retournes comme tableaux, prets pour
+DenseQLearningAgent.update_batch.
+
+Les etats sont des codes entiers par defaut ; state_shape / state_dtype
+permettent d'y ranger des vecteurs (ex. caracteristiques float32 de
+MLPQAgent).
+"""
+import numpy as np
+
+
+class ReplayBuffer:
+    def __init__(self, capacity: int, seed=None, state_shape=(), state_dtype=np.int32):
+        """Initialisation (capacity transitions au plus)."""
+        self.capacity = capacity
+        self.states = np.zeros((capacity, *state_shape), dtype=state_dtype)
+        self.actions = np.zeros(capacity, dtype=np.int8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, *state_shape), dtype=state_dtype)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.position = 0  # prochaine case ecrite
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state: int, action: int, reward: float, next_state: int,
+            done: bool) -> None:
+        """Ajoute une transition."""
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, dones) -> None:
+        """Ajoute un lot de transitions (tableaux de meme longueur)."""
+        count = len(states)
+        if count > self.capacity:  # seules les dernieres transitions restent
+            states, actions, rewards, next_states, dones = (
+                array[-self.capacity:]
+                for array in (states, actions, rewards, next_states, dones))
+            count = self.capacity
+        index = (self.position + np.arange(count)) % self.capacity
+        self.states[index] = states
+        self.actions[index] = actions
+        self.rewards[index] = rewards
+        self.next_states[index] = next_states
+        self.dones[index] = dones
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def sample(self, batch_size: int) -> tuple:
+        """Minibatch tire au hasard : (etats, actions, recompenses, suivants, fins)."""
+        index = self.rng.integers(0, self.size, size=batch_size)
+        return (self.states[index], self.actions[index], self.rewards[index],
+                self.next_states[index], self.dones[index])
@@ -2,17 +2,109 @@
 
 La classe SnakeGame initialise le jeu et definit toutes les fonctions afferentes.
 grid : taille de la grille.
+
+Le corps du serpent est une deque (tete en position 0) et le plateau est
+doublé d'une grille d'occupation (bytearray, indice y * grid + x) mise a
+jour a chaque deplacement : les collisions et la vision coutent O(1) par
+case, quelle que soit la longueur du serpent. Les cases libres de la zone
+d'apparition des pommes sont tenues dans un FreeCellIndex : faire apparaitre
+une pomme coute O(1).
+
+Chaque modification du serpent ou des pommes incremente un compteur de
+version : la vision et le resume des pommes visibles sont mis en cache pour
+la version courante et ne sont recalcules qu'apres une modification.
+
+Observation compacte (get_observation) : la vision 4 directions est un seul
+entier (indice du symbole dans VISION_SYMBOLS sur 3 bits par direction,
+puis tranche de distance sur 3 bits par direction) accompagne du tuple des
+distances entieres, calcules sans aucune chaine. get_snake_vision en
+derive la forme historique (tuples de chaines) par decode_observation.
+
+Plans du plateau complet (optionnels, planes=True ou attach_planes) : un
+BoardPlanes (cf. planes.py) suit chaque modification du plateau ;
+get_planes et get_window en donnent des vues NumPy sans copie.
+
+Tout le hasard du jeu (placement du serpent et des pommes) passe par
+self.rng : avec une graine (SnakeGame(..., seed=s) ou reset(seed=s)), une
+partie est entierement determinee par la graine et la suite des actions.
 """
 import random
+from bisect import bisect_left
+from collections import deque
+from itertools import product
+
+from freecells import FreeCellIndex
+
+# Alphabet de la vision (un symbole par direction : haut, droite, bas, gauche)
+# W/w = mur proche/eloigne, S/s = serpent proche/eloigne, G/R = pommes
+VISION_SYMBOLS = ('W', 'w', 'S', 's', 'G', 'R')
+
+# Codes des cases du plateau
+EMPTY, WALL, SNAKE, GREEN, RED = 0, 1, 2, 3, 4
+
+# Observation compacte : bits 0-11 = vue (3 bits par direction, haut en
+# poids fort), bits 12-23 = tranches de distance (meme ordre)
+OBSERVATION_BITS = 3
+VIEW_BITS = 4 * OBSERVATION_BITS
+VIEW_MASK = (1 << VIEW_BITS) - 1
+# Tranches de distance (bornes hautes, la derniere tranche regroupe tout
+# ce qui est au-dela de 21 cases)
+DISTANCE_BOUNDS = (1, 2, 3, 5, 8, 13, 21)
+_BUCKETS = [bisect_left(DISTANCE_BOUNDS, d) for d in range(DISTANCE_BOUNDS[-1] + 1)]
+# Indice dans VISION_SYMBOLS par code de case : (proche, eloigne)
+SYMBOL_INDEX = (None, (0, 1), (2, 3), (4, 4), (5, 5))
+
+
+def distance_bucket(distance: int) -> int:
+    """Tranche (0 a 7) d'une distance, cf. DISTANCE_BOUNDS."""
+    return _BUCKETS[distance] if distance < len(_BUCKETS) else len(DISTANCE_BOUNDS)
+
+
+def _view_tuples() -> list:
+    """Tuple de symboles de chacune des 4096 vues compactes (None si invalide)."""
+    # Chiffres 6 et 7 : pas de symbole ; product enumere haut en poids fort
+    symbols = VISION_SYMBOLS + (None,) * ((1 << OBSERVATION_BITS) - len(VISION_SYMBOLS))
+    return [None if None in view else view for view in product(symbols, repeat=4)]
+
+
+_VIEWS = _view_tuples()
+
+
+def decode_view(packed: int) -> tuple:
+    """Vue (tuple de symboles) d'une observation compacte, sans allocation."""
+    return _VIEWS[packed & VIEW_MASK]
+
+
+def decode_observation(observation) -> tuple:
+    """Forme historique de la vision : (symboles, distances en chaines)."""
+    packed, distances = observation
+    return decode_view(packed), tuple(str(distance) for distance in distances)
+
+
+# Causes de fin de partie (self.death_cause, None tant que la partie continue).
+# Pas de mort par pomme rouge : la tete vient d'etre ajoutee, le serpent
+# garde toujours au moins un segment.
+DEATH_CAUSES = (None, 'wall', 'self')
 
 
 class SnakeGame:
-    def __init__(self, grid, goal):
-        """Initialisation."""
+    def __init__(self, grid, goal, seed=None, planes=False):
+        """Initialisation (seed : graine du generateur du jeu, optionnelle).
+
+        planes : maintient les plans du plateau (cf. attach_planes).
+        """
+        # Sans graine, le module random (generateur global) est utilise
+        self.rng = random if seed is None else random.Random(seed)
         self.grid_size = grid
         self.init_goal = goal
         self.goal = goal  # Nb de segments a atteindre
-        self.snake = self._place_snake_randomly()
+        self._version = 0  # compteur de modifications (cache de la vision)
+        self._observation_cache = (-1, None)
+        self._vision_cache = (-1, None)
+        self._apples_cache = (-1, None)
+        self.planes = None  # BoardPlanes (cf. attach_planes)
+        self.snake = deque(self._place_snake_randomly())
+        self._build_board()
 
         self.green_apples = []  # Initialisation temporaire
         self.red_apple = (0, 0)  # Initialisation temporaire
@@ -20,9 +112,35 @@ class SnakeGame:
         self.last_seen_apples = self.get_visible_apples()
 
         self.done = False
+        self.death_cause = None
         self.reward = 0
         # self.current_direction = 'haut'
         self.previous_positions = []
+        if planes:
+            self.attach_planes()
+
+    def attach_planes(self, planes=None):
+        """Maintient les plans du plateau dans planes (BoardPlanes, cree si absent).
+
+        NumPy n'est importe qu'ici : sans plans, le jeu n'en depend pas.
+        """
+        if planes is None:
+            from planes import BoardPlanes
+            planes = BoardPlanes(self.grid_size)
+        self.planes = planes
+        planes.rebuild(self)
+
+    def get_planes(self):
+        """Plans (tete, corps, verte, rouge, mur) du plateau et de son contour.
+
+        Vue en lecture seule (5, grid + 2, grid + 2), mise a jour a chaque pas.
+        """
+        return self.planes.view
+
+    def get_window(self, radius=1):
+        """Plans (5, 2 * radius + 1, 2 * radius + 1) centres sur la tete."""
+        head_x, head_y = self.snake[0]
+        return self.planes.window(head_x, head_y, radius)
 
     def _place_snake_randomly(self):
         """Place un serpent de 3 segments a une position random."""
@@ -31,19 +149,19 @@ class SnakeGame:
 
         # Generer une position de depart aleatoire en evitant les bords
         margin = snake_length + 1
-        start_x = random.randint(margin, self.grid_size - margin - 1)
-        start_y = random.randint(margin, self.grid_size - margin - 1)
+        start_x = self.rng.randint(margin, self.grid_size - margin - 1)
+        start_y = self.rng.randint(margin, self.grid_size - margin - 1)
 
         # orientation initiale (haut, bas, gauche, droite)
         directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]  # (dx, dy)
-        current_direction = random.choice(directions)
+        current_direction = self.rng.choice(directions)
 
         # Construire le corps du serpent en fonction de l'orientation
         snake = [(start_x, start_y)]
         for i in range(1, snake_length):
             # Modifier la direction occasionnellement
-            if random.random() < 0.3:  # 30% de chance de changer de direction
-                current_direction = random.choice(directions)
+            if self.rng.random() < 0.3:  # 30% de chance de changer de direction
+                current_direction = self.rng.choice(directions)
 
             # Ajouter les segments en suivant la direction
             new_x = snake[-1][0] + current_direction[0]
@@ -53,13 +171,69 @@ class SnakeGame:
         # retourne la liste des segments du serpent
         return snake
 
+    def _build_board(self):
+        """Reconstruit la grille d'occupation a partir du serpent."""
+        self._version += 1
+        self.board = bytearray(self.grid_size * self.grid_size)  # code par case
+        self.occupancy = bytearray(self.grid_size * self.grid_size)  # nb de segments
+        # Zone d'apparition des pommes : 1 <= x, y <= grid - 3
+        zone = range(1, self.grid_size - 2)
+        self.free_cells = FreeCellIndex((x, y) for x in zone for y in zone)
+        planes = self.planes
+        self.planes = None  # reconstruits en une fois ci-dessous
+        for x, y in self.snake:
+            self._add_segment(x, y)
+        self.planes = planes
+        if planes is not None:
+            planes.rebuild(self)
+
+    def _add_segment(self, x, y):
+        """Marque une case occupee par un segment du serpent."""
+        self._version += 1
+        cell = y * self.grid_size + x
+        self.occupancy[cell] += 1
+        self.board[cell] = SNAKE
+        self.free_cells.discard((x, y))
+        if self.planes is not None:
+            self.planes.add_segment(x, y, self.snake[0])
+
+    def _remove_tail(self):
+        """Retire le dernier segment du serpent et libere sa case."""
+        self._version += 1
+        x, y = self.snake.pop()
+        cell = y * self.grid_size + x
+        self.occupancy[cell] -= 1
+        if not self.occupancy[cell]:
+            self.board[cell] = EMPTY
+            if 1 <= x < self.grid_size - 2 and 1 <= y < self.grid_size - 2:
+                self.free_cells.add((x, y))
+            if self.planes is not None:
+                self.planes.remove_segment(x, y)
+        if self.planes is not None and not self.snake:
+            self.planes.set_head(None)
+
+    def _set_apple(self, pos, code):
+        """Pose une pomme (GREEN ou RED) sur le plateau."""
+        self._version += 1
+        x, y = pos
+        self.board[y * self.grid_size + x] = code
+        if self.planes is not None:
+            self.planes.set_apple(x, y, code)
+
     def _place_apples_randomly(self, num_apples):
-        """Place les pommes a des positions random."""
-        # genere des positions uniques pour les pommes
-        all_pos = set((x, y) for x in range(1, self.grid_size - 2) for y in range(1, self.grid_size - 2))
-        occupied = set(self.snake) | set(self.green_apples) | {self.red_apple}  # empeche les pommes d'apparaitre sur le snake ou sur d'autres apples
-        available_pos = list(all_pos - occupied)
-        return random.sample(available_pos, num_apples)
+        """Place les pommes a des positions random.
+
+        Tire les cases dans l'index des cases libres (O(1) par pomme) et les
+        retire de l'index. Si le plateau est plein, retourne moins de
+        num_apples positions (liste vide s'il n'y a plus de place).
+        """
+        apples = []
+        for _ in range(num_apples):
+            cell = self.free_cells.pop_random(self.rng)
+            if cell is None:
+                break
+            apples.append(cell)
+        return apples
 
     # def get_snake_real_vision(self):
     #     """Donne la vue depuis la tete du serpent sous forme d'un vecteur."""
@@ -100,116 +274,81 @@ class SnakeGame:
     #     # print(f"hori / verti : {combined_view}")
     #     return combined_view
 
+    def get_observation(self):
+        """Observation compacte depuis la tete (calculee une fois par etat).
+
+        Retourne (packed, distances) : packed code la vue (bits 0-11) et les
+        tranches de distance (bits 12-23), distances est le tuple des
+        distances entieres (haut, droite, bas, gauche). None si le serpent
+        est vide.
+        """
+        version, observation = self._observation_cache
+        if version != self._version:
+            observation = self._compute_observation()
+            self._observation_cache = (self._version, observation)
+        return observation
+
     def get_snake_vision(self):
-        """Donne la vue depuis la tete du serpent sous forme d'un vecteur."""
+        """Donne la vue depuis la tete du serpent (calculee une fois par etat).
+
+        Forme historique (tuple de symboles, tuple de distances en chaines),
+        pour l'affichage et les anciennes Q-tables ; cf. get_observation.
+        """
+        version, vision = self._vision_cache
+        if version != self._version:
+            observation = self.get_observation()
+            vision = None if observation is None else decode_observation(observation)
+            self._vision_cache = (self._version, vision)
+        return vision
+
+    def _compute_observation(self):
+        """Lance un rayon dans chaque direction jusqu'au premier obstacle."""
         if len(self.snake) == 0:
             print("Erreur: le serpent est vide. Reinitialisation necessaire.")
             return
         head_x, head_y = self.snake[0]  # Coordonnees de la tete
-
-        vision = {'up': None, 'right': None, 'down': None, 'left': None}  # Résultat final
-        distances = {'up': None, 'right': None, 'down': None, 'left': None}
-
-        # Définir les directions de balayage
-        directions = {
-            'up': (0, -1),
-            'right': (1, 0),
-            'down': (0, 1),
-            'left': (-1, 0)
-        }
-        # symbols = {  # Symboles pour chaque type d'objet
-        #     1: 'S',   # Snake proche
-        #     2: 'G',   # Green Apple
-        #     3: 'R',   # Red Apple
-        #     'wall': 'W'
-        # }
-
-        # Vérifier chaque direction
-        for direction, (dx, dy) in directions.items():
-            distance = 0
-            x, y = head_x, head_y
-
-            while True:  # Raycasting pour s'arreter au premier obstacle
-                x += dx
-                y += dy
-                distance += 1
-
-                if x < 0 or y < 0 or x >= self.grid_size or y >= self.grid_size:
-                    # vision[direction] = 'W' if distance <= 2 else 'w'  # W = proche, w = éloigné
-                    dir = 'W' if distance <= 2 else 'w'  # W = proche, w = éloigné
-                    vision[direction] = f'{dir}'
-                    distances[direction] = f'{distance}'
-                    break  # Mur détecté, on arrête le scan
-
-                if (x, y) in self.snake:
-                    # vision[direction] = 'S' if distance <= 2 else 's'  # S = proche, s = éloigné
-                    dir = 'S' if distance <= 2 else 's'  # S = proche, s = éloigné
-                    vision[direction] = f'{dir}'
-                    distances[direction] = f'{distance}'
+        grid = self.grid_size
+        board = self.board
+
+        head = head_y * grid + head_x
+        view = buckets = 0
+        distances = []
+        # (pas dans le plateau, nb de cases avant le mur) : haut, droite, bas, gauche
+        for step, limit in ((-grid, head_y), (1, grid - 1 - head_x),
+                            (grid, grid - 1 - head_y), (-1, head_x)):
+            cell = head
+            distance = 1
+            # Raycasting pour s'arreter au premier obstacle (ou au mur)
+            while distance <= limit:
+                cell += step
+                code = board[cell]
+                if code:
                     break
-
-                if (x, y) in self.green_apples:
-                    vision[direction] = 'G'
-                    distances[direction] = f'{distance}'
-                    break
-
-                if (x, y) == self.red_apple:
-                    vision[direction] = 'R'
-                    distances[direction] = f'{distance}'
-                    break
-
-        # Retourner la vision sous forme de tuple
-        snake_view = tuple(vision.values())
-        distance_to_head = tuple(distances.values())
-        # print(snake_view)
-        return snake_view, distance_to_head
-
+                distance += 1
+            else:
+                code = WALL
+            view = view << OBSERVATION_BITS | SYMBOL_INDEX[code][distance > 2]
+            buckets = buckets << OBSERVATION_BITS | distance_bucket(distance)
+            distances.append(distance)
+        return buckets << VIEW_BITS | view, tuple(distances)
 
     def get_visible_apples(self):
+        """Pommes visibles depuis la tete (calculees une fois par etat)."""
+        version, apples = self._apples_cache
+        if version != self._version:
+            apples = self._compute_visible_apples()
+            self._apples_cache = (self._version, apples)
+        return apples
+
+    def _compute_visible_apples(self):
         """Determine si le serpent a des pommes dans son champ de vision, et a quelle distance."""
-        view, distances = self.get_snake_vision()
-        if view is None or distances is None: 
+        observation = self.get_observation()
+        if observation is None:
             return False, False, None, None  # Aucune donnee disponible
-        # print(view)
-
-        # Recherche des distances aux pommes
-        green_distances = []
-        red_distances = []
-
-        #---------------------------------------------------------------------
-        # head_x, head_y = self.snake[0]
-        # # On separe la vision horizontale et verticale de la vision du serpent
-        # hori_view = view[:self.grid_size]  # partie horizontale
-        # vert_view = view[self.grid_size:]  # partie verticale
-
-        # # Analyse de la vision horizontale (de gauche a droite)
-        # for i, cell in enumerate(hori_view):
-        #     if cell == 2:  # pomme verte detectee
-        #         green_distances.append(abs(i - head_x))
-        #     elif cell == 3:  # pomme rouge detectee
-        #         red_distances.append(abs(i - head_x))
-
-        # # Analyse de la vision verticale (de haut en bas)
-        # for j, cell in enumerate(vert_view):
-        #     if cell == 2:  # pomme verte detectee
-        #         green_distances.append(abs(j - head_y))
-        #     elif cell == 3:  # pomme rouge detectee
-        #         red_distances.append(abs(j - head_y))
-        #---------------------------------------------------------------------
-
-        for i, cell in enumerate(view):
-            if cell == 'G':
-                try:
-                    dist = int(distances[i])
-                    green_distances.append(dist)  # Extraire la distance apres G
-                except ValueError:
-                    continue
-            elif cell == 'R':
-                try: 
-                    dist = int(distances[i])
-                    red_distances.append(int(cell[1:]))
-                except ValueError:
-                    continue
+        packed, distances = observation
+        view = decode_view(packed)
+        green_distances = [d for symbol, d in zip(view, distances) if symbol == 'G']
+        red_distances = [d for symbol, d in zip(view, distances) if symbol == 'R']
 
         # Retourne True/False et la distance minimale pour chaque pomme
         return bool(green_distances), bool(red_distances), min(green_distances, default=None), min(red_distances, default=None)
@@ -266,39 +405,42 @@ class SnakeGame:
 
         # Verifier les collisions (serpent et murs)
         if (new_head[0] < 0 or new_head[0] >= self.grid_size or 
-            new_head[1] < 0 or new_head[1] >= self.grid_size or
-            new_head in self.snake[1:]):
+            new_head[1] < 0 or new_head[1] >= self.grid_size):
+            self.death_cause = 'wall'
+            self.reward = -200
+            return self.reward, True  # Collision == grosse penalite et fin de partie
+        if self.occupancy[new_head[1] * self.grid_size + new_head[0]]:
+            self.death_cause = 'self'
             self.reward = -200
             return self.reward, True  # Collision == grosse penalite et fin de partie
 
         # Ajouter la nouvelle tete
-        self.snake.insert(0, new_head)
+        self.snake.appendleft(new_head)
+        self._add_segment(*new_head)
 
         # Verifier si une pomme est mangee
         if new_head in self.green_apples:
             self.green_apples.remove(new_head)
             self.reward = +2000
-            new_apple = self._place_apples_randomly(1)[0]
-            self.green_apples.append(new_apple)  # Ajoute la nouvelle pomme verte
+            for new_apple in self._place_apples_randomly(1):
+                self.green_apples.append(new_apple)  # Ajoute la nouvelle pomme verte
+                self._set_apple(new_apple, GREEN)
             return self.reward, False  # Recompense et le jeu continue
 
         # Verifier si une pomme rouge est mangee
         if new_head == self.red_apple:
             self.reward = -100
-            self.red_apple = self._place_apples_randomly(1)[0]
+            self.red_apple = self._new_red_apple()
             # Vérifier que le serpent a au moins deux segments avant de retirer le dernier
             if len(self.snake) > 2:
-                self.snake.pop()  # Retirer les 2 derniers segment car on a allonge le serpent lors de son avancee
-                self.snake.pop()
+                self._remove_tail()  # Retirer les 2 derniers segment car on a allonge le serpent lors de son avancee
+                self._remove_tail()
             elif len(self.snake) > 1:
-                self.snake.pop()  # Ne retirer qu'un seul segment si le serpent n'en a qu'un
-            if not self.snake:  # verifier si le serpent est mort apres avoir mange cette pommme
-                self.reward = -100
-                return self.reward, True  # jeu s'arrete
-            return self.reward, False  # Penalite mais jeu continue
+                self._remove_tail()  # Ne retirer qu'un seul segment si le serpent n'en a qu'un
+            return self.reward, False  # Penalite mais jeu continue (jamais vide)
 
         # pas de pomme mangee -> on enleve le dernier segment (mouvement normal)
-        self.snake.pop()
+        self._remove_tail()
         self.reward -= 2  # Penalite de base pour eviter l'inactivite
 
         # if self.snake.count(self.snake[0]) > 5:  # S'il tourne en rond sur la même position
@@ -335,26 +477,40 @@ class SnakeGame:
 
         return self.reward, False  # Retourner la recompense et jeu continue
 
-    def reset(self):
-        """Reinitialise le jeu avec un placement aleatoire."""
-        self.snake = self._place_snake_randomly()
+    def reset(self, seed=None):
+        """Reinitialise le jeu avec un placement aleatoire (graine optionnelle)."""
+        if seed is not None:
+            self.rng = random.Random(seed)
+        self.snake = deque(self._place_snake_randomly())
+        self._build_board()
         self._reset_apples()
         self.last_seen_apples = self.get_visible_apples()
         self.goal = self.init_goal
         self.done = False
+        self.death_cause = None
         self.reward = 0
         # self.current_direction = 'haut'  # Reinit la direction
-        self.previous_position = []
+        self.previous_positions = []
         return self.get_state()
 
     def _reset_apples(self):
         """Reinitialise les pommes aleatoirement."""
         self.green_apples = self._place_apples_randomly(2)
-        self.red_apple = self._place_apples_randomly(1)[0]
+        for apple in self.green_apples:
+            self._set_apple(apple, GREEN)
+        self.red_apple = self._new_red_apple()
+
+    def _new_red_apple(self):
+        """Place la pomme rouge (None si le plateau est plein)."""
+        apples = self._place_apples_randomly(1)
+        if not apples:
+            return None
+        self._set_apple(apples[0], RED)
+        return apples[0]
 
     def get_state(self):
         """Retourne l'etat du jeu (positions du serpent et des pommes)."""
-        return self.snake, self.green_apples, self.red_apple
+        return list(self.snake), self.green_apples, self.red_apple
     
     def get_snake_length(self):
         return len(self.snake)
@@ -0,0 +1,245 @@
+"""Balayage d'hyperparametres en parallele.
+
+Chaque configuration (alpha, gamma, decroissance d'epsilon, grid_size, goal)
+est entrainee sans affichage dans un processus du pool, avec sa propre
+graine et son propre dossier de sortie (run_XXX/ : agent.snkq, metrics.csv
+et log.txt). Le tableau consolide des resultats est ecrit dans
+results.csv : recompense moyenne finale, longueur max atteinte, nombre de
+sessions pour atteindre l'objectif et vitesse (pas/s).
+
+Recherche en grille (produit cartesien des valeurs donnees) :
+    python sweep.py --alpha 0.05 0.1 0.2 --gamma 0.8 0.9 0.95 --sessions 5000
+Recherche aleatoire (N tirages ; parametres reels tires entre le min et le
+max des valeurs donnees, parametres entiers tires parmi les valeurs) :
+    python sweep.py --random 32 --alpha 0.01 0.5 --decay 0.99 0.9999
+Avec et sans Q-table symetrique, 5 graines par configuration (moyennes
+par configuration en fin de tableau) :
+    python sweep.py --symmetric 0 1 --goal 6 --sessions 3000 --repeat 5
+"""
+import argparse
+import contextlib
+import csv
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from agent import DenseQLearningAgent, SymmetricQLearningAgent
+from checkpoint import save_checkpoint
+from launch import learning_phase
+from metrics import MetricsWriter, read_metrics
+from snakegame import SnakeGame
+
+# Parametres balayes et valeurs par defaut (une seule valeur = fixe)
+FLOAT_PARAMETERS = {
+    "alpha": (0.1,),
+    "gamma": (0.9,),
+    "decay": (DenseQLearningAgent.decay_rate,),
+    "min_epsilon": (DenseQLearningAgent.min_epsilon,),
+}
+INT_PARAMETERS = {
+    "grid_size": (10,),
+    "goal": (10,),
+    "symmetric": (0,),  # 1 : SymmetricQLearningAgent (4 actions)
+}
+PARAMETERS = (*FLOAT_PARAMETERS, *INT_PARAMETERS)
+RESULT_FIELDS = ("run", "seed", *PARAMETERS, "sessions", "mean_reward",
+                 "max_length", "sessions_to_goal", "steps_per_sec",
+                 "duration_s", "output")
+
+
+def grid_configs(space: dict) -> list:
+    """Produit cartesien des valeurs de chaque parametre."""
+    return [dict(zip(space, values)) for values in itertools.product(*space.values())]
+
+
+def random_configs(space: dict, count: int, rng: random.Random) -> list:
+    """count configurations tirees au hasard dans l'espace de recherche."""
+    configs = []
+    for _ in range(count):
+        config = {}
+        for name, values in space.items():
+            if name in FLOAT_PARAMETERS:
+                config[name] = rng.uniform(min(values), max(values))
+            else:
+                config[name] = rng.choice(values)
+        configs.append(config)
+    return configs
+
+
+def summarize(metrics_file: str, goal: int, window: int) -> dict:
+    """Resume d'un run a partir de son fichier de metriques."""
+    rows, _ = read_metrics(metrics_file)
+    rewards = [row["reward"] for row in rows[-window:]]
+    sessions_to_goal = next((int(row["session"]) + 1 for row in rows
+                             if row["max_length"] >= goal), None)
+    return {
+        "mean_reward": sum(rewards) / len(rewards) if rewards else 0.0,
+        "max_length": int(max((row["max_length"] for row in rows), default=0)),
+        "sessions_to_goal": sessions_to_goal,
+        "steps": int(sum(row["steps"] for row in rows)),
+    }
+
+
+def run_config(run: int, config: dict, sessions: int, seed: int,
+               output_dir: str, window: int) -> dict:
+    """Entraine une configuration (execute dans un processus du pool)."""
+    random.seed(seed)  # exploration de l'agent
+    np.random.seed(seed)
+    run_dir = os.path.join(output_dir, f"run_{run:03d}")
+    os.makedirs(run_dir, exist_ok=True)
+    metrics_file = os.path.join(run_dir, "metrics.csv")
+    if os.path.exists(metrics_file):
+        os.remove(metrics_file)  # MetricsWriter ecrit en ajout
+
+    game = SnakeGame(config["grid_size"], goal=config["goal"], seed=seed)
+    agent_class = SymmetricQLearningAgent if config["symmetric"] else DenseQLearningAgent
+    agent = agent_class(config["grid_size"], alpha=config["alpha"],
+                        gamma=config["gamma"])
+    agent.decay_rate = config["decay"]
+    agent.min_epsilon = config["min_epsilon"]
+
+    # Les messages de learning_phase vont dans le log du run
+    with open(os.path.join(run_dir, "log.txt"), "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), \
+            MetricsWriter(metrics_file, window) as metrics:
+        start = time.perf_counter()
+        learning_phase(game, agent, num_sessions=sessions, metrics=metrics)
+        duration = time.perf_counter() - start
+    save_checkpoint(agent, os.path.join(run_dir, "agent.snkq"))
+
+    summary = summarize(metrics_file, config["goal"], window)
+    return {
+        "run": run, "seed": seed, **config, "sessions": sessions,
+        "mean_reward": summary["mean_reward"],
+        "max_length": summary["max_length"],
+        "sessions_to_goal": summary["sessions_to_goal"],
+        "steps_per_sec": summary["steps"] / duration if duration else 0.0,
+        "duration_s": duration,
+        "output": run_dir,
+    }
+
+
+def sweep(configs: list, sessions: int, output_dir: str, seed=0,
+          workers=None, window=100) -> list:
+    """Entraine toutes les configurations sur workers processus."""
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(run_config, run, config, sessions, seed + run,
+                               output_dir, window)
+                   for run, config in enumerate(configs)]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            print(f"[{done}/{len(configs)}] run {result['run']} : "
+                  f"recompense moyenne={result['mean_reward']:.1f}, "
+                  f"longueur max={result['max_length']}, "
+                  f"{result['steps_per_sec']:.0f} pas/s")
+    results.sort(key=lambda result: result["run"])
+    return results
+
+
+def write_results(results: list, filename: str) -> None:
+    """Ecrit le tableau consolide des resultats (CSV)."""
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, RESULT_FIELDS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow({name: "" if result[name] is None else result[name]
+                             for name in RESULT_FIELDS})
+
+
+def print_results(results: list, sort_key="mean_reward") -> None:
+    """Affiche les resultats, meilleure configuration en premier."""
+    def key(result):
+        value = result[sort_key]
+        if sort_key == "sessions_to_goal":  # moins de sessions = mieux
+            return -value if value is not None else -float("inf")
+        return value
+
+    print(f"{'run':>4} {'alpha':>7} {'gamma':>6} {'decay':>8} {'min_eps':>7} "
+          f"{'grid':>5} {'goal':>5} {'sym':>3} {'reward':>9} {'max_len':>7} "
+          f"{'to_goal':>7} {'pas/s':>8}")
+    for result in sorted(results, key=key, reverse=True):
+        to_goal = result["sessions_to_goal"]
+        print(f"{result['run']:>4} {result['alpha']:>7.4f} {result['gamma']:>6.3f} "
+              f"{result['decay']:>8.5f} {result['min_epsilon']:>7.3f} "
+              f"{result['grid_size']:>5} {result['goal']:>5} {result['symmetric']:>3} "
+              f"{result['mean_reward']:>9.1f} {result['max_length']:>7} "
+              f"{'-' if to_goal is None else to_goal:>7} "
+              f"{result['steps_per_sec']:>8.0f}")
+
+
+def print_means(results: list) -> None:
+    """Moyennes par configuration (runs repetes avec --repeat)."""
+    groups = {}
+    for result in results:
+        groups.setdefault(tuple(result[name] for name in PARAMETERS), []).append(result)
+    print(f"Moyennes par configuration ({', '.join(PARAMETERS)}) :")
+    for config, runs in groups.items():
+        reached = [run["sessions_to_goal"] for run in runs
+                   if run["sessions_to_goal"] is not None]
+        to_goal = f"{sum(reached) / len(reached):.0f}" if reached else "-"
+        print(f"  {config} : {len(runs)} runs, recompense moyenne="
+              f"{sum(run['mean_reward'] for run in runs) / len(runs):.1f}, "
+              f"objectif atteint {len(reached)}/{len(runs)}, "
+              f"sessions pour l'objectif={to_goal}")
+
+
+def parse_arguments():
+    """Recupere l'espace de recherche et les options du balayage."""
+    parser = argparse.ArgumentParser(description="Balayage d'hyperparametres Snake Q-Learning.")
+    for name, default in FLOAT_PARAMETERS.items():
+        parser.add_argument(f"--{name}", type=float, nargs="+", default=list(default),
+                            help=f"Valeurs de {name}. Par defaut : {default[0]}.")
+    for name, default in INT_PARAMETERS.items():
+        parser.add_argument(f"--{name}", type=int, nargs="+", default=list(default),
+                            help=f"Valeurs de {name}. Par defaut : {default[0]}.")
+    parser.add_argument("--random", type=int, default=None,
+                        help="Recherche aleatoire de N configurations (grille sinon).")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Runs par configuration (graines differentes). Par defaut : 1.")
+    parser.add_argument("--sessions", type=int, default=1000,
+                        help="Sessions par configuration. Par defaut : 1000.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Graine de base (run i : seed + i). Par defaut : 0.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Nombre de processus. Par defaut : nombre de coeurs.")
+    parser.add_argument("--window", type=int, default=100,
+                        help="Sessions prises en compte pour la recompense finale. Par defaut : 100.")
+    parser.add_argument("--output", type=str, default="sweep",
+                        help="Dossier de sortie. Par defaut : sweep.")
+    parser.add_argument("--sort", choices=("mean_reward", "max_length",
+                                           "sessions_to_goal", "steps_per_sec"),
+                        default="mean_reward",
+                        help="Critere de tri de l'affichage. Par defaut : mean_reward.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Lance le balayage et ecrit le tableau des resultats."""
+    args = parse_arguments()
+    space = {name: getattr(args, name) for name in PARAMETERS}
+    if args.random:
+        configs = random_configs(space, args.random, random.Random(args.seed))
+    else:
+        configs = grid_configs(space)
+    configs = [config for config in configs for _ in range(args.repeat)]
+    print(f"{len(configs)} configurations, {args.sessions} sessions chacune.")
+
+    results = sweep(configs, args.sessions, args.output, args.seed,
+                    args.workers, args.window)
+    results_file = os.path.join(args.output, "results.csv")
+    write_results(results, results_file)
+    print_results(results, args.sort)
+    if args.repeat > 1:
+        print_means(results)
+    print(f"Resultats ecrits dans {results_file}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Configuration pytest : les modules du projet sont a la racine du depot."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
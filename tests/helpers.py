@@ -0,0 +1,67 @@
+"""Fonctions communes aux tests."""
+import random
+
+import numpy as np
+
+from snakegame import SNAKE, GREEN, RED
+from vecsnakegame import LOOP_MEMORY
+
+
+def safe_action(game, rng: random.Random, explore=0.1) -> int:
+    """Action qui evite les collisions (sauf avec une probabilite explore)."""
+    actions = list(range(4))
+    if rng.random() < explore:
+        return rng.choice(actions)
+    head_x, head_y = game.snake[0]
+    grid = game.grid_size
+    free = []
+    for action, (dx, dy) in enumerate(((0, -1), (1, 0), (0, 1), (-1, 0))):
+        x, y = head_x + dx, head_y + dy
+        if 0 <= x < grid and 0 <= y < grid and not game.occupancy[y * grid + x]:
+            free.append(action)
+    return rng.choice(free or actions)
+
+
+def play(game, steps, seed):
+    """Joue steps pas (parties reinitialisees), produit le jeu apres chaque pas."""
+    rng = random.Random(seed)
+    for _ in range(steps):
+        _, done = game.step(safe_action(game, rng))
+        if done:
+            game.reset()
+        yield game
+
+
+def copy_board(vgame, game) -> None:
+    """Recopie l'etat de game dans le plateau 0 de vgame."""
+    width = vgame.width
+
+    def cell(pos):
+        return (pos[1] + 1) * width + pos[0] + 1
+
+    vgame.board[0] = vgame._template
+    vgame.occ[0] = 0
+    cells = [cell(segment) for segment in game.snake]
+    vgame.body[0, :len(cells)] = cells
+    vgame.head_ptr[0] = 0
+    vgame.length[0] = len(cells)
+    for c in cells:
+        vgame.occ[0, c] += 1
+        vgame.board[0, c] = SNAKE
+    vgame.green[0] = -1
+    for i, apple in enumerate(game.green_apples):
+        vgame.green[0, i] = cell(apple)
+        vgame.board[0, cell(apple)] = GREEN
+    vgame.red[0] = -1
+    if game.red_apple is not None:
+        vgame.red[0] = cell(game.red_apple)
+        vgame.board[0, vgame.red[0]] = RED
+    # Memoire des positions : du plus ancien au plus recent, prochaine
+    # ecriture sur le plus ancien
+    positions = [cell(pos) for pos in game.previous_positions]
+    vgame.previous_positions[0] = -1
+    vgame.previous_positions[0, :len(positions)] = positions
+    vgame.prev_ptr[0] = len(positions) % LOOP_MEMORY
+    vgame.reward[0] = game.reward
+    vgame.steps[0] = 0
+    vgame._raycast(np.array([0]))
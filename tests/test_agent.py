@@ -0,0 +1,99 @@
+"""Agents a Q-table : etats visites, etats hors alphabet, table bornee."""
+import pickle
+
+import numpy as np
+import pytest
+
+from agent import (
+    DenseQLearningAgent, BoundedQLearningAgent, NUM_STATE_CODES,
+    EVICTION_CANDIDATES, encode_state
+    )
+from launch import create_agent
+
+
+def test_visited_state_with_zero_values():
+    agent = DenseQLearningAgent(10, alpha=0.5)
+    state = ('W', 'w', 'S', 'G')
+    # Recompense nulle, etat suivant nul : la ligne reste a zero
+    agent.update(state, 1, 0.0, ('w', 'w', 'w', 'w'))
+    assert not agent.q_values[encode_state(state)].any()
+    assert agent.num_states() == 1
+    assert state in agent.q_table
+
+    loaded = pickle.loads(pickle.dumps(agent))
+    assert loaded.num_states() == 1
+    assert loaded.q_table == agent.q_table
+
+
+def test_extra_states_grow_geometrically():
+    agent = DenseQLearningAgent(10, alpha=0.5)
+    states = [(0,) * 19 + (i,) for i in range(3000)]
+    capacities = set()
+    for i, state in enumerate(states):
+        agent.update(state, 0, float(i + 1), state)
+        capacities.add(len(agent.q_values))
+    # Doublements successifs de la capacite
+    assert capacities == {2 * NUM_STATE_CODES, 4 * NUM_STATE_CODES}
+    assert agent.num_states() == len(states)
+    assert [agent.state_index(state) for state in states] == \
+        list(range(NUM_STATE_CODES, NUM_STATE_CODES + len(states)))
+    assert agent.q_table[states[-1]][0] == np.float32(0.5 * 3000)
+
+    loaded = pickle.loads(pickle.dumps(agent))
+    assert loaded.q_table == agent.q_table
+    assert loaded.state_index(states[10]) == agent.state_index(states[10])
+
+
+def test_eviction_least_visited_among_oldest():
+    agent = BoundedQLearningAgent(10, alpha=0.5, max_states=10)
+    for code in range(10):
+        for _ in range(5):
+            agent.slot(code)
+    agent.visits[agent.slots[3]] = 2
+    agent.visits[agent.slots[9]] = 1  # moins visite, mais trop recent
+    agent.q_values[agent.slots[3]] = 7.0
+    freed = agent.slots[3]
+
+    assert agent.slot(100) == freed
+    assert 3 not in agent.slots and 9 in agent.slots
+    assert agent.evictions == 1
+    assert not agent.q_values[freed].any()
+    assert agent.visits[freed] == 1
+    # Un acces remet l'etat en fin d'ordre : il n'est plus candidat
+    agent.slot(0)
+    assert list(agent.slots)[-2:] == [100, 0]
+    assert 0 not in list(agent.slots)[:EVICTION_CANDIDATES]
+
+
+def test_resize_keeps_order_and_visits():
+    agent = BoundedQLearningAgent(10, alpha=0.5, max_states=6)
+    for code in (5, 1, 4, 2):
+        agent.q_values[agent.slot(code)] = code
+    agent.slot(1)
+    table = agent.q_table
+    visits = [agent.visits[slot] for slot in agent.slots.values()]
+
+    agent.resize(20)
+    assert agent.max_states == 20 and len(agent.q_values) == 20
+    assert list(agent.q_table.items()) == list(table.items())
+    assert [agent.visits[slot] for slot in agent.slots.values()] == visits
+    with pytest.raises(ValueError):
+        agent.resize(3)
+
+
+def test_load_for_distances(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    bounded = BoundedQLearningAgent(10, alpha=0.1, max_states=50)
+    bounded.slot(12345)
+    with open("agent_state_sessions_1.pkl", "wb") as file:
+        pickle.dump(bounded, file)
+    with open("agent_state_sessions_2.pkl", "wb") as file:
+        pickle.dump(DenseQLearningAgent(10, alpha=0.1), file)
+
+    agent = create_agent(10, 0.1, "1", play_mode=False, dense=False, distances=True)
+    assert agent.max_states == 50
+    agent = create_agent(10, 0.1, "1", play_mode=False, dense=False,
+                         distances=True, max_states=200)
+    assert agent.max_states == 200 and 12345 in agent.slots
+    with pytest.raises(ValueError):
+        create_agent(10, 0.1, "2", play_mode=False, dense=False, distances=True)
@@ -0,0 +1,118 @@
+"""Format .snkq : aller-retour de chaque type d'agent, pickles anciens."""
+import pickle
+
+import numpy as np
+import pytest
+
+from agent import (
+    QLearningAgent, DenseQLearningAgent, SymmetricQLearningAgent,
+    BoundedQLearningAgent, NUM_STATE_CODES
+    )
+from checkpoint import (
+    save_checkpoint, load_checkpoint, read_header, convert_pickle,
+    KIND_TABLE, KIND_BOUNDED, KIND_SYMMETRIC, KIND_LINEAR, KIND_MLP
+    )
+from linearagent import LinearQAgent
+from mlpagent import MLPQAgent
+
+
+def assert_same_parameters(loaded, agent):
+    assert type(loaded) is type(agent)
+    assert loaded.grid_size == agent.grid_size
+    assert loaded.num_actions == agent.num_actions
+    assert loaded.alpha == agent.alpha
+    assert loaded.gamma == agent.gamma
+    assert loaded.epsilon == agent.epsilon
+
+
+@pytest.mark.parametrize("agent_class, kind", [
+    (DenseQLearningAgent, KIND_TABLE),
+    (SymmetricQLearningAgent, KIND_SYMMETRIC),
+    ])
+def test_dense_round_trip(tmp_path, agent_class, kind):
+    agent = agent_class(10, epsilon=0.5, alpha=0.1)
+    rng = np.random.default_rng(0)
+    codes = rng.choice(NUM_STATE_CODES, size=50, replace=False)
+    agent.q_values[codes] = rng.normal(size=(50, agent.num_actions))
+    agent.visited[codes] = True
+    filename = tmp_path / "agent.snkq"
+
+    assert save_checkpoint(agent, filename) == 50
+    assert read_header(filename)["kind"] == kind
+    loaded = load_checkpoint(filename)
+    assert_same_parameters(loaded, agent)
+    assert np.array_equal(loaded.q_values, agent.q_values)
+    assert loaded.num_states() == 50
+
+
+def test_bounded_round_trip(tmp_path):
+    agent = BoundedQLearningAgent(10, epsilon=0.3, alpha=0.2, max_states=20)
+    rng = np.random.default_rng(1)
+    for code in rng.integers(1 << 20, size=60).tolist():
+        agent.q_values[agent.slot(code)] = rng.normal(size=agent.num_actions)
+    filename = tmp_path / "agent.snkq"
+
+    save_checkpoint(agent, filename)
+    assert read_header(filename)["kind"] == KIND_BOUNDED
+    loaded = load_checkpoint(filename)
+    assert_same_parameters(loaded, agent)
+    assert loaded.max_states == agent.max_states
+    # Meme contenu, meme ordre de recence, memes visites
+    assert list(loaded.q_table.items()) == list(agent.q_table.items())
+    assert ([loaded.visits[slot] for slot in loaded.slots.values()]
+            == [agent.visits[slot] for slot in agent.slots.values()])
+
+
+def test_linear_round_trip(tmp_path):
+    agent = LinearQAgent(10, epsilon=0.2, alpha=0.01)
+    agent.weights[:] = np.random.default_rng(2).normal(size=agent.weights.shape)
+    filename = tmp_path / "agent.snkq"
+
+    save_checkpoint(agent, filename)
+    assert read_header(filename)["kind"] == KIND_LINEAR
+    loaded = load_checkpoint(filename)
+    assert_same_parameters(loaded, agent)
+    assert np.array_equal(loaded.weights, agent.weights)
+
+
+@pytest.mark.parametrize("window", [0, 2])
+def test_mlp_round_trip(tmp_path, window):
+    agent = MLPQAgent(10, epsilon=0.1, hidden=(16, 8), window=window, seed=3)
+    agent.learning_rate = 5e-4
+    filename = tmp_path / "agent.snkq"
+
+    save_checkpoint(agent, filename)
+    assert read_header(filename)["kind"] == KIND_MLP
+    loaded = load_checkpoint(filename)
+    assert_same_parameters(loaded, agent)
+    assert loaded.hidden == agent.hidden
+    assert loaded.window == agent.window
+    assert loaded.learning_rate == agent.learning_rate
+    assert np.array_equal(loaded.theta, agent.theta)
+    assert np.array_equal(loaded.target_theta, agent.theta)
+
+
+def test_convert_pickle(tmp_path):
+    agent = QLearningAgent(10, alpha=0.1)
+    agent.q_table = {('W', 'w', 'S', 'G'): [1.0, 2.0, 3.0],
+                     ('R', 's', 'w', 'W'): [-1.0, 0.5, 0.0]}
+    filename = tmp_path / "agent.pkl"
+    with open(filename, "wb") as file:
+        pickle.dump(agent, file)
+
+    loaded = load_checkpoint(convert_pickle(str(filename)))
+    assert loaded.q_table == agent.q_table
+
+
+def test_convert_pickle_refuses_lossy_conversion(tmp_path):
+    # Anciens etats de 20 entiers : pas de code de vision 4 directions
+    agent = QLearningAgent(10, alpha=0.1)
+    agent.q_table = {(0,) * 19 + (1,): [1.0, 2.0, 3.0],
+                     ('W', 'w', 'S', 'G'): [1.0, 0.0, 0.0]}
+    filename = tmp_path / "agent.pkl"
+    with open(filename, "wb") as file:
+        pickle.dump(agent, file)
+
+    with pytest.raises(ValueError):
+        convert_pickle(str(filename))
+    assert not (tmp_path / "agent.snkq").exists()
@@ -0,0 +1,35 @@
+"""Affichage incremental : cases redessinees, cache des frames par surface."""
+import gc
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+import display  # noqa: E402
+from snakegame import SnakeGame  # noqa: E402
+
+NAMES = ("green_apple", "red_apple", "snake_segment", "snake_head", "floor", "wall")
+
+
+def test_frames_cached_per_surface():
+    mult = 4
+    game = SnakeGame(10, goal=6, seed=0)
+    images = {name: pygame.Surface((mult, mult)) for name in NAMES}
+    surface = pygame.Surface((12 * mult, 12 * mult))
+
+    rects = display.draw_game_display(surface, game, 10, mult, images)
+    assert rects == [surface.get_rect()]
+    # Rien n'a change : aucune case a redessiner
+    assert display.draw_game_display(surface, game, 10, mult, images) == []
+    display.invalidate_display(surface)
+    rects = display.draw_game_display(surface, game, 10, mult, images)
+    assert rects == [surface.get_rect()]
+
+    # Une nouvelle surface est entierement dessinee, l'ancienne sort du cache
+    del surface
+    gc.collect()
+    assert len(display._last_frames) == 0
+    other = pygame.Surface((12 * mult, 12 * mult))
+    assert display.draw_game_display(other, game, 10, mult, images) == [other.get_rect()]
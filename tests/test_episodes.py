@@ -0,0 +1,64 @@
+"""Parties rejouables : une graine et des actions determinent la partie."""
+import random
+
+import pytest
+
+import pipeline
+from agent import DenseQLearningAgent
+from episodes import EpisodeRecorder, EpisodeReplay, read_episodes, verify_episodes
+from helpers import safe_action
+from largesnakegame import LargeSnakeGame
+from snakegame import SnakeGame
+
+
+def snapshot(game) -> tuple:
+    """Copie de get_state() (la liste des pommes vertes est celle du jeu)."""
+    snake, green_apples, red_apple = game.get_state()
+    return snake, list(green_apples), red_apple
+
+
+@pytest.mark.parametrize("game_class", [SnakeGame, LargeSnakeGame])
+def test_same_seed_same_game(game_class):
+    rng = random.Random(4)
+    actions = []
+    first = game_class(10, goal=6, seed=123)
+    trace = []
+    for _ in range(300):
+        action = safe_action(first, rng)
+        actions.append(action)
+        reward, done = first.step(action)
+        trace.append((reward, done, snapshot(first)))
+        if done:
+            break
+
+    second = game_class(10, goal=6)
+    second.reset(seed=123)
+    for action, expected in zip(actions, trace):
+        reward, done = second.step(action)
+        assert (reward, done, snapshot(second)) == expected
+
+
+def test_recorded_episodes_replay(tmp_path):
+    filename = str(tmp_path / "parties.snke")
+    recorder = EpisodeRecorder(filename, seed=7)
+    game = SnakeGame(10, goal=6)
+    agent = DenseQLearningAgent(10, alpha=0.1)
+    stream = pipeline.transitions(game, agent, 30, seeds=iter(recorder.begin, None))
+    stream = pipeline.learner(stream, agent)
+    stream = pipeline.recording(stream, game, recorder)
+    pipeline.summarize(stream, game, agent)
+    recorder.close()
+
+    episodes = list(read_episodes(filename))
+    assert len(episodes) == 30
+    assert verify_episodes(filename) == 0
+
+    # Retour en arriere : meme etat qu'en avancant directement
+    episode = max(episodes, key=lambda e: e.steps)
+    replay = EpisodeReplay(episode)
+    replay.seek(episode.steps)
+    final_state = snapshot(replay.game)
+    replay.seek(episode.steps // 2)
+    replay.seek(episode.steps)
+    assert snapshot(replay.game) == final_state
+    assert replay.matches()
@@ -0,0 +1,35 @@
+"""Index des cases libres : operations O(1) et coherence avec SnakeGame."""
+import random
+
+from freecells import FreeCellIndex
+from helpers import play
+from snakegame import SnakeGame
+
+
+def test_index_operations():
+    index = FreeCellIndex(range(10))
+    index.discard(3)
+    index.discard(3)  # deja occupee : sans effet
+    index.discard(9)
+    index.add(3)
+    index.add(3)
+    assert sorted(index.cells) == [0, 1, 2, 3, 4, 5, 6, 7, 8]
+    assert all(index.cells[i] == cell for cell, i in index.positions.items())
+
+    rng = random.Random(0)
+    drawn = [index.pop_random(rng) for _ in range(len(index))]
+    assert sorted(drawn) == [0, 1, 2, 3, 4, 5, 6, 7, 8]
+    assert len(index) == 0 and 5 not in index
+    assert index.pop_random(rng) is None
+
+
+def test_free_cells_match_board():
+    game = SnakeGame(10, goal=8, seed=4)
+    zone = range(1, game.grid_size - 2)
+    for game in play(game, 3000, seed=5):
+        taken = set(game.snake) | set(game.green_apples) | {game.red_apple}
+        free = {(x, y) for x in zone for y in zone} - taken
+        assert set(game.free_cells.cells) == free
+        assert len(game.free_cells.cells) == len(free)
+        assert all(game.free_cells.cells[i] == cell
+                   for cell, i in game.free_cells.positions.items())
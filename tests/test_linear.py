@@ -0,0 +1,49 @@
+"""Agent lineaire : caracteristiques par lot et regle TD semi-gradient."""
+import numpy as np
+import pytest
+
+from features import NUM_FEATURES, game_features, vec_features
+from helpers import copy_board, play
+from linearagent import LinearQAgent
+from snakegame import SnakeGame
+from vecsnakegame import VecSnakeGame
+
+
+def test_vec_features_match_game_features():
+    vgame = VecSnakeGame(1, 10, goal=8, seed=0)
+    game = SnakeGame(10, goal=8, seed=1)
+    for game in play(game, 1000, seed=2):
+        copy_board(vgame, game)
+        vgame.goal = game.goal
+        assert np.allclose(vec_features(vgame)[0], game_features(game))
+
+
+def test_update_batch_matches_update():
+    rng = np.random.default_rng(0)
+    states = rng.random((2, NUM_FEATURES), dtype=np.float32)
+    agent = LinearQAgent(10, alpha=0.1)
+    agent.weights[:] = rng.normal(size=agent.weights.shape)
+    single = LinearQAgent(10, alpha=0.1)
+    single.weights[:] = agent.weights
+
+    agent.update_batch(states[:1], np.array([2]), np.array([5.0]), states[1:])
+    single.update(states[0], 2, 5.0, states[1])
+    assert np.allclose(agent.weights, single.weights, atol=1e-5)
+
+
+def test_done_drops_bootstrap():
+    rng = np.random.default_rng(1)
+    state, next_state = rng.random((2, NUM_FEATURES), dtype=np.float32)
+    agent = LinearQAgent(10, alpha=0.1, gamma=0.9)
+    agent.weights[:] = rng.normal(size=agent.weights.shape)
+    weights = agent.weights.copy()
+    q_value = weights[1] @ state
+
+    agent.update_batch(state[None], np.array([1]), np.array([-200.0]),
+                       next_state[None], np.array([True]))
+    # Cible sans Q(s') : Q(s, a) n'est rapproche que de la recompense
+    step = 0.1 * (-200.0 - q_value) / (state @ state)
+    assert np.allclose(agent.weights[1], weights[1] + step * state, atol=1e-4)
+    assert np.array_equal(agent.weights[[0, 2, 3]], weights[[0, 2, 3]])
+    assert agent.get_q_values(state)[1] == pytest.approx(q_value + 0.1 * (-200.0 - q_value),
+                                                          rel=1e-4)
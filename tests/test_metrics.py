@@ -0,0 +1,22 @@
+"""Metriques en flux : valeurs relues a l'identique, lecture incrementale."""
+import numpy as np
+
+from metrics import MetricsWriter, read_metrics
+
+
+def test_rewards_round_trip(tmp_path):
+    filename = str(tmp_path / "metrics.csv")
+    rewards = [1234567, -200, 2001.25, np.float64(-1234.5678901), 0.1]
+    with MetricsWriter(filename) as metrics:
+        for session, reward in enumerate(rewards):
+            metrics.write(session, reward, 10, 3, 4, 0.5, 12, 0.002)
+
+    rows, offset = read_metrics(filename)
+    assert [row["reward"] for row in rows] == [float(reward) for reward in rewards]
+    assert [row["session"] for row in rows] == list(range(len(rewards)))
+
+    # Reprise en ajout : seules les nouvelles lignes sont relues
+    with MetricsWriter(filename) as metrics:
+        metrics.write(5, 7, 10, 3, 4, 0.5, 12, 0.002)
+    rows, _ = read_metrics(filename, offset)
+    assert [row["session"] for row in rows] == [5]
@@ -0,0 +1,74 @@
+"""Reseau MLPQAgent : gradient de la perte de Huber, fins de partie, minibatchs."""
+import numpy as np
+
+from features import NUM_FEATURES
+from mlpagent import MLPQAgent
+
+
+def make_batch(seed, count=16):
+    rng = np.random.default_rng(seed)
+    return (rng.random((count, NUM_FEATURES), dtype=np.float32),
+            rng.integers(0, 4, size=count),
+            rng.choice([-200.0, -2.0, 18.0, 2000.0], size=count).astype(np.float32),
+            rng.random((count, NUM_FEATURES), dtype=np.float32),
+            rng.random(count) < 0.5)
+
+
+def huber_loss(agent, theta, batch) -> float:
+    """Perte de update_batch (moyenne de Huber), en float64."""
+    states, actions, rewards, next_states, dones = batch
+    next_q = MLPQAgent._forward(agent._layers(agent.target_theta.astype(np.float64)),
+                                next_states.astype(np.float64))[0].max(axis=1)
+    next_q[dones] = 0
+    targets = rewards * agent.reward_scale + agent.gamma * next_q
+    q_values = MLPQAgent._forward(agent._layers(theta), states.astype(np.float64))[0]
+    error = np.abs(q_values[np.arange(len(actions)), actions] - targets)
+    return np.where(error <= 1, 0.5 * error ** 2, error - 0.5).mean()
+
+
+def test_gradient_matches_finite_differences():
+    agent = MLPQAgent(10, hidden=(8,), seed=0)
+    batch = make_batch(1)
+    theta = agent.theta.astype(np.float64)
+    agent.update_batch(*batch)
+
+    rng = np.random.default_rng(2)
+    for i in rng.choice(len(theta), size=40, replace=False):
+        shifted = theta.copy()
+        shifted[i] += 1e-4
+        higher = huber_loss(agent, shifted, batch)
+        shifted[i] -= 2e-4
+        lower = huber_loss(agent, shifted, batch)
+        assert np.isclose(agent._grad[i], (higher - lower) / 2e-4, rtol=1e-2, atol=1e-5)
+
+
+def test_done_drops_bootstrap():
+    states, actions, rewards, next_states, _ = make_batch(3)
+    gradients = {}
+    for done in (True, False):
+        for seed in (4, 5):
+            agent = MLPQAgent(10, hidden=(8,), seed=0)
+            other_next = np.random.default_rng(seed).random(next_states.shape,
+                                                            dtype=np.float32)
+            agent.update_batch(states, actions, rewards, other_next,
+                               np.full(len(actions), done))
+            gradients[done, seed] = agent._grad.copy()
+    # Fins de partie : l'etat suivant n'entre pas dans la cible
+    assert np.array_equal(gradients[True, 4], gradients[True, 5])
+    assert not np.array_equal(gradients[False, 4], gradients[False, 5])
+
+
+def test_replay_batch_trains_every_train_period():
+    agent = MLPQAgent(10, hidden=(8,), seed=0)
+    agent.attach_replay(agent.replay_buffer(1000), batch_size=8)
+    theta = agent.theta.copy()
+    states, actions, rewards, next_states, dones = make_batch(6, count=6)
+    agent.replay_batch(states, actions, rewards, next_states, dones)
+    assert agent.updates == 0  # moins d'un minibatch dans le buffer
+    assert np.array_equal(agent.theta, theta)
+
+    states, actions, rewards, next_states, dones = make_batch(7, count=10)
+    agent.replay_batch(states, actions, rewards, next_states, dones)
+    assert len(agent.replay) == 16
+    assert agent.updates == 16 // agent.train_period - 6 // agent.train_period
+    assert not np.array_equal(agent.theta, theta)
@@ -0,0 +1,44 @@
+"""Observation compacte, comparee au calcul d'origine de la vision."""
+import pytest
+
+from helpers import play
+from largesnakegame import LargeSnakeGame
+from snakegame import SnakeGame, decode_observation
+
+
+def legacy_vision(game) -> tuple:
+    """Vision d'origine : rayons case par case sur les listes du jeu."""
+    head_x, head_y = game.snake[0]
+    view = []
+    distances = []
+    for dx, dy in ((0, -1), (1, 0), (0, 1), (-1, 0)):
+        x, y = head_x, head_y
+        distance = 0
+        while True:
+            x += dx
+            y += dy
+            distance += 1
+            if x < 0 or y < 0 or x >= game.grid_size or y >= game.grid_size:
+                symbol = 'W' if distance <= 2 else 'w'
+                break
+            if (x, y) in game.snake:
+                symbol = 'S' if distance <= 2 else 's'
+                break
+            if (x, y) in game.green_apples:
+                symbol = 'G'
+                break
+            if (x, y) == game.red_apple:
+                symbol = 'R'
+                break
+        view.append(symbol)
+        distances.append(str(distance))
+    return tuple(view), tuple(distances)
+
+
+@pytest.mark.parametrize("game_class", [SnakeGame, LargeSnakeGame])
+def test_observation_matches_legacy_vision(game_class):
+    game = game_class(10, goal=8, seed=5)
+    for game in play(game, 2000, seed=6):
+        expected = legacy_vision(game)
+        assert decode_observation(game.get_observation()) == expected
+        assert game.get_snake_vision() == expected
@@ -0,0 +1,24 @@
+"""Acteurs / apprenant : transitions appliquees par lot dans la memoire partagee."""
+import pytest
+
+from agent import DenseQLearningAgent
+from parallel import actor_learner_phase
+from replaybuffer import ReplayBuffer
+
+
+@pytest.mark.parametrize("replay", [False, True])
+def test_actor_learner_phase(replay):
+    agent = DenseQLearningAgent(10, alpha=0.1)
+    if replay:
+        agent.attach_replay(ReplayBuffer(500, seed=0), batch_size=8)
+    epsilon = agent.epsilon
+    reward_total, timer = actor_learner_phase(
+        agent, 10, 5, num_sessions=6, num_actors=2, seed=0, batch_size=16)
+
+    assert len(reward_total) == len(timer) == 6
+    assert agent.num_states() > 0
+    assert agent.epsilon == pytest.approx(epsilon * agent.decay_rate ** 6)
+    # Valeurs Q revenues en memoire privee
+    assert agent.q_values.flags.owndata
+    if replay:
+        assert len(agent.replay) > 0
@@ -0,0 +1,69 @@
+"""Pipeline de generateurs : flux de transitions, etages, bilan des sessions."""
+import random
+
+import numpy as np
+
+import pipeline
+from agent import DenseQLearningAgent
+from metrics import MetricsWriter, read_metrics
+from snakegame import SnakeGame
+
+
+def test_transitions_stream():
+    game = SnakeGame(10, goal=6, seed=0)
+    agent = DenseQLearningAgent(10, alpha=0.1)
+    stream = list(pipeline.transitions(game, agent, 20, max_steps=15))
+
+    sessions = [[t for t in stream if t.session == s] for s in range(20)]
+    for steps in sessions:
+        assert [t.step for t in steps] == list(range(1, len(steps) + 1))
+        assert [t.last for t in steps] == [False] * (len(steps) - 1) + [True]
+        assert steps[-1].done or steps[-1].step == 15
+        assert not any(t.done for t in steps[:-1])
+        assert steps[-1].session_reward == sum(t.reward for t in steps)
+        assert all(a.next_state == b.state for a, b in zip(steps, steps[1:]))
+
+
+def test_learner_matches_plain_loop():
+    def plain_loop(agent, game, num_sessions):
+        for _ in range(num_sessions):
+            state = agent.make_state(game)
+            for _ in range(pipeline.MAX_STEPS):
+                action = agent.get_action(state, False)
+                reward, done = game.step(action)
+                next_state = agent.make_state(game)
+                agent.update(state, action, reward, next_state)
+                if done:
+                    break
+                state = next_state
+            agent.decay_epsilon()
+            game.reset()
+
+    results = []
+    for staged in (True, False):
+        random.seed(1)
+        game = SnakeGame(10, goal=6, seed=2)
+        agent = DenseQLearningAgent(10, alpha=0.1)
+        if staged:
+            stream = pipeline.transitions(game, agent, 30)
+            stream = pipeline.learner(stream, agent)
+            reward_total, timer = pipeline.summarize(stream, game, agent)
+            assert len(reward_total) == len(timer) == 30
+        else:
+            plain_loop(agent, game, 30)
+        results.append(agent)
+    staged, plain = results
+    assert np.array_equal(staged.q_values, plain.q_values)
+    assert staged.epsilon == plain.epsilon
+
+
+def test_summarize_writes_metrics(tmp_path):
+    filename = str(tmp_path / "metrics.csv")
+    game = SnakeGame(10, goal=6, seed=3)
+    agent = DenseQLearningAgent(10, alpha=0.1)
+    stream = pipeline.learner(pipeline.transitions(game, agent, 12), agent)
+    with MetricsWriter(filename) as metrics:
+        assert pipeline.summarize(stream, game, agent, metrics) == ([], [])
+    rows, _ = read_metrics(filename)
+    assert [row["session"] for row in rows] == list(range(12))
+    assert rows[-1]["q_states"] == agent.num_states()
@@ -0,0 +1,34 @@
+"""Plans du plateau tenus a jour pas a pas, compares a une reconstruction."""
+import numpy as np
+import pytest
+
+from helpers import play
+from largesnakegame import LargeSnakeGame
+from planes import HEAD_PLANE, BODY_PLANE, GREEN_PLANE, RED_PLANE, WALL_PLANE
+from snakegame import SnakeGame
+
+
+def expected_planes(game) -> np.ndarray:
+    """Plans (5, grid + 2, grid + 2) reconstruits depuis get_state()."""
+    grid = game.grid_size
+    planes = np.zeros((5, grid + 2, grid + 2), dtype=np.uint8)
+    planes[WALL_PLANE] = 1
+    planes[WALL_PLANE, 1:-1, 1:-1] = 0
+    snake, green_apples, red_apple = game.get_state()
+    for x, y in snake:
+        planes[BODY_PLANE, y + 1, x + 1] = 1
+    head_x, head_y = snake[0]
+    planes[HEAD_PLANE, head_y + 1, head_x + 1] = 1
+    for x, y in green_apples:
+        planes[GREEN_PLANE, y + 1, x + 1] = 1
+    if red_apple is not None:
+        x, y = red_apple
+        planes[RED_PLANE, y + 1, x + 1] = 1
+    return planes
+
+
+@pytest.mark.parametrize("game_class", [SnakeGame, LargeSnakeGame])
+def test_planes_match_rebuild(game_class):
+    game = game_class(10, goal=8, seed=7, planes=True)
+    for game in play(game, 2000, seed=8):
+        assert np.array_equal(game.get_planes(), expected_planes(game))
@@ -0,0 +1,62 @@
+"""Replay buffer et mises a jour par minibatch de la Q-table dense."""
+import pickle
+
+import numpy as np
+import pytest
+
+from agent import DenseQLearningAgent, QLearningAgent
+from launch import create_agent
+from replaybuffer import ReplayBuffer
+
+
+def test_buffer_keeps_latest_transitions():
+    buffer = ReplayBuffer(4, seed=0)
+    for i in range(6):
+        buffer.add(i, i % 3, float(i), i + 1, i == 5)
+    assert len(buffer) == 4
+    assert sorted(buffer.states.tolist()) == [2, 3, 4, 5]
+    buffer.add_batch(np.arange(10, 16), np.zeros(6), np.zeros(6),
+                     np.arange(11, 17), np.zeros(6, dtype=bool))
+    assert sorted(buffer.states.tolist()) == [12, 13, 14, 15]
+    states, _, _, next_states, _ = buffer.sample(64)
+    assert set(states.tolist()) <= {12, 13, 14, 15}
+    assert (next_states == states + 1).all()
+
+
+def test_update_batch_averages_duplicates():
+    agent = DenseQLearningAgent(10, alpha=0.5, gamma=0.9)
+    agent.q_values[7] = [1.0, 2.0, 3.0]
+    states = np.array([5, 5, 5, 6])
+    actions = np.array([0, 0, 0, 2])
+    rewards = np.array([10.0, 20.0, 60.0, -4.0], dtype=np.float32)
+    next_states = np.array([7, 7, 7, 7])
+    agent.update_batch(states, actions, rewards, next_states)
+    # Une seule mise a jour par paire, avec l'erreur TD moyenne
+    assert agent.q_values[5, 0] == pytest.approx(0.5 * (30.0 + 0.9 * 3.0))
+    assert agent.q_values[6, 2] == pytest.approx(0.5 * (-4.0 + 0.9 * 3.0))
+    assert agent.visited[[5, 6]].all()
+    assert agent.num_states() == 2
+
+
+def test_replay_step_updates_from_buffer():
+    agent = DenseQLearningAgent(10, alpha=0.5)
+    agent.attach_replay(ReplayBuffer(100, seed=0), batch_size=4)
+    for _ in range(3):
+        agent.replay_step(3, 1, 10.0, 4, False)
+    assert not agent.q_values.any()  # moins d'un minibatch : rien de rejoue
+    agent.replay_step(3, 1, 10.0, 4, False)
+    assert agent.q_values[3, 1] == np.float32(5.0)
+
+
+def test_load_pickle_for_replay(tmp_path, monkeypatch):
+    # Ancienne Q-table dict non convertible en .snkq : chargee depuis le pickle
+    old = QLearningAgent(10, alpha=0.1)
+    old.q_table = {(0,) * 19 + (1,): [1.0, 2.0, 3.0],
+                   ('W', 'w', 'S', 'G'): [1.0, 0.0, 0.0]}
+    with open(tmp_path / "agent_state_sessions_100.pkl", "wb") as file:
+        pickle.dump(old, file)
+    monkeypatch.chdir(tmp_path)
+
+    agent = create_agent(10, 0.1, "100", play_mode=False, dense=True)
+    assert isinstance(agent, DenseQLearningAgent)
+    assert agent.q_table == old.q_table
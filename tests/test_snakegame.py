@@ -0,0 +1,38 @@
+"""SnakeGame : grille d'occupation tenue a jour pas a pas."""
+from collections import Counter, deque
+
+import pytest
+
+from helpers import play
+from largesnakegame import LargeSnakeGame
+from snakegame import SnakeGame, EMPTY, SNAKE, GREEN, RED
+
+
+def expected_board(game) -> tuple:
+    """(occupation, plateau) recalcules depuis le serpent et les pommes."""
+    grid = game.grid_size
+    occupancy = bytearray(grid * grid)
+    board = bytearray(grid * grid)
+    for (x, y), count in Counter(game.snake).items():
+        occupancy[y * grid + x] = count
+        board[y * grid + x] = SNAKE
+    for x, y in game.green_apples:
+        board[y * grid + x] = GREEN
+    if game.red_apple is not None:
+        board[game.red_apple[1] * grid + game.red_apple[0]] = RED
+    return occupancy, board
+
+
+@pytest.mark.parametrize("game_class", [SnakeGame, LargeSnakeGame])
+def test_occupancy_follows_snake(game_class):
+    game = game_class(10, goal=8, seed=2)
+    lengths = set()
+    for game in play(game, 3000, seed=3):
+        assert isinstance(game.snake, deque)
+        occupancy, board = expected_board(game)
+        assert game.occupancy == occupancy
+        assert game.board == board
+        lengths.add(len(game.snake))
+    # Le serpent a grandi et raccourci (pommes vertes et rouges)
+    assert len(lengths) > 3
+    assert EMPTY in game.board
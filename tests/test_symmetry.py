@@ -0,0 +1,66 @@
+"""Q-table symetrique : actions des orientations, conversion d'une Q-table."""
+import numpy as np
+import pytest
+
+from agent import (
+    DenseQLearningAgent, SymmetricQLearningAgent, NUM_STATE_CODES,
+    CANONICAL_CODES, CANONICAL_SYMMETRY, ACTIONS_TO_CANONICAL,
+    ACTIONS_FROM_CANONICAL
+    )
+
+
+def test_action_mapping_round_trip():
+    identity = np.arange(4)
+    for to_canonical, from_canonical in zip(ACTIONS_TO_CANONICAL, ACTIONS_FROM_CANONICAL):
+        assert (from_canonical[to_canonical] == identity).all()
+        assert (to_canonical[from_canonical] == identity).all()
+    # Un etat canonique est sa propre forme canonique, sans transformation
+    canonical = np.unique(CANONICAL_CODES)
+    assert (CANONICAL_CODES[canonical] == canonical).all()
+    assert (CANONICAL_SYMMETRY[canonical] == 0).all()
+
+
+def test_equivalent_states_share_values():
+    agent = SymmetricQLearningAgent(10, alpha=0.5)
+    rng = np.random.default_rng(0)
+    agent.q_values[:] = rng.normal(size=agent.q_values.shape)
+    for code in rng.choice(NUM_STATE_CODES, size=200, replace=False).tolist():
+        canonical, symmetry = agent.canonical(code)
+        real = agent.get_q_values(code)
+        # Action reelle a <-> action canonique ACTIONS_TO_CANONICAL[symmetry, a]
+        for action in range(4):
+            assert real[action] == agent.q_values[canonical,
+                                                  ACTIONS_TO_CANONICAL[symmetry, action]]
+        best = agent.get_action(code, play_mode=True)
+        assert real[best] == real.max()
+
+
+def test_from_agent_averages_orientations():
+    rng = np.random.default_rng(1)
+    reference = SymmetricQLearningAgent(10, alpha=0.5)
+    reference.q_values[:] = rng.normal(size=reference.q_values.shape)
+    codes = rng.choice(NUM_STATE_CODES, size=300, replace=False)
+    dense = DenseQLearningAgent(10, num_actions=4, alpha=0.5)
+    for code in codes.tolist():
+        dense.q_values[code] = reference.get_q_values(code)
+    dense.visited[codes] = True
+
+    # Q-table deja symetrique : conversion exacte
+    symmetric = SymmetricQLearningAgent.from_agent(dense)
+    canonical = np.unique(CANONICAL_CODES[codes])
+    assert symmetric.num_states() == len(canonical)
+    assert np.allclose(symmetric.q_values[canonical], reference.q_values[canonical])
+
+    # Deux orientations d'un meme etat : valeurs moyennees
+    rotated = int(np.flatnonzero(CANONICAL_SYMMETRY != 0)[0])
+    canonical = int(CANONICAL_CODES[rotated])
+    dense = DenseQLearningAgent(10, num_actions=4, alpha=0.5)
+    dense.q_table = {dense.state_of(rotated): [4.0, 0.0, 0.0, 0.0],
+                     dense.state_of(canonical): [0.0, 0.0, 0.0, 0.0]}
+    symmetric = SymmetricQLearningAgent.from_agent(dense)
+    assert symmetric.num_states() == 1
+    assert symmetric.get_q_values(rotated).tolist() == [2.0, 0.0, 0.0, 0.0]
+
+def test_from_agent_needs_four_actions():
+    with pytest.raises(ValueError):
+        SymmetricQLearningAgent.from_agent(DenseQLearningAgent(10, alpha=0.5))
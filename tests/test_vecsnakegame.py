@@ -0,0 +1,57 @@
+"""VecSnakeGame : memes recompenses et fins de partie que SnakeGame."""
+import random
+
+import numpy as np
+
+from helpers import copy_board, safe_action
+from snakegame import SnakeGame
+from vecsnakegame import VecSnakeGame
+
+
+def test_reward_and_done_parity():
+    rng = random.Random(0)
+    game = SnakeGame(10, goal=6, seed=1)
+    vgame = VecSnakeGame(1, 10, goal=6, seed=1)
+    rewards = set()
+    games = 0
+    for _ in range(5000):
+        # Les pommes sont tirees differemment : on resynchronise a chaque pas
+        copy_board(vgame, game)
+        action = safe_action(game, rng)
+        reward, done = game.step(action)
+        vec_rewards, vec_dones = vgame.step([action], auto_reset=False)
+        assert vec_rewards[0] == reward
+        assert vec_dones[0] == done
+        assert vgame.terminated[0] == done
+        rewards.add(reward)
+        if done:
+            game.reset()
+            games += 1
+    # Toutes les regles de recompense ont ete exercees
+    assert {-200, 2000, -100, 200} <= rewards
+    assert games > 10
+
+
+def test_truncation_is_not_termination():
+    vgame = VecSnakeGame(16, 10, goal=10, max_steps=3, seed=0)
+    vgame.steps[:] = 2
+    lengths = vgame.get_snake_length()
+    _, dones = vgame.step(np.zeros(16, dtype=np.int64), auto_reset=False)
+    assert dones.all()
+    assert not (vgame.terminated & vgame.truncated).any()
+    assert (vgame.terminated | vgame.truncated).all()
+    # Sans auto_reset les plateaux restent dans leur etat final
+    assert (vgame.steps == 3).all()
+    assert (vgame.get_snake_length() == vgame.final_length).all()
+    assert (vgame.final_length >= lengths - 2).all()
+
+    vgame.reset_done()
+    assert (vgame.steps == 0).all()
+    assert (vgame.get_snake_length() == 3).all()
+
+
+def test_auto_reset():
+    vgame = VecSnakeGame(4, 10, goal=10, max_steps=1, seed=0)
+    _, dones = vgame.step([0, 1, 2, 3])
+    assert dones.all()
+    assert (vgame.steps == 0).all()
@@ -0,0 +1,286 @@
+"""Entrainement sans affichage.
+
+Point d'entree pour les longues sessions sur les noeuds de calcul : ni
+pygame ni matplotlib ne sont importes. Le temps de demarrage a froid
+(imports + creation du jeu et de l'agent, jusqu'a la premiere session) est
+mesure et compare a COLD_START_TARGET_MS a la fin de l'execution.
+
+Exemple : python train.py --sessions 100000 --envs 64 --dense
+"""
+import time
+
+_START = time.perf_counter()  # avant les imports : mesure du demarrage
+
+import argparse  # noqa: E402
+import sys  # noqa: E402
+
+from agent import (  # noqa: E402
+    DenseQLearningAgent, SymmetricQLearningAgent, BoundedQLearningAgent
+    )
+from linearagent import LinearQAgent  # noqa: E402
+from mlpagent import MLPQAgent  # noqa: E402
+from replaybuffer import ReplayBuffer  # noqa: E402
+from launch import (  # noqa: E402
+    MAX_STEPS, create_agent, learning_phase, report_table_stats,
+    save_agent_state, vec_learning_phase
+    )
+from episodes import EpisodeRecorder  # noqa: E402
+from largesnakegame import LargeSnakeGame  # noqa: E402
+from metrics import MetricsWriter  # noqa: E402
+from profiler import PhaseProfiler  # noqa: E402
+from snakegame import SnakeGame  # noqa: E402
+from vecsnakegame import VecSnakeGame  # noqa: E402
+
+COLD_START_TARGET_MS = 250
+GRAPHIC_MODULES = ("pygame", "matplotlib", "display")
+
+
+def train(
+        grid: int = 10,
+        sessions: int = 1000,
+        goal: int = 10,
+        alpha: float = 0.1,
+        load=None,
+        envs: int = 1,
+        dense: bool = False,
+        save_file=None,
+        profiler=None,
+        metrics=None,
+        recorder=None,
+        actors: int = 1,
+        large: bool = False,
+        replay: int = 0,
+        replay_batch: int = 32,
+        replay_updates: int = 1,
+        distances: bool = False,
+        max_states: int = None,
+        symmetric: bool = False,
+        linear: bool = False,
+        mlp: bool = False,
+        window: int = 0,
+        ) -> tuple:
+    """Entraine un agent sans affichage.
+
+    profiler (PhaseProfiler) : chronometrage par phase (boucle scalaire ou
+    --envs ; ignore avec les acteurs).
+    metrics (MetricsWriter) : metriques par session ecrites en flux.
+    recorder (EpisodeRecorder) : journal des parties (boucle scalaire).
+    actors : nb de processus acteurs (cf. parallel.py) si > 1.
+    large : moteur LargeSnakeGame (boucle scalaire ou acteurs).
+    replay : capacite du replay buffer (0 = sans) ; agent dense dans ce cas.
+    distances : etats avec distances, Q-table bornee a max_states etats
+    (boucle scalaire, sans replay).
+    symmetric : Q-table partagee entre rotations / miroirs (pas d'acteurs).
+    linear : agent lineaire (boucle scalaire ou --envs, sans replay).
+    mlp : reseau de neurones (replay toujours actif, capacite replay si > 0),
+    fenetre de plans de rayon window (boucle scalaire si window > 0).
+    Retourne (agent, reward_total, timer, cold_start_ms).
+    """
+    agent = create_agent(grid, alpha, load, play_mode=False, dense=dense or replay > 0,
+                         distances=distances, max_states=max_states,
+                         symmetric=symmetric, linear=linear, mlp=mlp,
+                         window=window)
+    # Raisons d'abandonner les acteurs / --envs : parse_arguments refuse ces
+    # combinaisons, mais l'agent charge (--load) peut encore les imposer
+    no_actors = no_envs = None
+    if isinstance(agent, BoundedQLearningAgent):
+        no_actors = no_envs = "Q-table bornee (etats avec distances)"
+    elif isinstance(agent, MLPQAgent):
+        if replay:
+            agent.attach_replay(agent.replay_buffer(replay), replay_batch, replay_updates)
+        no_actors = "reseau de neurones"
+        if agent.window:
+            no_envs = "reseau avec fenetre de plans"
+    elif replay and isinstance(agent, DenseQLearningAgent):
+        agent.attach_replay(ReplayBuffer(replay), replay_batch, replay_updates)
+    if isinstance(agent, SymmetricQLearningAgent):
+        no_actors = "Q-table symetrique"
+    elif isinstance(agent, LinearQAgent):
+        no_actors = "agent lineaire"
+    if recorder is not None:
+        no_actors = no_envs = "enregistrement des parties"
+    elif large and no_envs is None:
+        no_envs = "--large"
+    if actors > 1 and no_actors:
+        print(f"{no_actors} : --actors ignore (un seul processus).")
+        actors = 1
+    if envs > 1 and no_envs:
+        print(f"{no_envs} : --envs ignore (boucle scalaire).")
+        envs = 1
+    if actors > 1 and envs > 1:
+        print("--actors : --envs ignore (chaque acteur joue une partie).")
+        envs = 1
+    if actors > 1:
+        from parallel import actor_learner_phase
+
+        if not isinstance(agent, DenseQLearningAgent):
+            agent = DenseQLearningAgent.from_agent(agent)
+        if profiler is not None:
+            print("--profile : non disponible avec --actors, ignore.")
+        cold_start_ms = (time.perf_counter() - _START) * 1000
+        reward_total, timer = actor_learner_phase(
+            agent, grid, goal, num_sessions=sessions, num_actors=actors,
+            metrics=metrics, large=large)
+    elif envs > 1:
+        game = VecSnakeGame(envs, grid, goal=goal, max_steps=MAX_STEPS)
+        cold_start_ms = (time.perf_counter() - _START) * 1000
+        reward_total, timer = vec_learning_phase(
+            game, agent, num_sessions=sessions, metrics=metrics,
+            profiler=profiler)
+    else:
+        game_class = LargeSnakeGame if large else SnakeGame
+        game = game_class(grid, goal=goal)
+        cold_start_ms = (time.perf_counter() - _START) * 1000
+        reward_total, timer = learning_phase(
+            game, agent, num_sessions=sessions, profiler=profiler,
+            metrics=metrics, recorder=recorder)
+
+    if save_file is not None:
+        save_agent_state(agent, save_file)
+    return agent, reward_total, timer, cold_start_ms
+
+
+def report_cold_start(cold_start_ms: float) -> bool:
+    """Affiche le temps de demarrage et verifie l'absence des modules graphiques."""
+    loaded = [name for name in GRAPHIC_MODULES if name in sys.modules]
+    status = "OK" if cold_start_ms <= COLD_START_TARGET_MS else "DEPASSE"
+    print(f"Demarrage a froid = {cold_start_ms:.1f} ms "
+          f"(cible {COLD_START_TARGET_MS} ms : {status})")
+    if loaded:
+        print(f"Attention : modules graphiques charges : {', '.join(loaded)}")
+    return status == "OK" and not loaded
+
+
+def parse_arguments():
+    """Recupere les arguments de l'entrainement sans affichage."""
+    parser = argparse.ArgumentParser(description="Snake Q-Learning, entrainement sans affichage.")
+    parser.add_argument("--grid_size", type=int, default=10,
+                        help="Taille de la grille du jeu. Par defaut : 10.")
+    parser.add_argument("--sessions", type=int, default=1000,
+                        help="Nombre de sessions pour l'apprentissage. Par defaut : 1000.")
+    parser.add_argument("--goal", type=int, default=10,
+                        help="Nombre de segments a atteindre. Par defaut: 10.")
+    parser.add_argument("--alpha", type=float, default=0.1,
+                        help="Taux d'apprentissage. Par defaut: 0.1.")
+    parser.add_argument("--load", nargs='?', const='1',
+                        help="Charge un etat d'entrainement (agent_state_sessions_<load>.snkq ou .pkl).")
+    parser.add_argument("--envs", type=int, default=1,
+                        help="Nombre de plateaux simules en parallele. Par defaut: 1.")
+    parser.add_argument("--dense", action="store_true",
+                        help="Q-table dense (tableau float32 indexe par code d'etat).")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Fichier de sauvegarde (defaut: agent_state_sessions_<sessions>.snkq).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Chronometre chaque phase (p50/p95/p99 en fin de run ou sur SIGUSR1).")
+    parser.add_argument("--metrics", type=str, default=None,
+                        help="Ecrit les metriques de chaque session dans ce fichier CSV.")
+    parser.add_argument("--actors", type=int, default=1,
+                        help="Processus acteurs (Q-table en memoire partagee). Par defaut: 1.")
+    parser.add_argument("--large", action="store_true",
+                        help="Moteur pour tres grandes grilles (cout par pas independant de la grille).")
+    parser.add_argument("--replay", type=int, default=0,
+                        help="Capacite du replay buffer (0 = desactive). Implique --dense.")
+    parser.add_argument("--replay_batch", type=int, default=32,
+                        help="Taille des minibatchs rejoues. Par defaut: 32.")
+    parser.add_argument("--replay_updates", type=int, default=1,
+                        help="Minibatchs rejoues par pas d'apprentissage. Par defaut: 1.")
+    parser.add_argument("--distances", action="store_true",
+                        help="Etats avec distances (par tranches), Q-table bornee.")
+    parser.add_argument("--max_states", type=int, default=None,
+                        help="Avec --distances : nombre max d'etats. Par defaut: 100000 "
+                             "(agent charge : sa taille).")
+    parser.add_argument("--symmetric", action="store_true",
+                        help="Q-table partagee entre rotations et miroirs (4 actions).")
+    parser.add_argument("--linear", action="store_true",
+                        help="Agent lineaire sur caracteristiques (memoire constante).")
+    parser.add_argument("--mlp", action="store_true",
+                        help="Reseau de neurones facon DQN (replay, reseau cible).")
+    parser.add_argument("--window", type=int, default=0,
+                        help="Avec --mlp : rayon de la fenetre de plans en entree (0 = sans).")
+    parser.add_argument("--record", type=str, default=None,
+                        help="Enregistre chaque partie dans ce journal .snke (cf. episodes.py).")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Graine des parties enregistrees (avec --record).")
+    args = parser.parse_args()
+    # Combinaisons non prises en charge (cf. train)
+    if args.actors > 1:
+        for flag in ("distances", "symmetric", "linear", "mlp", "record"):
+            if getattr(args, flag):
+                parser.error(f"--actors ne fonctionne pas avec --{flag}.")
+        if args.envs > 1:
+            parser.error("--actors et --envs sont exclusifs.")
+    if args.envs > 1:
+        for flag in ("distances", "record", "large"):
+            if getattr(args, flag):
+                parser.error(f"--envs ne fonctionne pas avec --{flag} (boucle scalaire).")
+        if args.mlp and args.window:
+            parser.error("--envs ne fonctionne pas avec --mlp --window (boucle scalaire).")
+    return args
+
+
+def main() -> None:
+    """Lance l'entrainement sans affichage."""
+    args = parse_arguments()
+    save_file = args.output or f"agent_state_sessions_{args.sessions}.snkq"
+    profiler = None
+    if args.profile:
+        profiler = PhaseProfiler()
+        profiler.install_signal_handler()
+    metrics = MetricsWriter(args.metrics) if args.metrics else None
+    recorder = None
+    if args.record:
+        recorder = EpisodeRecorder(args.record, args.seed, large=args.large)
+    try:
+        agent, reward_total, timer, cold_start_ms = train(
+            grid=args.grid_size,
+            sessions=args.sessions,
+            goal=args.goal,
+            alpha=args.alpha,
+            load=args.load,
+            envs=args.envs,
+            dense=args.dense,
+            save_file=save_file,
+            profiler=profiler,
+            metrics=metrics,
+            recorder=recorder,
+            actors=args.actors,
+            large=args.large,
+            replay=args.replay,
+            replay_batch=args.replay_batch,
+            replay_updates=args.replay_updates,
+            distances=args.distances,
+            max_states=args.max_states,
+            symmetric=args.symmetric,
+            linear=args.linear,
+            mlp=args.mlp,
+            window=args.window,
+            )
+    except KeyboardInterrupt:
+        print("\nInterruption du programme par l'utilisateur (Ctrl + C)")
+        sys.exit(0)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+    finally:
+        if metrics is not None:
+            metrics.close()
+        if recorder is not None:
+            recorder.close()
+
+    if metrics is not None:
+        print(f"Temps max d'une session = {metrics.stats.max_duration_ms:.2f} ms")
+        print(f"Recompense moyenne ({metrics.stats.window} dernieres sessions) = "
+              f"{metrics.stats.mean_reward:.1f}")
+    else:
+        print(f"Temps max d'une session = {(max(timer) * 1000):.2f} ms")
+    if recorder is not None:
+        print(f"{recorder.count} parties enregistrees dans {args.record}.")
+    if profiler is not None and profiler.histograms:  # vide avec --actors
+        profiler.report()
+    if isinstance(agent, BoundedQLearningAgent):
+        report_table_stats(agent)
+    report_cold_start(cold_start_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""Classe VecSnakeGame.
+
+Version vectorisee de SnakeGame : N plateaux sont stockes dans des tableaux
+NumPy et avances en un seul appel a step(). Les regles de recompense sont
+celles de SnakeGame.step (pomme verte, pomme rouge, penalite de deplacement,
+boucles, rapprochement des pommes vertes).
+
+Representation interne (grille avec bordure de murs, indices "plats") :
+- board : code de l'objet sur chaque case (vide, mur, serpent, pommes)
+- occ : nombre de segments du serpent sur chaque case
+- body : buffer circulaire des segments (tete en head_ptr)
+- green / red : positions des pommes (-1 si absente)
+"""
+import numpy as np
+
+from snakegame import VISION_SYMBOLS, EMPTY, WALL, SNAKE, GREEN, RED
+
+# Code de vision (indice dans VISION_SYMBOLS) selon l'objet et la distance
+_NEAR = np.array([-1, 0, 2, 4, 5], dtype=np.int8)  # distance <= 2
+_FAR = np.array([-1, 1, 3, 4, 5], dtype=np.int8)
+_G = VISION_SYMBOLS.index('G')
+
+LOOP_MEMORY = 10  # Nb de positions gardees pour detecter les boucles
+_NO_APPLE = np.iinfo(np.int64).max
+# Directions du placement du serpent, dans l'ordre de SnakeGame._place_snake_randomly
+_PLACE_DX = np.array([0, 0, 1, -1])
+_PLACE_DY = np.array([1, -1, 0, 0])
+
+
+def vision_to_tuples(codes) -> list:
+    """Convertit un lot de codes de vision (N, 4) en tuples de symboles."""
+    return [tuple(VISION_SYMBOLS[c] for c in row) for row in codes.tolist()]
+
+
+class VecSnakeGame:
+    def __init__(self, num_envs, grid, goal, max_steps=None, seed=None):
+        """Initialisation."""
+        self.num_envs = num_envs
+        self.grid_size = grid
+        self.init_goal = goal
+        self.goal = goal
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+
+        # Grille avec bordure de murs, adressee par indice plat y * width + x
+        self.width = grid + 2
+        self.capacity = grid * grid + 3
+        # Deplacements : haut, droite, bas, gauche (comme SnakeGame.step)
+        self.moves = np.array([-self.width, 1, self.width, -1])
+
+        template = np.full((self.width, self.width), WALL, dtype=np.int8)
+        template[1:-1, 1:-1] = EMPTY
+        self._template = template.ravel()
+        self.board = np.tile(self._template, (num_envs, 1))
+        self.occ = np.zeros((num_envs, self.width * self.width), dtype=np.int16)
+
+        # Zone d'apparition des pommes, identique a _place_apples_randomly
+        coords = np.arange(1, grid - 2) + 1
+        self._apple_zone = (coords[:, None] * self.width + coords[None, :]).ravel()
+
+        self.body = np.zeros((num_envs, self.capacity), dtype=np.int32)
+        self.head_ptr = np.zeros(num_envs, dtype=np.int64)
+        self.length = np.zeros(num_envs, dtype=np.int64)
+        self.green = np.full((num_envs, 2), -1, dtype=np.int64)
+        self.red = np.full(num_envs, -1, dtype=np.int64)
+
+        self.previous_positions = np.full((num_envs, LOOP_MEMORY), -1, dtype=np.int64)
+        self.prev_ptr = np.zeros(num_envs, dtype=np.int64)
+
+        self.reward = np.zeros(num_envs)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+        self.final_length = np.zeros(num_envs, dtype=np.int64)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self._codes = np.zeros((num_envs, 4), dtype=np.int8)
+        self._dists = np.zeros((num_envs, 4), dtype=np.int64)
+        self.reset()
+
+    def _place_snakes_randomly(self, idx):
+        """Place un serpent de 3 segments sur chaque plateau de idx (cf. SnakeGame).
+
+        Tirages par tableaux pour tous les plateaux a la fois ; les
+        segments superposes (demi-tour) sont comptes dans occ.
+        """
+        snake_length = 3
+        margin = snake_length + 1
+        rng = self.rng
+        n = len(idx)
+        x = rng.integers(margin, self.grid_size - margin, size=n)
+        y = rng.integers(margin, self.grid_size - margin, size=n)
+        direction = rng.integers(4, size=n)
+
+        cells = np.empty((n, snake_length), dtype=np.int64)
+        cells[:, 0] = (y + 1) * self.width + x + 1
+        for k in range(1, snake_length):
+            turn = rng.random(n) < 0.3
+            direction = np.where(turn, rng.integers(4, size=n), direction)
+            x = x + _PLACE_DX[direction]
+            y = y + _PLACE_DY[direction]
+            cells[:, k] = (y + 1) * self.width + x + 1
+
+        rows = idx[:, None]
+        self.body[rows, np.arange(snake_length)] = cells
+        self.head_ptr[idx] = 0
+        self.length[idx] = snake_length
+        np.add.at(self.occ, (rows, cells), 1)
+        self.board[rows, cells] = SNAKE
+
+    def _spawn_apples(self, idx, code, tries=8):
+        """Choisit une case libre par plateau de idx et y pose une pomme."""
+        zone = self._apple_zone
+        pos = np.full(len(idx), -1, dtype=np.int64)
+        pending = np.arange(len(idx))
+
+        # Tirages par rejet : la grille est presque toujours peu remplie
+        for _ in range(tries):
+            if len(pending) == 0:
+                break
+            cand = zone[self.rng.integers(len(zone), size=len(pending))]
+            free = self.board[idx[pending], cand] == EMPTY
+            pos[pending[free]] = cand[free]
+            pending = pending[~free]
+
+        # Plateaux tres remplis : on enumere les cases libres
+        for k in pending:
+            free = zone[self.board[idx[k], zone] == EMPTY]
+            if len(free):
+                pos[k] = free[self.rng.integers(len(free))]
+
+        placed = pos >= 0
+        self.board[idx[placed], pos[placed]] = code
+        return pos
+
+    def _pop_tail(self, idx):
+        """Retire le dernier segment des serpents de idx."""
+        if len(idx) == 0:
+            return
+        tail_ptr = (self.head_ptr[idx] + self.length[idx] - 1) % self.capacity
+        cells = self.body[idx, tail_ptr]
+        self.occ[idx, cells] -= 1
+        vacated = self.occ[idx, cells] == 0
+        self.board[idx[vacated], cells[vacated]] = EMPTY
+        self.length[idx] -= 1
+
+    def _raycast(self, idx):
+        """Calcule la vision (codes, distances) des plateaux de idx."""
+        n = len(idx)
+        codes = np.zeros(4 * n, dtype=np.int8)
+        dists = np.zeros(4 * n, dtype=np.int64)
+        # Un rayon par (plateau, direction) ; seuls les rayons en cours avancent.
+        # Positions dans le tableau board aplati : plateau * area + case
+        area = self.board.shape[1]
+        flat = self.board.reshape(-1)
+        heads = idx * area + self.body[idx, self.head_ptr[idx]]
+        rays = np.arange(4 * n)
+        pos = np.repeat(heads, 4)
+        moves = np.tile(self.moves, n)
+
+        # La bordure de murs arrete tous les rayons en grid_size cases au plus
+        k = 0
+        while len(rays):
+            k += 1
+            pos += moves
+            objs = flat[pos]
+            hit = np.flatnonzero(objs != EMPTY)
+            if len(hit):
+                lut = _NEAR if k <= 2 else _FAR
+                codes[rays[hit]] = lut[objs[hit]]
+                dists[rays[hit]] = k
+                if len(hit) == len(rays):
+                    break
+                pending = objs == EMPTY
+                rays, pos, moves = rays[pending], pos[pending], moves[pending]
+        codes = codes.reshape(n, 4)
+        dists = dists.reshape(n, 4)
+        self._codes[idx] = codes
+        self._dists[idx] = dists
+        return codes, dists
+
+    def _green_distance(self, codes, dists):
+        """Distance minimale a une pomme verte visible (-1 si aucune)."""
+        masked = np.where(codes == _G, dists, _NO_APPLE)
+        nearest = masked.min(axis=1)
+        return np.where((codes == _G).any(axis=1), nearest, -1)
+
+    def _reset_boards(self, idx):
+        """Reinitialise les plateaux de idx."""
+        if len(idx) == 0:
+            return
+        self.board[idx] = self._template
+        self.occ[idx] = 0
+        self._place_snakes_randomly(idx)
+        self.green[idx, 0] = self._spawn_apples(idx, GREEN)
+        self.green[idx, 1] = self._spawn_apples(idx, GREEN)
+        self.red[idx] = self._spawn_apples(idx, RED)
+        self.previous_positions[idx] = -1
+        self.prev_ptr[idx] = 0
+        self.reward[idx] = 0
+        self.steps[idx] = 0
+        self._raycast(idx)
+
+    def reset(self):
+        """Reinitialise tous les plateaux."""
+        self._reset_boards(np.arange(self.num_envs))
+        self.goal = self.init_goal
+
+    def step(self, actions, auto_reset=True):
+        """Applique une action par plateau, retourne (rewards, dones).
+
+        dones = terminated | truncated : fin de partie (collision) ou limite
+        de max_steps pas atteinte, masques gardes dans self.terminated et
+        self.truncated. Les plateaux termines sont reinitialises
+        automatiquement : la vision retournee ensuite par get_snake_vision()
+        est celle de la nouvelle partie. Avec auto_reset=False, ils restent
+        dans leur etat final (observation de l'etat suivant reel) jusqu'a
+        reset_done().
+        """
+        actions = np.asarray(actions)
+        all_idx = np.arange(self.num_envs)
+        heads = self.body[all_idx, self.head_ptr]
+        new_head = heads + self.moves[actions]
+        cell = self.board[all_idx, new_head]
+
+        # Pour le rapprochement des pommes : vision d'avant le deplacement
+        green_before = self._green_distance(self._codes, self._dists)
+
+        rewards = self.reward.copy()
+        collide = (cell == WALL) | (cell == SNAKE)
+        rewards[collide] = -200
+
+        # Ajouter la nouvelle tete
+        alive = np.flatnonzero(~collide)
+        self.head_ptr[alive] = (self.head_ptr[alive] - 1) % self.capacity
+        self.body[alive, self.head_ptr[alive]] = new_head[alive]
+        self.occ[alive, new_head[alive]] += 1
+        self.board[alive, new_head[alive]] = SNAKE
+        self.length[alive] += 1
+
+        # Pomme verte mangee
+        eat_green = alive[cell[alive] == GREEN]
+        if len(eat_green):
+            slot = np.argmax(self.green[eat_green] == new_head[eat_green, None], axis=1)
+            self.green[eat_green, slot] = self._spawn_apples(eat_green, GREEN)
+            rewards[eat_green] = 2000
+
+        # Pomme rouge mangee : nouvelle pomme puis retrait de deux segments
+        eat_red = alive[cell[alive] == RED]
+        if len(eat_red):
+            rewards[eat_red] = -100
+            self.red[eat_red] = self._spawn_apples(eat_red, RED)
+            self._pop_tail(eat_red[self.length[eat_red] > 1])
+            self._pop_tail(eat_red[self.length[eat_red] > 1])
+
+        # Mouvement normal
+        normal = alive[cell[alive] == EMPTY]
+        self._pop_tail(normal)
+        rewards[normal] -= 2
+        heads_n = new_head[normal]
+        looped = (self.previous_positions[normal] == heads_n[:, None]).any(axis=1)
+        rewards[normal[looped]] -= 50
+        self.previous_positions[normal, self.prev_ptr[normal]] = heads_n
+        self.prev_ptr[normal] = (self.prev_ptr[normal] + 1) % LOOP_MEMORY
+
+        # Vision d'apres le deplacement, reutilisee au prochain step
+        self._raycast(alive)
+        green_after = self._green_distance(self._codes[normal], self._dists[normal])
+        before = green_before[normal]
+        shaped = (before >= 0) & (green_after >= 0)
+        rewards[normal[shaped & (green_after < before)]] += 20
+        rewards[normal[shaped & (green_after > before)]] -= 5
+
+        # Objectif de taille atteint
+        rewards[normal[self.length[normal] >= self.goal]] = 200
+
+        self.reward = rewards
+        self.steps += 1
+        self.terminated = collide
+        if self.max_steps is None:
+            self.truncated = np.zeros(self.num_envs, dtype=bool)
+        else:
+            self.truncated = ~collide & (self.steps >= self.max_steps)
+        dones = self.terminated | self.truncated
+        self.dones = dones
+
+        rewards = rewards.copy()
+        self.final_length = self.length.copy()  # longueurs avant reinitialisation
+        if auto_reset:
+            self.reset_done()
+        return rewards, dones
+
+    def reset_done(self):
+        """Reinitialise les plateaux termines au dernier step (cf. auto_reset)."""
+        self._reset_boards(np.flatnonzero(self.dones))
+
+    def get_snake_vision(self):
+        """Retourne la vision de chaque plateau : codes (N, 4) et distances.
+
+        Les codes sont des indices dans VISION_SYMBOLS (haut, droite, bas,
+        gauche), cf. vision_to_tuples() pour la forme de SnakeGame.
+        """
+        return self._codes.copy(), self._dists.copy()
+
+    def get_snake_length(self):
+        """Retourne la longueur du serpent de chaque plateau."""
+        return self.length.copy()
+
+    def _to_xy(self, cell):
+        return int(cell) % self.width - 1, int(cell) // self.width - 1
+
+    def get_state(self, n=0):
+        """Retourne l'etat du plateau n au format de SnakeGame.get_state()."""
+        ptrs = (self.head_ptr[n] + np.arange(self.length[n])) % self.capacity
+        snake = [self._to_xy(c) for c in self.body[n, ptrs]]
+        green_apples = [self._to_xy(c) for c in self.green[n] if c >= 0]
+        red_apple = self._to_xy(self.red[n]) if self.red[n] >= 0 else None
+        return snake, green_apples, red_apple